@@ -0,0 +1,237 @@
+'''
+Created on Oct 18, 2026
+
+asyncio counterpart to DbLib.DbMethods.  Built on the python-oracledb
+driver's thin mode async api (oracledb.create_pool_async) so that many
+queries can be in flight at once from a single event loop without
+needing a thread per call.
+
+The driver module is a constructor argument, allowing any module that
+provides the same api (create_pool_async / makedsn) to be used in its
+place, for example a stand-in database when testing.
+
+example:
+    async def main():
+        db = AsyncDbLib.AsyncDbMethods()
+        await db.connect('schema', 'pswd', 'servicename', 'host', 1521)
+        checks = [db.objExists('WHSE', 'TABLE', tab) for tab in tables]
+        results = await asyncio.gather(*checks)
+        await db.close()
+'''
+import itertools
+import logging
+import time
+
+from . import DbConstants
+
+
+class AsyncDbMethods(object):
+    '''
+    Coroutine based database methods.  Each call checks a connection out of
+    an async connection pool for the duration of the call, so concurrent
+    calls are spread over up to maxSessions connections.
+
+    :ivar driver: the database driver module, defaults to oracledb
+    :ivar pool: the async connection pool, created by connect()
+    :ivar minSessions: min number of connections kept open by the pool
+    :ivar maxSessions: max number of connections the pool will open
+    '''
+
+    def __init__(self, driver=None, minSessions=1, maxSessions=8,
+                 increment=1):
+        self.logger = logging.getLogger(__name__)
+        if driver is None:
+            import oracledb  # pylint: disable=import-outside-toplevel
+            driver = oracledb
+        self.driver = driver
+        self.const = DbConstants.DbLibConst()
+        self.minSessions = minSessions
+        self.maxSessions = maxSessions
+        self.increment = increment
+        self.pool = None
+
+    async def connect(self, user, pswd, serviceName, host, port=1521):
+        '''
+        creates the connection pool used by all the other methods.
+
+        :param  user: schema that you are using to connnect to the database
+        :type user: str
+        :param  pswd: password that goes with the schema
+        :type pswd: str
+        :param  serviceName: The database service name being connected to.
+        :type serviceName: str
+        :param  host: The host that the serviceName resides on
+        :type host: str
+        :param  port: the port that the database listener is attached to.
+        :type port: int
+        '''
+        dsn = self.driver.makedsn(host, port, service_name=serviceName)
+        self.logger.info("creating async pool for %s@%s:%s/%s", user, host,
+                         port, serviceName)
+        self.pool = self.driver.create_pool_async(
+            user=user, password=pswd, dsn=dsn, min=self.minSessions,
+            max=self.maxSessions, increment=self.increment)
+
+    async def close(self):
+        '''
+        closes the connection pool
+        '''
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def acquire(self):
+        '''
+        :return: a connection from the pool, must be given back with
+                 release()
+        '''
+        if self.pool is None:
+            msg = 'not connected, call connect() before using the database'
+            self.logger.error(msg)
+            raise ValueError(msg)
+        return await self.pool.acquire()
+
+    async def release(self, conn):
+        '''
+        gives a connection back to the pool
+        '''
+        await self.pool.release(conn)
+
+    async def execute(self, sqlToExecute, values=None, commit=False):
+        '''
+        Executes a sql statement, returning the rows if it is a query.
+
+        :param  sqlToExecute: sql statement to execute
+        :type sqlToExecute: str
+        :param values: bind values for the statement
+        :param commit: commit the statement, required for DML as the
+                       connection goes back to the pool when the call is done
+        :type commit: bool
+        :returns: list of rows for queries, otherwise None
+        '''
+        conn = await self.acquire()
+        try:
+            curObj = conn.cursor()
+            try:
+                await curObj.execute(sqlToExecute, values)
+                rows = None
+                if curObj.description:
+                    rows = await curObj.fetchall()
+            finally:
+                curObj.close()
+            if commit:
+                await conn.commit()
+        finally:
+            await self.release(conn)
+        return rows
+
+    async def fetchBatches(self, sqlToExecute, values=None, batchSize=1000):
+        '''
+        async generator that runs a query and yields the results as lists of
+        up to batchSize rows.  The cursor and connection are given back
+        when the results are exhausted, or when the generator is closed
+        early.
+
+        :param  sqlToExecute: query to execute
+        :type sqlToExecute: str
+        :param values: bind values for the query
+        :param batchSize: number of rows in each batch
+        :type batchSize: int
+        '''
+        conn = await self.acquire()
+        try:
+            curObj = conn.cursor()
+            try:
+                curObj.arraysize = batchSize
+                await curObj.execute(sqlToExecute, values)
+                while True:
+                    rows = await curObj.fetchmany(batchSize)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                curObj.close()
+        finally:
+            await self.release(conn)
+
+    async def executeMany(self, sqlToExecute, rows, batchSize=5000,
+                          batchErrors=False, commit=True):
+        '''
+        async version of DbMethods.executeMany.  Sends the bind rows to the
+        database in executemany() batches on a single connection.  The rows
+        are consumed lazily, one batch at a time, so a generator can be used
+        to feed very large loads.
+
+        :param  sqlToExecute: the DML statement to execute
+        :type sqlToExecute: str
+        :param rows: iterable of bind tuples or bind dictionaries
+        :param batchSize: the number of rows sent with each executemany()
+        :type batchSize: int
+        :param batchErrors: when true rows that fail are reported instead of
+                            aborting the batch
+        :type batchErrors: bool
+        :param commit: commit once all the batches have been sent
+        :type commit: bool
+        :returns: list with a dictionary for each batch with the keys batch,
+                  rows, seconds and errors, same as DbMethods.executeMany
+        :rtype: list
+        '''
+        batchResults = []
+        rowIter = iter(rows)
+        rowOffset = 0
+        conn = await self.acquire()
+        try:
+            curObj = conn.cursor()
+            try:
+                for batchCnt in itertools.count():
+                    batch = list(itertools.islice(rowIter, batchSize))
+                    if not batch:
+                        break
+                    startTime = time.time()
+                    await curObj.executemany(sqlToExecute, batch,
+                                             batcherrors=batchErrors)
+                    batchResult = {'batch': batchCnt,
+                                   'rows': len(batch),
+                                   'seconds': time.time() - startTime,
+                                   'errors': []}
+                    if batchErrors:
+                        for error in curObj.getbatcherrors():
+                            batchResult['errors'].append(
+                                (rowOffset + error.offset, error.message))
+                    batchResults.append(batchResult)
+                    rowOffset += len(batch)
+            finally:
+                curObj.close()
+            if commit:
+                await conn.commit()
+        finally:
+            await self.release(conn)
+        return batchResults
+
+    async def objExists(self, schema, objType, objName):
+        '''
+        async version of DbMethods.objExists, checks ALL_OBJECTS using bind
+        variables.
+
+        :param  schema: schema name, None matches any schema
+        :type schema: str
+        :param  objType: object type, example 'TABLE', 'VIEW', 'INDEX' etc.
+        :type objType: str
+        :param  objName: name of the database object.
+        :type objName: str
+        :returns: boolean indicating if the object exists
+        :rtype: bool
+        '''
+        if objType.upper() not in self.const.objTypes:
+            raise DbConstants.FunctionalityNotDefinedError(
+                'Functionality for the object type ' + objType +
+                ' is not yet defined!')
+        sql = 'SELECT object_name FROM all_objects ' + \
+              'WHERE object_type = :objType AND object_name = :objName'
+        values = {'objType': self.const.objTypes[objType.upper()],
+                  'objName': objName.upper()}
+        if schema:
+            sql = sql + ' AND owner = :owner'
+            values['owner'] = schema.upper()
+        rows = await self.execute(sql, values)
+        return bool(rows)
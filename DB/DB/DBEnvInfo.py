@@ -31,18 +31,45 @@ class DBEnvInfo(object):
         self.pmpTokens = { }
         self.pmpConfig = secrets['PMPPARAMS']
 
+        self.keyMap = self.buildKeyMap()
+
+    def buildKeyMap(self):
+        '''
+        Builds a dictionary that maps every key in self.dbInfo, and every
+        alias in the keyAliases of each entry, to the key in self.dbInfo
+        that it refers to.  Keys and aliases are upper cased.
+
+        :returns: the alias -> key dictionary
+        :rtype: dict
+        :raises ValueError: if the same alias refers to more than one
+                            entry
+        '''
+        keyMap = {}
+        for curKey in self.dbInfo.keys():
+            keyMap[curKey.upper()] = curKey
+        for curKey in self.dbInfo.keys():
+            for alias in self.dbInfo[curKey].get('keyAliases', []):
+                alias = alias.upper()
+                if alias in keyMap and keyMap[alias] != curKey:
+                    msg = 'the key alias {0} for the database {1} is ' + \
+                          'already used by the database {2}'
+                    msg = msg.format(alias, curKey, keyMap[alias])
+                    raise ValueError(msg)
+                keyMap[alias] = curKey
+        return keyMap
+
     def getPMPToken(self):
         computerName = platform.node()
         computerName = computerName.lower()
         computerNameList = computerName.split('.')
         computerName = computerNameList[0]
-        if not self.pmpTokens.has_key(computerName):
+        if computerName not in self.pmpTokens:
             msg = 'you tried to get a pmp key for the computer {0}' + \
                   'however there is no key described for that machine ' + \
                   '.  You need to populate the pmpTokens dictionary ' + \
                   ' with the key for this machine.'
-            msg = msg.formatSql(computerName)
-            raise ValueError, msg
+            msg = msg.format(computerName)
+            raise ValueError(msg)
         return self.pmpTokens[computerName]
 
     def getPMPConfig(self):
@@ -71,18 +98,10 @@ class DBEnvInfo(object):
                                 to refer to this struct
         :rtype: dict
         '''
-        key = key.upper()
         retVal = None
-        curKeys = self.dbInfo.keys()
-        if key in curKeys:
-            retVal = self.dbInfo[key]
-        else:
-            # check aliases
-            for curKey in curKeys:
-                aliases = self.dbInfo[curKey]['keyAliases']
-                if key in aliases:
-                    retVal = self.dbInfo[curKey]
-                    break
+        curKey = self.getKey(key)
+        if curKey is not None:
+            retVal = self.dbInfo[curKey]
         return retVal
 
     def isValidKey(self, key):
@@ -101,37 +120,29 @@ class DBEnvInfo(object):
                   has corresponding db info set up for it.
         :rtype: boolean
         '''
-        valid = False
-        key = key.upper()
-        validKeys = self.dbInfo.keys()
-        if key in validKeys:
-            valid = True
-        else:
-            for curKey in validKeys:
-                if curKey in self.dbInfo[curKey]['keyAliases']:
-                    valid = True
-                    break
-        return valid
+        return key.upper() in self.keyMap
 
     def getKey(self, key):
         '''
         If the key provided is an alias will return the key
         that can be used to get directly to the corresponding
-        database dict in self.dbInfo
+        database dict in self.dbInfo, None if the key is not
+        defined
         '''
-        key = key.upper()
-        retVal = None
-        curKeys = self.dbInfo.keys()
-        if key in curKeys:
-            retVal = key
-        else:
-            # check aliases
-            for curKey in curKeys:
-                aliases = self.dbInfo[curKey]['keyAliases']
-                if key in aliases:
-                    retVal = curKey
-                    break
-        return retVal
+        return self.keyMap.get(key.upper())
+
+    def resolveKeys(self, keys):
+        '''
+        bulk version of getKey
+
+        :param keys: list of keys and / or aliases
+        :type keys: list
+        :returns: dictionary mapping each of the provided keys to the
+                  corresponding key in self.dbInfo, None for keys that
+                  are not defined
+        :rtype: dict
+        '''
+        return dict([(key, self.getKey(key)) for key in keys])
 
     def getDestinationPmpResource(self, key):
         key = self.getKey(key)
@@ -0,0 +1,60 @@
+'''
+Created on Oct 18, 2026
+
+Constants and exceptions shared by DbLib and AsyncDbLib.  Kept in a module
+of their own with no database driver imports, so that AsyncDbLib can be
+used with python-oracledb without cx_Oracle being installed.  Both names
+are also available from DbLib.
+'''
+
+
+class DbLibConst(object):
+    '''
+    constants used by the DbMethods and AsyncDbMethods classes
+    '''
+    # maps the object type names accepted by objExists / objsExist to the
+    # object_type values used in the ALL_OBJECTS data dictionary view
+    objTypes = {'TABLE': 'TABLE',
+                'TABLES': 'TABLE',
+                'INDEX': 'INDEX',
+                'INDEXES': 'INDEX',
+                'VIEW': 'VIEW',
+                'VIEWS': 'VIEW',
+                'MATERIALIZEDVIEW': 'MATERIALIZED VIEW',
+                'MATERIALIZED VIEW': 'MATERIALIZED VIEW',
+                'MVIEW': 'MATERIALIZED VIEW',
+                'MV': 'MATERIALIZED VIEW',
+                'DB_LINK': 'DATABASE LINK',
+                'DBLINK': 'DATABASE LINK'}
+    # rows fetched per round trip when loading a data dictionary snapshot
+    dictArraySize = 5000
+    # the max number of bind variables used in a single IN clause
+    inListSize = 500
+    # size of the statement cache configured on new connections
+    stmtCacheSize = 50
+    # the max number of prepared cursors kept by DbMethods
+    preparedCursorLimit = 20
+    # rows fetched per round trip by executeOracleSqlColumnar
+    columnarArraySize = 10000
+    # array.array type codes used for integer and floating point columns,
+    # and the corresponding numpy dtypes
+    intTypeCode = 'q'
+    floatTypeCode = 'd'
+    numpyDtypes = {'q': 'int64', 'd': 'float64'}
+    # rows fetched per round trip by executeOracleSqlInlineLobs, kept lower
+    # than the default as every row can carry large LOB values
+    lobArraySize = 500
+    # the number of LOB chunks read with each round trip by readLob
+    lobChunksPerRead = 16
+    # the name of the spatial object type that is converted to WKB
+    geometryTypeName = 'SDO_GEOMETRY'
+
+
+class FunctionalityNotDefinedError(Exception):
+    '''
+    Raised when a method is asked to deal with a database object type that
+    it does not support.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        Exception.__init__(self, *args, **kwargs)
@@ -26,11 +26,18 @@ other database specific parameters.
 API DOC:
 ===============
 """
+import array
+import collections
+import itertools
 import logging
 import os
+import time
 
 import cx_Oracle
 
+from . import DbPool
+from .DbConstants import DbLibConst, FunctionalityNotDefinedError
+
 
 class DbMethods(object):
     '''
@@ -41,6 +48,16 @@ class DbMethods(object):
                    that are stored in the app. config file.
     :ivar connObj: The cx_Oracle connection object
     :ivar dbParams: Contains the database connection parameters.
+    :ivar poolManager: when the connection was checked out of a session pool
+                       this is the DbPool.PoolManager it came from.
+    :ivar dictCacheTTL: when set, the number of seconds that data dictionary
+                        snapshots used by objsExist are kept before being
+                        reloaded.  None disables the cache.
+    :ivar preparedCursors: LRU of prepared cursors keyed by sql text, used
+                           by executePrepared and by executeOracleSqlNoReturn
+                           for statements with bind values
+    :ivar profiler: optional QueryProfiler.QueryProfiler that statement
+                    timings are reported to, see setProfiler
     '''
 
     def __init__(self):
@@ -51,7 +68,18 @@ class DbMethods(object):
         # a hash that will be populated with database connection
         # parameters by the method __getDbParams
         self.dbParams = {}
-
+        self.poolManager = None
+        self.connRegistry = None
+        self.const = DbLibConst()
+        # data dictionary snapshots keyed by owner, see objsExist
+        self.dictCacheTTL = None
+        self.dictCache = {}
+        # prepared cursors keyed by sql, most recently used last
+        self.preparedCursors = collections.OrderedDict()
+        self.stmtCacheSize = self.const.stmtCacheSize
+        self.preparedCursorLimit = self.const.preparedCursorLimit
+        self.preparedCursorStats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self.profiler = None
 
     def connectParams(self, user=None, pswd=None, instance=None):
         '''
@@ -84,6 +112,7 @@ class DbMethods(object):
                              type(self.dbParams['instance']))
             self.logger.info(msg)
             raise ConnectionError(self.dbParams['username'], self.dbParams['instance'])
+        self.initConnection()
 
     def connectNoDSN(self, user, pswd, serviceName, host, port=1521):
         '''
@@ -123,6 +152,236 @@ class DbMethods(object):
             self.logger.debug(u'dsn returned is: %s', dsn)
         self.connectParams(user, pswd, dsn)
 
+    def connectDescriptor(self, user, pswd, descriptor):
+        '''
+        connects using a connect descriptor that has already been resolved,
+        for example by TNSNamesParser.TNSNames.getConnectDescriptors(),
+        avoiding having to look up and rebuild the dsn for every connection.
+
+        :param  user: schema that you are using to connnect to the database
+        :type user: str
+        :param  pswd: password that goes with the schema
+        :type pswd: str
+        :param descriptor: a TNSNamesParser.ConnectDescriptor, or the connect
+                           descriptor text
+        '''
+        dsn = getattr(descriptor, 'dsn', descriptor)
+        self.logger.debug("connecting with the descriptor: %s", dsn)
+        self.connectParams(user, pswd, dsn)
+
+    def connectPooled(self, user, pswd, serviceName, host, port=1521,
+                      poolManager=None):
+        '''
+        Checks a session out of a session pool instead of opening a new
+        connection.  The pool is shared by every DbMethods object connecting
+        with the same user / service name / host / port, so repeated
+        connections to the same database reuse existing sessions.  The
+        session is given back to the pool by closeDbConnection().
+
+        :param  user: schema that you are using to connnect to the database
+        :type user: str
+        :param  pswd: password that goes with the schema
+        :type pswd: str
+        :param  serviceName: The database serviceName (service_name) that is being connected to.
+        :type serviceName: str
+        :param  host: The host that the serviceName resides on
+        :type host: str
+        :param  port: the port that the database listener is attached to.
+        :type port: int
+        :param poolManager: the pool manager to use, defaults to the process
+                            wide pool manager
+        :type poolManager: DbPool.PoolManager
+        '''
+        if poolManager is None:
+            poolManager = DbPool.getPoolManager()
+        self.dbParams['username'] = user
+        self.dbParams['password'] = pswd
+        self.dbParams['instance'] = serviceName
+        try:
+            self.connObj = poolManager.acquire(user, pswd, serviceName, host,
+                                               port)
+        except cx_Oracle.DatabaseError as e:  # pylint: disable=no-member
+            msg = "problem encountered when trying to acquire a pooled " + \
+                  "connection to {0}:{1}/{2} using the id ({3}). Database " + \
+                  "error is {4}"
+            msg = msg.format(host, port, serviceName, user, e)
+            self.logger.error(msg)
+            raise ConnectionError(user, serviceName)
+        self.poolManager = poolManager
+        self.initConnection()
+
+    def connectShared(self, user, pswd, dsn, connRegistry=None):
+        '''
+        Gets the connection from the process wide connection registry, which
+        reuses a connection that an earlier DbMethods, LRDW or OraIterator
+        object opened with the same credentials and released, instead of
+        logging in again.  The connection is given back to the registry by
+        closeDbConnection().
+
+        :param  user: schema that you are using to connnect to the database
+        :type user: str
+        :param  pswd: password that goes with the schema
+        :type pswd: str
+        :param dsn: the dsn, or a TNSNamesParser.ConnectDescriptor
+        :param connRegistry: the registry to use, defaults to the process
+                             wide registry
+        :type connRegistry: DbPool.ConnectionRegistry
+        '''
+        if connRegistry is None:
+            connRegistry = DbPool.getConnectionRegistry()
+        dsn = getattr(dsn, 'dsn', dsn)
+        self.dbParams['username'] = user
+        self.dbParams['password'] = pswd
+        self.dbParams['instance'] = dsn
+        try:
+            self.connObj = connRegistry.acquire(user, pswd, dsn)
+        except cx_Oracle.DatabaseError as e:  # pylint: disable=no-member
+            msg = "problem encountered when trying to connect to {0} " + \
+                  "using the id ({1}). Database error is {2}"
+            msg = msg.format(dsn, user, e)
+            self.logger.error(msg)
+            raise ConnectionError(user, dsn)
+        self.connRegistry = connRegistry
+        self.initConnection()
+
+    def initConnection(self):
+        '''
+        Called once a new connection has been established.  Configures
+        the statement cache size on the connection and discards any
+        state that belonged to the previous connection.
+        '''
+        self.clearPreparedCursors()
+        self.clearDictionaryCache()
+        if self.stmtCacheSize is not None:
+            self.connObj.stmtcachesize = self.stmtCacheSize
+
+    def setStatementCacheSize(self, stmtCacheSize):
+        '''
+        sets the number of statements that the oracle client caches for the
+        connection, applied immediately if a connection exists and to any
+        connections made afterwards.
+
+        :param stmtCacheSize: number of statements to cache, 0 disables the
+                              statement cache
+        :type stmtCacheSize: int
+        '''
+        self.stmtCacheSize = stmtCacheSize
+        if self.connObj:
+            self.connObj.stmtcachesize = stmtCacheSize
+
+    def getPreparedCursor(self, sqlToExecute):
+        '''
+        Returns a cursor that has been prepared with the sql statement.
+        Cursors are kept in a least recently used cache keyed by the sql
+        text so statements that are run repeatedly are only parsed once.
+        The cache holds at most preparedCursorLimit cursors, when full
+        the least recently used cursor is closed.
+
+        :param  sqlToExecute: sql statement that the cursor is prepared for
+        :type sqlToExecute: str
+        :returns: cursor prepared with the statement
+        :rtype: cx_Oracle.Cursor
+        '''
+        if sqlToExecute in self.preparedCursors:
+            self.preparedCursorStats['hits'] += 1
+            self.preparedCursors.move_to_end(sqlToExecute)
+            return self.preparedCursors[sqlToExecute]
+        self.preparedCursorStats['misses'] += 1
+        curObj = self.connObj.cursor()
+        curObj.prepare(sqlToExecute)
+        self.preparedCursors[sqlToExecute] = curObj
+        while len(self.preparedCursors) > self.preparedCursorLimit:
+            _, oldCur = self.preparedCursors.popitem(last=False)
+            oldCur.close()
+            self.preparedCursorStats['evictions'] += 1
+        return curObj
+
+    def executePrepared(self, sqlToExecute, values=None):
+        '''
+        Same as executeOracleSql except that the statement is run on a
+        cached prepared cursor (see getPreparedCursor), intended for
+        lookups that are run over and over in a loop.  The cursor belongs
+        to the cache, so do not close it, and read the results before the
+        same statement is executed again as that will replace them.
+
+        :param  sqlToExecute: sql statement to execute
+        :type sqlToExecute: string
+        :param values: bind values for the statement
+        :returns: the prepared cursor containing the results
+        :rtype: cx_Oracle.Cursor
+        '''
+        curObj = self.getPreparedCursor(sqlToExecute)
+        return self.runStatement(curObj, sqlToExecute, values, prepared=True)
+
+    def getStatementCacheStats(self):
+        '''
+        :returns: dictionary with the prepared cursor cache hits, misses,
+                  evictions, current size, as well as the statement cache
+                  size configured on the connection.
+        :rtype: dict
+        '''
+        stats = dict(self.preparedCursorStats)
+        stats['size'] = len(self.preparedCursors)
+        stats['stmtcachesize'] = self.stmtCacheSize
+        return stats
+
+    def clearPreparedCursors(self):
+        '''
+        closes and discards all the cached prepared cursors
+        '''
+        for curObj in self.preparedCursors.values():
+            try:
+                curObj.close()
+            except cx_Oracle.Error:  # pylint: disable=no-member
+                # cursor belonged to a connection that is already gone
+                pass
+        self.preparedCursors = collections.OrderedDict()
+
+    def setProfiler(self, profiler):
+        '''
+        Attaches a profiler, once attached the time spent preparing,
+        executing and fetching the results of every statement run through
+        this object is reported to it.  Pass None to stop profiling.
+
+        :param profiler: the profiler to report to
+        :type profiler: QueryProfiler.QueryProfiler
+        '''
+        self.profiler = profiler
+
+    def runStatement(self, curObj, sqlToExecute, values=None, prepared=False):
+        '''
+        Executes a statement on a cursor.  All the methods in this class
+        execute statements through here so that they can be profiled.
+
+        :param curObj: the cursor to execute the statement on
+        :param  sqlToExecute: the statement to execute
+        :type sqlToExecute: str
+        :param values: bind values for the statement
+        :param prepared: true if the cursor has already been prepared with
+                         the statement
+        :type prepared: bool
+        :returns: the cursor, wrapped in a QueryProfiler.ProfiledCursor if a
+                  profiler is attached
+        '''
+        parseSeconds = 0.0
+        if prepared or self.profiler:
+            if not prepared:
+                startTime = time.time()
+                curObj.prepare(sqlToExecute)
+                parseSeconds = time.time() - startTime
+            execArgs = [None]
+        else:
+            execArgs = [sqlToExecute]
+        if values:
+            execArgs.append(values)
+        startTime = time.time()
+        curObj.execute(*execArgs)
+        if self.profiler:
+            self.profiler.recordExecute(sqlToExecute, values, parseSeconds,
+                                        time.time() - startTime)
+            curObj = self.profiler.wrapCursor(curObj, sqlToExecute)
+        return curObj
+
     def commit(self):
         '''
         commits the current connection
@@ -142,16 +401,105 @@ class DbMethods(object):
 
         This is the way to send DML or DDL statements to the database.
 
+        Statements with bind values are run on a cached prepared cursor, so
+        repeatedly running the same statement does not re-parse it.  DDL
+        and other statements without bind values are run on a new cursor
+        that is closed afterwards, so they do not displace the cached
+        cursors.
+
         :param  sqlToExecute: sql statement to be executed
         :type sqlToExecute: string
+        :param values: bind values for the statement
         '''
-        curObj = self.connObj.cursor()
         if values:
-            curObj.execute(sqlToExecute, values)
+            self.executePrepared(sqlToExecute, values)
         else:
-            curObj.execute(sqlToExecute)
-        curObj.close()
-        del curObj
+            curObj = self.runStatement(self.connObj.cursor(), sqlToExecute)
+            curObj.close()
+            del curObj
+
+    def executeMany(self, sqlToExecute, rows, batchSize=5000, inputSizes=None,
+                    batchErrors=False, arrayDMLRowCounts=False):
+        '''
+        Bulk version of executeOracleSqlNoReturn.  Takes an iterable of bind
+        values (tuples or dictionaries) and sends them to the database in
+        batches of batchSize rows using executemany(), so loading many rows
+        costs one round trip per batch instead of one per row.  The rows
+        are consumed lazily so a generator can be used to feed very large
+        loads.  Nothing is committed, call commit() when done.
+
+        :param  sqlToExecute: the DML statement to execute, using bind
+                              variables
+        :type sqlToExecute: str
+        :param rows: iterable of bind tuples or bind dictionaries
+        :param batchSize: the number of rows sent with each executemany()
+        :type batchSize: int
+        :param inputSizes: optional bind variable types / sizes passed to
+                           setinputsizes(), a list for positional binds or a
+                           dictionary for named binds.  Avoids cx_Oracle
+                           having to infer and re-allocate the bind buffers.
+        :param batchErrors: when true rows that fail are reported in the
+                            batch results instead of aborting the batch
+        :type batchErrors: bool
+        :param arrayDMLRowCounts: when true the number of rows affected by
+                                  each individual bind row is reported
+        :type arrayDMLRowCounts: bool
+
+        :returns: a list with a dictionary for each batch containing the keys:
+                    batch - the batch number
+                    rows - number of bind rows sent in the batch
+                    rowcount - rows affected by the batch
+                    seconds - time taken to execute the batch
+                    rowCounts - rows affected per bind row (only populated
+                                if arrayDMLRowCounts)
+                    errors - list of (row offset, error message) tuples,
+                             offsets are relative to the start of the
+                             input (only populated if batchErrors)
+        :rtype: list
+        '''
+        batchResults = []
+        rowIter = iter(rows)
+        rowOffset = 0
+        curObj = self.connObj.cursor()
+        try:
+            if inputSizes:
+                if isinstance(inputSizes, dict):
+                    curObj.setinputsizes(**inputSizes)
+                else:
+                    curObj.setinputsizes(*inputSizes)
+            for batchCnt in itertools.count():
+                batch = list(itertools.islice(rowIter, batchSize))
+                if not batch:
+                    break
+                startTime = time.time()
+                curObj.executemany(sqlToExecute, batch,
+                                   batcherrors=batchErrors,
+                                   arraydmlrowcounts=arrayDMLRowCounts)
+                batchResult = {'batch': batchCnt,
+                               'rows': len(batch),
+                               'rowcount': curObj.rowcount,
+                               'seconds': time.time() - startTime,
+                               'rowCounts': [],
+                               'errors': []}
+                if self.profiler:
+                    self.profiler.recordExecute(sqlToExecute, None, 0.0,
+                                                batchResult['seconds'])
+                if arrayDMLRowCounts:
+                    batchResult['rowCounts'] = curObj.getarraydmlrowcounts()
+                if batchErrors:
+                    for error in curObj.getbatcherrors():
+                        batchResult['errors'].append(
+                            (rowOffset + error.offset, error.message))
+                self.logger.debug("batch %s: %s rows in %.3f seconds, %s errors",
+                                  batchCnt, len(batch), batchResult['seconds'],
+                                  len(batchResult['errors']))
+                batchResults.append(batchResult)
+                rowOffset += len(batch)
+        finally:
+            curObj.close()
+        self.logger.info("executemany sent %s rows in %s batches", rowOffset,
+                         len(batchResults))
+        return batchResults
 
     def executeOracleSql(self, sqlToExecute, values=None, outputsize=None):
         '''
@@ -168,11 +516,276 @@ class DbMethods(object):
         curObj = self.connObj.cursor()
         if outputsize:
             curObj.setoutputsize(outputsize)
-        if values:
-            curObj.execute(sqlToExecute, values)
-        else:
-            curObj.execute(sqlToExecute)
-        return curObj
+        return self.runStatement(curObj, sqlToExecute, values)
+
+    def numberOutputTypeHandler(self, cursor, name, defaultType, size,  # pylint: disable=unused-argument, too-many-arguments
+                                precision, scale):
+        '''
+        cx_Oracle output type handler that fetches NUMBER columns with a
+        positive scale as native floats, avoiding the conversion of every
+        value through a string.  Unconstrained NUMBER columns (scale -127)
+        can hold integers larger than a double represents exactly, so they
+        are left on the default path.
+        '''
+        if defaultType == cx_Oracle.NUMBER and scale and scale > 0:  # pylint: disable=no-member
+            return cursor.var(cx_Oracle.NATIVE_FLOAT,  # pylint: disable=no-member
+                              arraysize=cursor.arraysize)
+        return None
+
+    def getColumnTypeCode(self, colDesc):
+        '''
+        :param colDesc: a column description from cursor.description
+        :returns: the array.array type code that the column can be stored
+                  in, or None if the column is not numeric
+        '''
+        colType, precision, scale = colDesc[1], colDesc[4], colDesc[5]
+        if colType == cx_Oracle.NATIVE_FLOAT:  # pylint: disable=no-member
+            return self.const.floatTypeCode
+        if colType == cx_Oracle.NUMBER:  # pylint: disable=no-member
+            if scale == 0 and precision and precision <= 18:
+                return self.const.intTypeCode
+            if scale and scale > 0:
+                return self.const.floatTypeCode
+        return None
+
+    def executeOracleSqlColumnar(self, sqlToExecute, values=None,
+                                 arraysize=None, asNumpy=False):
+        '''
+        Executes a query and returns the results organized by column
+        instead of by row, allowing comparisons and checksums to be
+        calculated on whole columns instead of walking row tuples.
+
+        Rows are retrieved with large array fetches.  Numeric columns are
+        stored in array.array objects (64 bit ints for integer columns,
+        doubles for columns with a positive scale) which expose the buffer
+        protocol, so they can be handed to numpy.frombuffer() or
+        pyarrow.py_buffer() without copying.  A numeric column that
+        contains nulls, or values that do not fit in the array type, is
+        returned as a list instead.  All other columns, including
+        unconstrained NUMBER columns, are returned as lists.
+
+        :param  sqlToExecute: sql statement to execute
+        :type sqlToExecute: string
+        :param values: bind values for the statement
+        :param arraysize: number of rows to retrieve per round trip,
+                          defaults to DbLibConst.columnarArraySize
+        :type arraysize: int
+        :param asNumpy: when true the columns are returned as numpy arrays,
+                        requires numpy.  Numeric columns with nulls become
+                        float arrays with nulls as nan, other columns become
+                        object arrays.
+        :type asNumpy: bool
+
+        :returns: ordered dictionary where the keys are the column names and
+                  the values are the column data
+        :rtype: collections.OrderedDict
+        '''
+        if not arraysize:
+            arraysize = self.const.columnarArraySize
+        curObj = self.connObj.cursor()
+        curObj.arraysize = arraysize
+        curObj.outputtypehandler = self.numberOutputTypeHandler
+        curObj = self.runStatement(curObj, sqlToExecute, values)
+
+        colNames = [colDesc[0] for colDesc in curObj.description]
+        columns = []
+        for colDesc in curObj.description:
+            typeCode = self.getColumnTypeCode(colDesc)
+            if typeCode:
+                columns.append(array.array(typeCode))
+            else:
+                columns.append([])
+
+        rowCnt = 0
+        while True:
+            rows = curObj.fetchmany()
+            if not rows:
+                break
+            rowCnt += len(rows)
+            for colCnt, colValues in enumerate(zip(*rows)):
+                column = columns[colCnt]
+                if isinstance(column, array.array):
+                    try:
+                        # nulls can't be stored in an array, the batch is
+                        # converted on its own so a failure leaves the
+                        # column untouched
+                        if None in colValues:
+                            raise TypeError('null value')
+                        colValues = array.array(column.typecode, colValues)
+                    except (TypeError, OverflowError):
+                        column = columns[colCnt] = column.tolist()
+                column.extend(colValues)
+        curObj.close()
+        self.logger.debug("fetched %s rows into %s columns", rowCnt,
+                          len(columns))
+
+        if asNumpy:
+            columns = [self.columnToNumpy(column) for column in columns]
+        return collections.OrderedDict(zip(colNames, columns))
+
+    def columnToNumpy(self, column):
+        '''
+        converts a column returned by executeOracleSqlColumnar to a numpy
+        array.
+
+        :param column: the array.array or list with the column values
+        :returns: numpy array
+        '''
+        import numpy  # pylint: disable=import-outside-toplevel
+        if isinstance(column, array.array):
+            return numpy.frombuffer(column,
+                                    dtype=self.const.numpyDtypes[column.typecode])
+        numeric = all([isinstance(val, (int, float)) or val is None
+                       for val in column])
+        if numeric and column:
+            return numpy.array([numpy.nan if val is None else val
+                                for val in column], dtype='float64')
+        return numpy.array(column, dtype=object)
+
+    def lobOutputTypeHandler(self, cursor, name, defaultType, size,  # pylint: disable=unused-argument, too-many-arguments
+                             precision, scale):
+        '''
+        cx_Oracle output type handler that fetches CLOB columns as strings
+        and BLOB columns as bytes along with the rest of the row, instead of
+        as LOB locators that each require another round trip to read.
+        '''
+        if defaultType in (cx_Oracle.CLOB, cx_Oracle.NCLOB):  # pylint: disable=no-member
+            return cursor.var(cx_Oracle.LONG_STRING,  # pylint: disable=no-member
+                              arraysize=cursor.arraysize)
+        if defaultType == cx_Oracle.BLOB:  # pylint: disable=no-member
+            return cursor.var(cx_Oracle.LONG_BINARY,  # pylint: disable=no-member
+                              arraysize=cursor.arraysize)
+        return None
+
+    def describeQuery(self, sqlToExecute):
+        '''
+        parses the query, without executing it, to retrieve the description
+        of the columns it returns.
+
+        :param  sqlToExecute: the query
+        :type sqlToExecute: str
+        :returns: the cursor description
+        :rtype: list
+        '''
+        curObj = self.connObj.cursor()
+        curObj.parse(sqlToExecute)
+        description = curObj.description
+        curObj.close()
+        return description
+
+    def getGeometryColumns(self, description):
+        '''
+        :param description: the cursor description of a query
+        :returns: list of the names of the SDO_GEOMETRY columns
+        :rtype: list
+        '''
+        geomColumns = []
+        for colDesc in description:
+            typeName = getattr(colDesc[1], 'name', None)
+            if typeName == self.const.geometryTypeName:
+                geomColumns.append(colDesc[0])
+        return geomColumns
+
+    def getWkbSql(self, sqlToExecute, colNames, geomColumns):
+        '''
+        wraps a query so that the geometry columns are converted to well
+        known binary by the database, using SDO_UTIL.TO_WKBGEOMETRY.  The
+        columns of the query are referenced by position, through a column
+        alias list, so queries that return the same column name more than
+        once, or expressions, can be wrapped.  The columns keep their names
+        in the results.
+
+        :param sqlToExecute: the query
+        :param colNames: the names of all the columns the query returns, in
+                         order
+        :param geomColumns: the names of the columns to convert
+        :returns: the wrapped query
+        :rtype: str
+        '''
+        geomColumns = [geomColumn.upper() for geomColumn in geomColumns]
+        aliases = []
+        selectList = []
+        for cnt, colName in enumerate(colNames):
+            alias = 'WKBCOL{0}'.format(cnt)
+            aliases.append(alias)
+            if colName.upper() in geomColumns:
+                selectList.append('SDO_UTIL.TO_WKBGEOMETRY(wkbsrc.{0}) "{1}"'.format(
+                    alias, colName))
+            else:
+                selectList.append('wkbsrc.{0} "{1}"'.format(alias, colName))
+        return 'WITH wkbsrc ({0}) AS ({1}) SELECT {2} FROM wkbsrc'.format(
+            ', '.join(aliases), sqlToExecute, ', '.join(selectList))
+
+    def executeOracleSqlInlineLobs(self, sqlToExecute, values=None,  # pylint: disable=too-many-arguments
+                                   arraysize=None, convertGeometry=True,
+                                   geomColumns=None):
+        '''
+        Executes a query returning the cursor, like executeOracleSql, with
+        the cursor configured to fetch LOB values inline: CLOBs are returned
+        as str and BLOBs as bytes, retrieved in array fetches along with the
+        rest of the row.  SDO_GEOMETRY columns are converted to WKB by the
+        database, so they also arrive as bytes in the same array fetch
+        instead of as objects.
+
+        Every value is fetched in full, for tables with LOB values that are
+        too large to hold in memory use executeOracleSql and read the LOBs
+        with readLob.
+
+        :param  sqlToExecute: sql statement to execute
+        :type sqlToExecute: string
+        :param values: bind values for the statement
+        :param arraysize: number of rows to retrieve per round trip,
+                          defaults to DbLibConst.lobArraySize
+        :type arraysize: int
+        :param convertGeometry: when true SDO_GEOMETRY columns are converted
+                                to WKB
+        :type convertGeometry: bool
+        :param geomColumns: names of the geometry columns to convert, if not
+                            provided they are found by parsing the query
+        :type geomColumns: list
+
+        :returns: database cursor object that contains the results of the sql
+                  statement
+        '''
+        if convertGeometry:
+            description = self.describeQuery(sqlToExecute)
+            if geomColumns is None:
+                geomColumns = self.getGeometryColumns(description)
+            if geomColumns:
+                colNames = [colDesc[0] for colDesc in description]
+                sqlToExecute = self.getWkbSql(sqlToExecute, colNames,
+                                              geomColumns)
+                self.logger.debug("converting the columns %s to WKB",
+                                  geomColumns)
+        if not arraysize:
+            arraysize = self.const.lobArraySize
+        curObj = self.connObj.cursor()
+        curObj.arraysize = arraysize
+        curObj.outputtypehandler = self.lobOutputTypeHandler
+        return self.runStatement(curObj, sqlToExecute, values)
+
+    def readLob(self, lob, chunkSize=None):
+        '''
+        generator that reads a LOB in chunks, for values that are too large
+        to read in a single call.  Chunks are a multiple of the LOB's chunk
+        size so that each read is aligned with the way it is stored.
+
+        :param lob: the cx_Oracle LOB object
+        :param chunkSize: the number of characters (CLOB) or bytes (BLOB) to
+                          read with each round trip
+        :type chunkSize: int
+        :returns: generator of str or bytes
+        '''
+        if not chunkSize:
+            chunkSize = lob.getchunksize() * self.const.lobChunksPerRead
+        # LOB offsets start at 1
+        offset = 1
+        while True:
+            data = lob.read(offset, chunkSize)
+            if not data:
+                break
+            yield data
+            offset += len(data)
 
     def executeProcedure(self, command, args):
         self.logger.debug("trying to execute procedure: %s", command)
@@ -185,7 +798,11 @@ class DbMethods(object):
         # creating cursor...
         curObj = self.connObj.cursor()
         # curObj.callproc('DBMS_MVIEW.REFRESH', [schemaMview, 'c'])
+        startTime = time.time()
         curObj.callproc(command, args)
+        if self.profiler:
+            self.profiler.recordExecute('CALL ' + command, args, 0.0,
+                                        time.time() - startTime)
         self.logger.debug("ran procedure: %s with args %s ", command, args)
         return curObj
 
@@ -199,12 +816,19 @@ class DbMethods(object):
         curObj = self.connObj.cursor()
         return curObj
 
-    def objExists(self, schema, objType, objName, connObj=None):  # pylint: disable=too-many-branches
+    def objExists(self, schema, objType, objName, connObj=None,  # pylint: disable=too-many-branches
+                  useCache=False):
         '''
         Receives a schema name, database object type, database object
         name and a connection object.  Returns a boolean value indicating
         whether there is an object with that name and type in the
-        database
+        database.
+
+        If useCache is set and the dictionary cache has been enabled with
+        enableDictionaryCache() the check is answered from the cached
+        snapshot of the schema's objects instead.  The first check against
+        a schema loads the snapshot of all its objects from ALL_OBJECTS, so
+        only use it when checking many objects in the same schema.
 
         :param  schema: schema name
         :type schema: string
@@ -215,11 +839,18 @@ class DbMethods(object):
         :param  connObj: database connection object that implements the
                          python database api 2.0.
         :type connObj: database connection object
+        :param useCache: answer the check from the dictionary cache, see
+                         above
+        :type useCache: bool
 
         :returns: Describe the return value
         :rtype: boolean
         '''
         curObj = None
+        if useCache and self.dictCacheTTL and schema and connObj is None:
+            # answer from the cached data dictionary snapshot
+            objTriple = (schema, objType, objName)
+            return self.objsExist([objTriple])[objTriple]
         if connObj is None:
             connObj = self.connObj
 
@@ -243,15 +874,13 @@ class DbMethods(object):
             if schema:
                 whereClause = whereClause + ' and  owner = \'' + schema.upper() + '\''
             sql = 'select index_name from all_indexes ' + whereClause
-            curObj = connObj.cursor()
-            curObj.execute(sql)
+            curObj = self.runStatement(connObj.cursor(), sql)
         elif objType.upper() == 'VIEW' or objType.upper() == 'VIEWS':
             whereClause = ' where view_name = \'' + objName.upper() + '\''
             if schema:
                 whereClause = whereClause + ' and  owner = \'' + schema.upper() + '\''
             sql = 'select view_name from all_views ' + whereClause
-            curObj = connObj.cursor()
-            curObj.execute(sql)
+            curObj = self.runStatement(connObj.cursor(), sql)
         elif objType.upper() == 'MATERIALIZEDVIEW' or objType.upper() == 'MV' or \
              objType.upper() == 'MVIEW' or objType.upper() == 'MATERIALIZED VIEW':
             # all_mviews
@@ -259,8 +888,7 @@ class DbMethods(object):
             if schema:
                 whereClause = whereClause + ' and  owner = \'' + schema.upper() + '\''
             sql = 'select MVIEW_NAME from all_mviews ' + whereClause
-            curObj = connObj.cursor()
-            curObj.execute(sql)
+            curObj = self.runStatement(connObj.cursor(), sql)
         elif objType.upper() == 'DB_LINK' or objType.upper() == 'DBLINK':
             whereClause = ' where DB_LINK = \'' + objName.upper() + '\''
             # table = 'DBA_DB_LINKS'
@@ -269,10 +897,9 @@ class DbMethods(object):
                 whereClause = whereClause + ' and  owner = \'' + schema.upper() + '\''
             sql = 'select DB_LINK from {0} {1} '.format(table, whereClause)
             self.logger.debug("sql: %s", sql)
-            curObj = connObj.cursor()
-            curObj.execute(sql)
+            curObj = self.runStatement(connObj.cursor(), sql)
         else:
-            raise 'FunctionalityNotDefinedError'( 'Functionality for the object type ' + objType + \
+            raise FunctionalityNotDefinedError('Functionality for the object type ' + objType + \
                   ' is not yet defined!')
         row = curObj.fetchone()
         retval = bool(row)
@@ -280,6 +907,116 @@ class DbMethods(object):
         del curObj
         return retval
 
+    def enableDictionaryCache(self, ttl=300):
+        '''
+        Turns on caching of the data dictionary snapshots used by objsExist.
+        Once a schema's objects have been loaded, repeat checks against that
+        schema are answered from memory until the snapshot is ttl seconds
+        old.
+
+        :param ttl: number of seconds a snapshot is considered current
+        :type ttl: int
+        '''
+        self.dictCacheTTL = ttl
+
+    def clearDictionaryCache(self):
+        '''
+        discards any cached data dictionary snapshots, forcing objsExist to
+        reload them.  Called whenever a new connection is made.
+        '''
+        self.dictCache = {}
+
+    def getSchemaObjects(self, schema):
+        '''
+        Retrieves a snapshot of the objects owned by a schema from
+        ALL_OBJECTS.  If the dictionary cache is enabled the snapshot is
+        cached for the configured ttl.
+
+        :param schema: the schema / owner who's objects are to be retrieved
+        :type schema: str
+        :returns: set of (object_type, object_name) tuples
+        :rtype: set
+        '''
+        schema = schema.upper()
+        if self.dictCacheTTL and schema in self.dictCache:
+            loadTime, objs = self.dictCache[schema]
+            if time.time() - loadTime < self.dictCacheTTL:
+                return objs
+        objTypes = sorted(set(self.const.objTypes.values()))
+        typeBinds = [':type{0}'.format(cnt) for cnt in range(len(objTypes))]
+        sql = 'SELECT object_type, object_name FROM all_objects ' + \
+              'WHERE owner = :owner AND object_type IN ({0})'
+        sql = sql.format(', '.join(typeBinds))
+        binds = {'owner': schema}
+        for cnt, objType in enumerate(objTypes):
+            binds['type{0}'.format(cnt)] = objType
+        curObj = self.connObj.cursor()
+        curObj.arraysize = self.const.dictArraySize
+        curObj = self.runStatement(curObj, sql, binds)
+        objs = set(curObj.fetchall())
+        curObj.close()
+        self.logger.debug("loaded %s objects for the schema %s", len(objs),
+                          schema)
+        if self.dictCacheTTL:
+            self.dictCache[schema] = (time.time(), objs)
+        return objs
+
+    def objsExist(self, objList):
+        '''
+        Bulk version of objExists.  Receives a list of (schema, object type,
+        object name) triples and resolves them with a handful of bind
+        variable queries against ALL_OBJECTS: one per distinct schema, plus
+        one per batch of object names for triples with no schema.  Enable
+        the dictionary cache with enableDictionaryCache() to have repeat
+        checks against the same schemas answered from memory.
+
+        :param objList: list of (schema, objType, objName) triples, the
+                        object types accepted are the same as objExists.
+                        The schema can be None in which case an object
+                        with that name in any schema will match.
+        :type objList: list
+
+        :returns: a dictionary where the keys are the triples from objList
+                  and the values are booleans indicating if the object
+                  exists
+        :rtype: dict
+        '''
+        retVal = {}
+        bySchema = {}
+        noSchema = []
+        for objTriple in objList:
+            schema, objType, objName = objTriple
+            if objType.upper() not in self.const.objTypes:
+                raise FunctionalityNotDefinedError(
+                    'Functionality for the object type ' + objType +
+                    ' is not yet defined!')
+            dictObj = (self.const.objTypes[objType.upper()], objName.upper())
+            if schema:
+                bySchema.setdefault(schema.upper(), []).append(
+                    (objTriple, dictObj))
+            else:
+                noSchema.append((objTriple, dictObj))
+
+        for schema in bySchema:
+            schemaObjs = self.getSchemaObjects(schema)
+            for objTriple, dictObj in bySchema[schema]:
+                retVal[objTriple] = dictObj in schemaObjs
+
+        if noSchema:
+            names = sorted(set([dictObj[1] for _, dictObj in noSchema]))
+            nameBinds = [':name{0}'.format(cnt)
+                         for cnt in range(self.const.inListSize)]
+            sql = 'SELECT DISTINCT object_type, object_name FROM all_objects ' + \
+                  'WHERE object_name IN ({0})'.format(', '.join(nameBinds))
+            found = set()
+            for chunk in self.getInListChunks(names):
+                curObj = self.executeOracleSql(sql, chunk)
+                found.update(curObj.fetchall())
+                curObj.close()
+            for objTriple, dictObj in noSchema:
+                retVal[objTriple] = dictObj in found
+        return retVal
+
     def getDbLinks(self, schema):
         '''
         ??? not sure why this is here, leaving in case its required for now.
@@ -288,7 +1025,32 @@ class DbMethods(object):
         msg = msg.format(schema)
         self.logger.error(msg)
 
-    def getFromDb(self, dataList, dbTable, dbCodeCol, dbValuesCol):
+    def getInListChunks(self, values, chunkSize=None):
+        '''
+        Splits a list of values up into chunks that can be bound to a fixed
+        size IN clause.  The last chunk is padded with None values (which
+        never match anything in an IN clause) so that every chunk has
+        exactly chunkSize elements.  Keeping the number of bind variables
+        constant means the sql text never changes, so the database can
+        reuse the parsed statement, and the 1000 element IN list limit is
+        never exceeded.
+
+        :param values: the values to split up
+        :type values: list
+        :param chunkSize: number of values per chunk, defaults to
+                          DbLibConst.inListSize
+        :type chunkSize: int
+
+        :returns: generator yielding lists of chunkSize values
+        '''
+        if not chunkSize:
+            chunkSize = self.const.inListSize
+        for start in range(0, len(values), chunkSize):
+            chunk = values[start:start + chunkSize]
+            yield chunk + [None] * (chunkSize - len(chunk))
+
+    def getFromDb(self, dataList, dbTable, dbCodeCol, dbValuesCol, asDict=False,
+                  chunkSize=None):
         '''
         This is generic method for extracting information from the
         database.  Creating a generic method so that I don't have to
@@ -299,6 +1061,10 @@ class DbMethods(object):
         are necessary for the normalization of the information in
         the database
 
+        The values are looked up in fixed size chunks (see getInListChunks)
+        so any number of values can be provided and the same statement is
+        reused for every chunk.
+
         :param  dataList: a list of the values that are to be entered
                           into the database.
         :type dataList: list
@@ -316,11 +1082,20 @@ class DbMethods(object):
                           be enteered.  This is where the values described in
                           the parameter dataList exist.
         :type dbValues: string
-        '''
-        def xrange(x):
-            return iter(range(x))
+        :param asDict: when true the results are returned as a dictionary
+                       where the keys are the values and the values are the
+                       corresponding codes.
+        :type asDict: bool
+        :param chunkSize: number of values looked up per query, defaults to
+                          DbLibConst.inListSize
+        :type chunkSize: int
 
-        in_clause = ', '.join([':id%d' % x for x in xrange(len(dataList))])
+        :returns: a list of [code, value] lists, or a dictionary of
+                  value: code if asDict is set
+        '''
+        if not chunkSize:
+            chunkSize = self.const.inListSize
+        in_clause = ', '.join([':id%d' % x for x in range(chunkSize)])
         # dbFormattedList = self.quoteStrings(dataList)
         sql = 'SELECT ' + \
               dbCodeCol + ' codes, ' + \
@@ -332,23 +1107,37 @@ class DbMethods(object):
 
         self.logger.debug("sql: " + str(sql))
 
-        # if type(dataList) is not list:
-        if not isinstance(dataList, list):
-            dataList = list(dataList)
-            # print 'list dataList:', dataList
+        # remove duplicates while preserving the order of the values
+        uniqueValues = []
+        seen = set()
+        for value in dataList:
+            if value not in seen:
+                seen.add(value)
+                uniqueValues.append(value)
 
-        cur = self.executeOracleSql(sql, dataList)
         retList = []
-        for line in cur:
-            inList = [line[0], line[1]]
-            retList.append(inList)
+        for chunk in self.getInListChunks(uniqueValues, chunkSize):
+            cur = self.executePrepared(sql, chunk)
+            for line in cur:
+                retList.append([line[0], line[1]])
+        if asDict:
+            return dict([(line[1], line[0]) for line in retList])
         return retList
 
     def closeDbConnection(self):
         '''
-        closes the database connection
+        closes the database connection, if the connection came from a
+        session pool or the connection registry it is released back to it
         '''
-        self.connObj.close()
+        self.clearPreparedCursors()
+        if self.poolManager:
+            self.poolManager.release(self.connObj)
+            self.poolManager = None
+        elif self.connRegistry:
+            self.connRegistry.release(self.connObj)
+            self.connRegistry = None
+        else:
+            self.connObj.close()
 
 
 class ConnectionError(cx_Oracle.DatabaseError):  # pylint: disable=too-few-public-methods, no-member
@@ -365,5 +1154,3 @@ class ConnectionError(cx_Oracle.DatabaseError):  # pylint: disable=too-few-publi
                   "{1} and the password provided"
             msg = msg.format(servicename, schema)
         super(ConnectionError, self).__init__(msg)
-
-
@@ -0,0 +1,546 @@
+'''
+Created on Oct 18, 2026
+
+Session pooling for the DB package.  Rather than opening a brand new
+connection every time a script connects to the same database the
+PoolManager keeps a cx_Oracle.SessionPool for each user / password /
+service name / host / port combination and hands out sessions from it.
+
+example:
+    poolMgr = DbPool.getPoolManager()
+    conn = poolMgr.acquire('schema', 'pswd', 'servicename', 'host', 1521)
+    ... use the connection ...
+    poolMgr.release(conn)
+
+For scripts that connect to the same database through several of the
+helpers (DbLib, LRDW, OraIterator) the ConnectionRegistry keeps the
+standalone connections they release open for reuse, so the login is only
+paid once:
+    registry = DbPool.getConnectionRegistry()
+    registry.warmUp('schema', 'pswd', dsn)
+    conn = registry.acquire('schema', 'pswd', dsn)
+    ... use the connection ...
+    registry.release(conn)
+'''
+import hashlib
+import logging
+import threading
+import time
+
+import cx_Oracle
+
+
+class PoolConst(object):
+    '''
+    default sizing for the session pools
+    '''
+    minSessions = 1
+    maxSessions = 4
+    increment = 1
+    defaultPort = 1521
+    # seconds a released connection is kept by the ConnectionRegistry
+    idleTimeout = 300
+    # max number of released connections kept for each database / user
+    maxIdle = 4
+
+
+class PoolStats(object):
+    '''
+    simple counters that are kept for each pool
+    '''
+
+    def __init__(self):
+        self.acquired = 0
+        self.released = 0
+        self.dropped = 0
+        self.healthCheckFailures = 0
+        self.acquireSeconds = 0.0
+
+    def asDict(self):
+        '''
+        :return: the statistics as a dictionary
+        '''
+        return {'acquired': self.acquired,
+                'released': self.released,
+                'dropped': self.dropped,
+                'healthCheckFailures': self.healthCheckFailures,
+                'acquireSeconds': self.acquireSeconds}
+
+
+class PoolManager(object):
+    '''
+    Manages a cx_Oracle.SessionPool for every distinct
+    user / password / service name / host / port combination that sessions
+    are requested for.  When a password is changed a new pool is created
+    for the new password, and the pool for the old password is closed once
+    none of its sessions are checked out.
+
+    :ivar minSessions: minimum number of sessions kept open by each pool
+    :ivar maxSessions: maximum number of sessions a pool will open
+    :ivar increment: number of sessions opened when a pool needs to grow
+    :ivar healthCheck: when true sessions are pinged on checkout and
+                       replaced if they are no longer usable
+    '''
+
+    def __init__(self, minSessions=PoolConst.minSessions,
+                 maxSessions=PoolConst.maxSessions,
+                 increment=PoolConst.increment, healthCheck=True):
+        self.logger = logging.getLogger(__name__)
+        self.minSessions = minSessions
+        self.maxSessions = maxSessions
+        self.increment = increment
+        self.healthCheck = healthCheck
+        self.pools = {}
+        self.stats = {}
+        # keeps track of which pool a checked out connection came from
+        self.checkedOut = {}
+        self.lock = threading.Lock()
+
+    def getPoolKey(self, user, pswd, serviceName, host,
+                   port=PoolConst.defaultPort):
+        '''
+        :return: the key used to identify the pool for the given connection
+                 parameters, the password is only kept as a digest
+        '''
+        pswdDigest = hashlib.sha256(pswd.encode('utf-8')).hexdigest()
+        return (user.upper(), serviceName.upper(), host.lower(), int(port),
+                pswdDigest)
+
+    def closeRetiredPools(self, key):
+        '''
+        closes the pools for the same user and database as the key that were
+        created with a different password, unless they still have sessions
+        checked out.  Must be called while holding the lock.
+        '''
+        for oldKey in list(self.pools):
+            if oldKey[:4] == key[:4] and oldKey != key and \
+                    oldKey not in self.checkedOut.values():
+                self.logger.info("closing the session pool for %s@%s:%s/%s " +
+                                 "created with a previous password",
+                                 oldKey[0], oldKey[2], oldKey[3], oldKey[1])
+                self.pools.pop(oldKey).close(force=True)
+                del self.stats[oldKey]
+
+    def getPool(self, user, pswd, serviceName, host,
+                port=PoolConst.defaultPort):
+        '''
+        returns the session pool for the connection parameters, creating it
+        if it does not already exist.
+
+        :param  user: schema that you are using to connnect to the database
+        :type user: str
+        :param  pswd: password that goes with the schema
+        :type pswd: str
+        :param  serviceName: The database service name being connected to.
+        :type serviceName: str
+        :param  host: The host that the serviceName resides on
+        :type host: str
+        :param  port: the port that the database listener is attached to.
+        :type port: int
+        :return: the session pool
+        :rtype: cx_Oracle.SessionPool
+        '''
+        key = self.getPoolKey(user, pswd, serviceName, host, port)
+        with self.lock:
+            if key not in self.pools:
+                self.closeRetiredPools(key)
+                dsn = cx_Oracle.makedsn(host, port, service_name=serviceName)  # pylint: disable=no-member
+                self.logger.info("creating a session pool for %s@%s:%s/%s",
+                                 user, host, port, serviceName)
+                self.pools[key] = cx_Oracle.SessionPool(  # pylint: disable=no-member
+                    user, pswd, dsn, min=self.minSessions,
+                    max=self.maxSessions, increment=self.increment,
+                    threaded=True,
+                    getmode=cx_Oracle.SPOOL_ATTRVAL_WAIT)  # pylint: disable=no-member
+                self.stats[key] = PoolStats()
+            pool = self.pools[key]
+        return pool
+
+    def acquire(self, user, pswd, serviceName, host,
+                port=PoolConst.defaultPort):
+        '''
+        checks a session out of the pool for the connection parameters.
+        If health checks are enabled the session is pinged and replaced
+        with a new one if the ping fails.
+
+        :return: a connection that must be given back using release()
+        :rtype: cx_Oracle.Connection
+        '''
+        key = self.getPoolKey(user, pswd, serviceName, host, port)
+        pool = self.getPool(user, pswd, serviceName, host, port)
+        healthCheckFailures = 0
+        startTime = time.time()
+        conn = pool.acquire()
+        if self.healthCheck:
+            try:
+                conn.ping()
+            except cx_Oracle.DatabaseError as e:  # pylint: disable=no-member
+                self.logger.warning("dropping unusable pooled session for " +
+                                    "%s: %s", key, e)
+                healthCheckFailures = 1
+                pool.drop(conn)
+                conn = pool.acquire()
+        acquireSeconds = time.time() - startTime
+        with self.lock:
+            self.checkedOut[id(conn)] = key
+            # the stats are looked up while holding the lock as the pool
+            # may have been retired by another thread in the meantime
+            stats = self.stats.get(key)
+            if stats:
+                stats.healthCheckFailures += healthCheckFailures
+                stats.dropped += healthCheckFailures
+                stats.acquireSeconds += acquireSeconds
+                stats.acquired += 1
+        return conn
+
+    def release(self, conn):
+        '''
+        gives a connection that was retrieved with acquire() back to the
+        pool it came from.  Any uncommitted work is rolled back by the pool.
+
+        :param conn: the connection to release
+        '''
+        with self.lock:
+            key = self.checkedOut.get(id(conn))
+            pool = self.pools.get(key)
+        if key is None:
+            msg = 'the connection {0} was not acquired from this pool manager'
+            msg = msg.format(conn)
+            self.logger.error(msg)
+            raise ValueError(msg)
+        # the connection stays in checkedOut until it is back in the pool so
+        # the pool can not be retired while the release is in progress
+        pool.release(conn)
+        with self.lock:
+            self.checkedOut.pop(id(conn), None)
+            stats = self.stats.get(key)
+            if stats:
+                stats.released += 1
+
+    def isPooled(self, conn):
+        '''
+        :return: boolean indicating whether the connection is currently
+                 checked out of one of the pools
+        '''
+        return id(conn) in self.checkedOut
+
+    def getStatistics(self):
+        '''
+        :return: a dictionary with an entry for each pool containing the
+                 counters kept by the manager as well as the number of
+                 open and busy sessions reported by the pool itself.
+        '''
+        retVal = {}
+        with self.lock:
+            for key, pool in self.pools.items():
+                poolStats = self.stats[key].asDict()
+                poolStats['opened'] = pool.opened
+                poolStats['busy'] = pool.busy
+                poolStats['min'] = pool.min
+                poolStats['max'] = pool.max
+                retVal[key] = poolStats
+        return retVal
+
+    def closeAll(self):
+        '''
+        closes all of the pools managed by this object
+        '''
+        with self.lock:
+            for key, pool in self.pools.items():
+                self.logger.debug("closing the session pool: %s", key)
+                pool.close(force=True)
+            self.pools = {}
+            self.stats = {}
+            self.checkedOut = {}
+
+
+_POOL_MANAGER = None
+_POOL_MANAGER_LOCK = threading.Lock()
+
+
+def getPoolManager():
+    '''
+    :return: the process wide PoolManager, created on first use
+    :rtype: PoolManager
+    '''
+    global _POOL_MANAGER  # pylint: disable=global-statement
+    with _POOL_MANAGER_LOCK:
+        if _POOL_MANAGER is None:
+            _POOL_MANAGER = PoolManager()
+    return _POOL_MANAGER
+
+
+class ConnectionStats(object):
+    '''
+    counters kept by the ConnectionRegistry for each database / user
+    '''
+
+    def __init__(self):
+        self.connects = 0
+        self.connectSeconds = 0.0
+        self.maxConnectSeconds = 0.0
+        self.acquired = 0
+        self.reused = 0
+        self.released = 0
+        self.pingFailures = 0
+        self.idleClosed = 0
+
+    def asDict(self):
+        '''
+        :return: the statistics as a dictionary
+        '''
+        return {'connects': self.connects,
+                'connectSeconds': self.connectSeconds,
+                'maxConnectSeconds': self.maxConnectSeconds,
+                'acquired': self.acquired,
+                'reused': self.reused,
+                'released': self.released,
+                'pingFailures': self.pingFailures,
+                'idleClosed': self.idleClosed}
+
+
+class ConnectionRegistry(object):
+    '''
+    Keeps the standalone connections that are released to it open so that
+    they can be handed out again to the next request for the same user,
+    password and dsn, instead of logging in again.  Connections are only
+    opened when they are first requested, or ahead of time by warmUp().
+
+    :ivar idleTimeout: released connections that are not reused within
+                       this many seconds are closed
+    :ivar maxIdle: max number of released connections kept for each
+                   user / password / dsn
+    :ivar pingBeforeUse: when true released connections are pinged before
+                         they are reused and replaced if they are no longer
+                         usable
+    '''
+
+    def __init__(self, idleTimeout=PoolConst.idleTimeout,
+                 maxIdle=PoolConst.maxIdle, pingBeforeUse=True):
+        self.logger = logging.getLogger(__name__)
+        self.idleTimeout = idleTimeout
+        self.maxIdle = maxIdle
+        self.pingBeforeUse = pingBeforeUse
+        # key -> list of (connection, time released), most recent last
+        self.idle = {}
+        self.stats = {}
+        # keeps track of the key of the connections that are checked out
+        self.checkedOut = {}
+        self.lock = threading.Lock()
+
+    def getKey(self, user, pswd, dsn):
+        '''
+        :return: the key that connections are registered under, the password
+                 is only kept as a digest
+        '''
+        pswdDigest = hashlib.sha256(pswd.encode('utf-8')).hexdigest()
+        return (user.upper(), str(dsn), pswdDigest)
+
+    def getStats(self, key):
+        '''
+        :return: the ConnectionStats for the key, must be called while
+                 holding the lock.  Statistics are kept by user / dsn.
+        '''
+        statsKey = key[:2]
+        if statsKey not in self.stats:
+            self.stats[statsKey] = ConnectionStats()
+        return self.stats[statsKey]
+
+    def connect(self, key, user, pswd, dsn):
+        '''
+        opens a new connection, recording the time it took
+        '''
+        startTime = time.time()
+        conn = cx_Oracle.connect(user, pswd, str(dsn))  # pylint: disable=no-member
+        elapsed = time.time() - startTime
+        with self.lock:
+            stats = self.getStats(key)
+            stats.connects += 1
+            stats.connectSeconds += elapsed
+            stats.maxConnectSeconds = max(stats.maxConnectSeconds, elapsed)
+        self.logger.debug("connected as %s to %s in %.3f seconds", user, dsn,
+                          elapsed)
+        return conn
+
+    def closeQuietly(self, conn):
+        '''
+        closes a connection that is being discarded, ignoring errors as the
+        session may already be gone
+        '''
+        try:
+            conn.close()
+        except cx_Oracle.DatabaseError as e:  # pylint: disable=no-member
+            self.logger.debug("error closing a discarded connection: %s", e)
+
+    def closeExpired(self):
+        '''
+        closes the released connections that have been idle for longer
+        than the idle timeout
+        '''
+        expired = []
+        cutoff = time.time() - self.idleTimeout
+        with self.lock:
+            for key, idleConns in self.idle.items():
+                keep = [idleConn for idleConn in idleConns
+                        if idleConn[1] >= cutoff]
+                if len(keep) != len(idleConns):
+                    self.getStats(key).idleClosed += len(idleConns) - len(keep)
+                    expired.extend([idleConn[0] for idleConn in idleConns
+                                    if idleConn[1] < cutoff])
+                    self.idle[key] = keep
+        for conn in expired:
+            self.closeQuietly(conn)
+
+    def acquire(self, user, pswd, dsn):
+        '''
+        returns a released connection for the user / password / dsn if
+        there is one that is still usable, otherwise opens a new one.
+
+        :param  user: schema that you are using to connnect to the database
+        :type user: str
+        :param  pswd: password that goes with the schema
+        :type pswd: str
+        :param dsn: the dsn / connect descriptor of the database
+        :return: a connection that should be given back using release()
+        :rtype: cx_Oracle.Connection
+        '''
+        key = self.getKey(user, pswd, dsn)
+        self.closeExpired()
+        while True:
+            conn = None
+            with self.lock:
+                idleConns = self.idle.get(key)
+                if idleConns:
+                    conn = idleConns.pop()[0]
+            if conn is None:
+                conn = self.connect(key, user, pswd, dsn)
+                break
+            if self.pingBeforeUse:
+                try:
+                    conn.ping()
+                except cx_Oracle.DatabaseError as e:  # pylint: disable=no-member
+                    self.logger.warning("discarding an unusable connection " +
+                                        "for %s@%s: %s", user, dsn, e)
+                    with self.lock:
+                        self.getStats(key).pingFailures += 1
+                    self.closeQuietly(conn)
+                    continue
+            with self.lock:
+                self.getStats(key).reused += 1
+            break
+        with self.lock:
+            self.getStats(key).acquired += 1
+            self.checkedOut[id(conn)] = key
+        return conn
+
+    def release(self, conn):
+        '''
+        gives a connection that was retrieved with acquire() back to the
+        registry, any uncommitted work is rolled back.
+
+        :param conn: the connection to release
+        '''
+        with self.lock:
+            key = self.checkedOut.pop(id(conn), None)
+        if key is None:
+            msg = 'the connection {0} was not acquired from this registry'
+            msg = msg.format(conn)
+            self.logger.error(msg)
+            raise ValueError(msg)
+        try:
+            conn.rollback()
+        except cx_Oracle.DatabaseError as e:  # pylint: disable=no-member
+            self.logger.debug("discarding a connection that could not be " +
+                              "rolled back: %s", e)
+            self.closeQuietly(conn)
+            return
+        with self.lock:
+            self.getStats(key).released += 1
+            idleConns = self.idle.setdefault(key, [])
+            if len(idleConns) < self.maxIdle:
+                idleConns.append((conn, time.time()))
+                conn = None
+        if conn is not None:
+            self.closeQuietly(conn)
+
+    def warmUp(self, user, pswd, dsn, sessions=1, background=True):
+        '''
+        opens connections ahead of time so that the login cost is paid
+        while the script is doing other work.
+
+        :param  user: schema that you are using to connnect to the database
+        :param  pswd: password that goes with the schema
+        :param dsn: the dsn / connect descriptor of the database
+        :param sessions: number of connections to open
+        :param background: when true the connections are opened in a
+                           background thread
+        :return: the thread opening the connections, None when not run in
+                 the background
+        '''
+        def openSessions():
+            key = self.getKey(user, pswd, dsn)
+            for _ in range(sessions):
+                try:
+                    conn = self.connect(key, user, pswd, dsn)
+                except cx_Oracle.DatabaseError as e:  # pylint: disable=no-member
+                    self.logger.error("unable to warm up a connection for " +
+                                      "%s@%s: %s", user, dsn, e)
+                    return
+                with self.lock:
+                    self.idle.setdefault(key, []).append((conn, time.time()))
+
+        if not background:
+            openSessions()
+            return None
+        thread = threading.Thread(target=openSessions)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def isRegistered(self, conn):
+        '''
+        :return: boolean indicating whether the connection is currently
+                 checked out of the registry
+        '''
+        return id(conn) in self.checkedOut
+
+    def getStatistics(self):
+        '''
+        :return: dictionary keyed by (user, dsn) with the counters kept for
+                 each database / user, including the number of idle
+                 connections
+        '''
+        retVal = {}
+        with self.lock:
+            for statsKey, stats in self.stats.items():
+                retVal[statsKey] = stats.asDict()
+                retVal[statsKey]['idle'] = 0
+            for key, idleConns in self.idle.items():
+                retVal[key[:2]]['idle'] += len(idleConns)
+        return retVal
+
+    def closeAll(self):
+        '''
+        closes all of the released connections held by the registry
+        '''
+        with self.lock:
+            idleConns = [idleConn[0] for conns in self.idle.values()
+                         for idleConn in conns]
+            self.idle = {}
+        for conn in idleConns:
+            self.closeQuietly(conn)
+
+
+_CONNECTION_REGISTRY = None
+
+
+def getConnectionRegistry():
+    '''
+    :return: the process wide ConnectionRegistry, created on first use
+    :rtype: ConnectionRegistry
+    '''
+    global _CONNECTION_REGISTRY  # pylint: disable=global-statement
+    with _POOL_MANAGER_LOCK:
+        if _CONNECTION_REGISTRY is None:
+            _CONNECTION_REGISTRY = ConnectionRegistry()
+    return _CONNECTION_REGISTRY
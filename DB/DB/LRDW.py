@@ -7,45 +7,218 @@ Created on Sep 8, 2014
 import logging
 import os.path
 import sys
+import threading
+import time
 
 import cx_Oracle
 
-import DbLib
+from . import DbLib
+
+
+class LRDWConst(object):
+    '''
+    constants used by the LRDW class
+    '''
+    # number of seconds the table -> schema index is used before it is
+    # reloaded
+    schemaIndexTTL = 600
+    # rows fetched per round trip when loading the table -> schema index,
+    # the first batch is prefetched with the execute when the cursor
+    # supports prefetchrows, (cx_Oracle 8.0 and later)
+    schemaIndexArraySize = 5000
+    schemaIndexPrefetchRows = 5000
+
+
+# credentials files that have been read by any LRDWDbLib object, keyed by
+# path, along with the modification time of the file when it was read
+_CREDENTIALS_CACHE = {}
+_CREDENTIALS_LOCK = threading.Lock()
+
+
+def clearCredentialsCache():
+    '''
+    discards the credentials read from the credentials files, they are read
+    again the next time an LRDWDbLib object is created
+    '''
+    with _CREDENTIALS_LOCK:
+        _CREDENTIALS_CACHE.clear()
 
 
 class LRDW():
     '''
     Various commonly used queries bundled up into a python class
+
+    Schema lookups are answered from an in memory index of all the tables
+    in ALL_TABLES which is loaded with a single query the first time it is
+    needed and reloaded once it is older than schemaIndexTTL seconds.
+    Setting schemaIndexTTL to None keeps the index until clearSchemaIndex()
+    is called.  Table names that are not in the index are looked up in the
+    database, so tables created after the index was loaded are still found.
+
+    Call close() when done, or use the object as a context manager, so a
+    pooled or registered connection is given back for reuse.
     '''
 
-    def __init__(self, configDict, credsFileDir=None):
+    def __init__(self, configDict, credsFileDir=None, usePool=False,  # pylint: disable=too-many-arguments
+                 schemaIndexTTL=LRDWConst.schemaIndexTTL, useRegistry=False):
         self.logger = logging.getLogger(__name__)
-        self.db = LRDWDbLib(configDict, credsFileDir)
+        self.db = LRDWDbLib(configDict, credsFileDir, usePool, useRegistry)
+        self.schemaIndexTTL = schemaIndexTTL
+        self.schemaIndex = None
+        self.schemaIndexLoadTime = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback):
+        self.close()
+        return False
+
+    def close(self):
+        '''
+        closes the database connection, connections from the session pool
+        or the connection registry are released back to them
+        '''
+        if self.db.connObj is not None:
+            self.db.closeDbConnection()
+            self.db.connObj = None
+
+    def loadSchemaIndex(self):
+        '''
+        loads the table name -> list of owners index from ALL_TABLES
+        '''
+        sql = 'SELECT table_name, owner FROM all_tables'
+        startTime = time.time()
+        cur = self.db.getCursor()
+        cur.arraysize = LRDWConst.schemaIndexArraySize
+        if hasattr(cur, 'prefetchrows'):
+            cur.prefetchrows = LRDWConst.schemaIndexPrefetchRows
+        cur = self.db.runStatement(cur, sql)
+        schemaIndex = {}
+        while True:
+            rows = cur.fetchmany()
+            if not rows:
+                break
+            for tableName, owner in rows:
+                if tableName not in schemaIndex:
+                    schemaIndex[tableName] = []
+                schemaIndex[tableName].append(owner)
+        cur.close()
+        self.schemaIndex = schemaIndex
+        self.schemaIndexLoadTime = time.time()
+        self.logger.debug("loaded the schema index, %s table names in " +
+                          "%.3f seconds", len(schemaIndex),
+                          self.schemaIndexLoadTime - startTime)
+
+    def getSchemaIndex(self):
+        '''
+        :return: the table name -> list of owners index, loading it if it
+                 has not been loaded or has expired
+        :rtype: dict
+        '''
+        if self.schemaIndex is None or \
+                (self.schemaIndexTTL is not None and
+                 time.time() - self.schemaIndexLoadTime >= self.schemaIndexTTL):
+            self.loadSchemaIndex()
+        return self.schemaIndex
+
+    def clearSchemaIndex(self):
+        '''
+        discards the schema index, the next lookup reloads it
+        '''
+        self.schemaIndex = None
+        self.schemaIndexLoadTime = None
 
-    def getSchema(self, tableName):
+    def lookupSchemas(self, tableNames):
+        '''
+        queries the database for the schemas of tables that are missing
+        from the schema index, adding the ones that are found to it.
+
+        :param tableNames: list of upper case table names
+        :return: dictionary of table name -> list of schemas, only contains
+                 the tables that were found
+        :rtype: dict
+        '''
+        nameBinds = [':name{0}'.format(cnt)
+                     for cnt in range(self.db.const.inListSize)]
+        sql = 'SELECT table_name, owner FROM all_tables ' + \
+              'WHERE table_name IN ({0})'.format(', '.join(nameBinds))
+        found = {}
+        for chunk in self.db.getInListChunks(sorted(set(tableNames))):
+            cur = self.db.executeOracleSql(sql, chunk)
+            for tableName, owner in cur:
+                found.setdefault(tableName, []).append(owner)
+            cur.close()
+        if found:
+            self.logger.debug("found %s tables that are not in the schema " +
+                              "index", len(found))
+            if self.schemaIndex is not None:
+                for tableName, owners in found.items():
+                    self.schemaIndex[tableName] = list(owners)
+        return found
+
+    def getSchema(self, tableName, useIndex=True):
         '''
         :param tableName: name of the table.
+        :param useIndex: when false the database is queried directly
+                         instead of using the schema index
         Returns a list of schemas that contain the given table name
         '''
-        sql = 'SELECT ' + \
-              ' owner from all_tables where table_name = \'' + \
-              str(tableName.upper()) + "'"
-        cur = self.db.executeOracleSql(sql)
+        if useIndex:
+            return self.getSchemas([tableName])[tableName]
+        sql = 'SELECT owner FROM all_tables WHERE table_name = :tableName'
+        cur = self.db.executeOracleSql(sql, {'tableName': tableName.upper()})
         schemas = []
         for i in cur:
             schemas.append(i[0])
+        cur.close()
+        return schemas
+
+    def getSchemas(self, tableNames):
+        '''
+        bulk version of getSchema
+
+        :param tableNames: list of table names
+        :return: dictionary of table name -> list of schemas that contain a
+                 table with that name
+        :rtype: dict
+        '''
+        schemaIndex = self.getSchemaIndex()
+        missing = [tableName.upper() for tableName in tableNames
+                   if tableName.upper() not in schemaIndex]
+        found = self.lookupSchemas(missing) if missing else {}
+        schemas = {}
+        for tableName in tableNames:
+            owners = schemaIndex.get(tableName.upper(),
+                                     found.get(tableName.upper(), []))
+            schemas[tableName] = list(owners)
         return schemas
 
 
 class LRDWDbLib(DbLib.DbMethods):
+    '''
+    :ivar usePool: when true the session comes from the shared session
+                   pool, see DbPool.PoolManager
+    :ivar useRegistry: when true the connection comes from the process wide
+                       connection registry, see DbPool.ConnectionRegistry,
+                       can not be combined with usePool
+    '''
 
-    def __init__(self, configDict, credsFileDir=None):
+    def __init__(self, configDict, credsFileDir=None, usePool=False,
+                 useRegistry=False):
         self.logger = logging.getLogger(__name__)
+        if usePool and useRegistry:
+            msg = 'usePool and useRegistry can not both be set'
+            self.logger.error(msg)
+            raise ValueError(msg)
         DbLib.DbMethods.__init__(self)
         self.connParamsFile = configDict['securitycredsfile']
         self.instanceName = configDict['instancename']
         self.server = configDict['server']
         self.port = configDict['port']
+        # when true sessions are checked out of the shared session pool
+        self.usePool = usePool
+        self.useRegistry = useRegistry
         self.connect2(credsFileDir)
 
     def connect(self):
@@ -65,11 +238,37 @@ class LRDWDbLib(DbLib.DbMethods):
             fileName = os.path.join(credsFileDir, self.connParamsFile)
         else:
             fileName = os.path.join(os.path.dirname(__file__), self.connParamsFile)
-        fh = open(fileName, 'r')
-        usr = fh.readline()
-        passwd = fh.readline()
-        fh.close()
-        usr = usr.strip()
-        passwd = passwd.strip()
-        dsn = cx_Oracle.makedsn(self.server, self.port, service_name=self.instanceName)
-        self.connObj = cx_Oracle.connect(usr, passwd, dsn)
+        usr, passwd = self.readCredentials(fileName)
+        if self.usePool:
+            self.connectPooled(usr, passwd, self.instanceName, self.server,
+                               self.port)
+        elif self.useRegistry:
+            dsn = cx_Oracle.makedsn(self.server, self.port, service_name=self.instanceName)
+            self.connectShared(usr, passwd, dsn)
+        else:
+            dsn = cx_Oracle.makedsn(self.server, self.port, service_name=self.instanceName)
+            self.connObj = cx_Oracle.connect(usr, passwd, dsn)
+            self.initConnection()
+
+    def readCredentials(self, fileName):
+        '''
+        reads the user and password from the first two lines of the
+        credentials file.  The contents are cached for the process, and
+        shared by all the LRDWDbLib objects, they are only read again if the
+        file is modified, see clearCredentialsCache.
+
+        :param fileName: path to the credentials file
+        :return: the user and password
+        :rtype: tuple
+        '''
+        mtime = os.path.getmtime(fileName)
+        with _CREDENTIALS_LOCK:
+            cached = _CREDENTIALS_CACHE.get(fileName)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            with open(fileName, 'r') as fh:
+                usr = fh.readline()
+                passwd = fh.readline()
+            credentials = (usr.strip(), passwd.strip())
+            _CREDENTIALS_CACHE[fileName] = (mtime, credentials)
+        return credentials
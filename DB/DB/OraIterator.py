@@ -4,7 +4,15 @@ Created on Dec 8, 2017
 @author: kjnether
 '''
 import cx_Oracle
+import datetime
+import decimal
+import json
 import logging
+import os
+import re
+import tempfile
+
+from . import DbPool
 
 
 class Iterator(object):
@@ -13,26 +21,85 @@ class Iterator(object):
     query.  The class will allow you to iterate over the results of that
     query using a builtin python iterator.
 
+    By default the entire result set is retrieved with fetchall() the first
+    time the iterator is used.  When streaming is enabled rows are instead
+    pulled from the database in batches of arraysize rows using fetchmany(),
+    so only a single batch is held in memory at any one time.  Use streaming
+    for large tables.
+
+    When a keyColumn is provided the results are instead retrieved in pages
+    of arraysize rows ordered by that column, each page being a separate
+    query that starts after the last key of the previous page (keyset
+    pagination).  The key column must uniquely identify the rows.  If a
+    checkpointFile is also provided the last key of every page that has
+    been consumed is recorded in it, so that an extract that is interrupted
+    can be resumed from that point by running it again with the same query.
+    Rows from a page that was only partially consumed are returned again
+    when resuming.  The checkpoint file is removed once all the rows have
+    been retrieved.  Key columns can be strings, numbers, dates or
+    timestamps.
+
+    :ivar arraysize: the number of rows retrieved from the database with
+                     each round trip when streaming, and the page size when
+                     paginating
+    :ivar streaming: when true rows are fetched lazily in batches instead
+                     of loading the entire result set into memory.
+    :ivar keyColumn: column used to paginate the query
+    :ivar checkpointFile: json file that the pagination position is
+                          recorded in
+    :ivar resume: when true and the checkpoint file exists pagination
+                  starts from the key it contains
+    :ivar maxRetries: number of times a page is retried, on a new
+                      connection, when the database call fails.  Retries
+                      require a connection object with a reconnect()
+                      method, such as DbConnection, otherwise the error
+                      is raised on the first failure.
     '''
+    keyColumnRegex = re.compile(r'^[A-Za-z][\w$#]*$')
+    isoDateFormat = '%Y-%m-%d'
+    isoDateTimeFormat = '%Y-%m-%dT%H:%M:%S'
 
-    def __init__(self, connection, sql):
+    def __init__(self, connection, sql, arraysize=1000, streaming=False,  # pylint: disable=too-many-arguments
+                 keyColumn=None, checkpointFile=None, resume=True,
+                 maxRetries=1):
         # self.connection = DbConnection(user, pswd, host, servicename, port)
         self.connection = connection
         self.logger = logging.getLogger(__name__)
         self.sql = sql
+        self.arraysize = arraysize
+        self.streaming = streaming
         self.results = None
         self.recordCnt = 0
+        # used by the streaming mode
+        self.cursor = None
+        self.batch = []
+        self.batchPos = 0
+        self.exhausted = False
+        # used by the keyset pagination mode
+        if keyColumn and not self.keyColumnRegex.match(keyColumn):
+            msg = 'the key column {0} is not a valid column name'
+            raise ValueError(msg.format(keyColumn))
+        self.keyColumn = keyColumn
+        self.checkpointFile = checkpointFile
+        self.resume = resume
+        self.maxRetries = maxRetries
+        self.keyPosition = None
+        self.pages = None
 
     def __iter__(self):
         return self
 
-    def next(self):
+    def __next__(self):
         '''
         returns the next row associated with the query.
 
         '''
+        if self.keyColumn:
+            return self.nextPaged()
+        if self.streaming:
+            return self.nextStreamed()
         retVal = None
-        if not self.results:
+        if self.results is None:
             self.runQuery()
         if self.recordCnt >= len(self.results):
             raise StopIteration
@@ -41,26 +108,349 @@ class Iterator(object):
             self.recordCnt += 1
         return retVal
 
-    def runQuery(self):
+    def next(self):
         '''
-        run's the query that was set up, making the results available as an
-        iterator
+        python 2 style iterator method, kept for existing callers
+        '''
+        return self.__next__()
+
+    def nextStreamed(self):
+        '''
+        returns the next row from the current batch, retrieving the next
+        batch from the database with fetchmany() when the current one has
+        been consumed.
+        '''
+        if self.exhausted:
+            raise StopIteration
+        if self.cursor is None:
+            self.cursor = self.openCursor()
+        if self.batchPos >= len(self.batch):
+            self.batch = self.cursor.fetchmany()
+            self.batchPos = 0
+            if not self.batch:
+                self.logger.debug("streamed %s rows for the query: %s",
+                                  self.recordCnt, self.sql)
+                self.close()
+                self.exhausted = True
+                raise StopIteration
+        retVal = self.batch[self.batchPos]
+        self.batchPos += 1
+        self.recordCnt += 1
+        return retVal
+
+    def nextPaged(self):
+        '''
+        returns the next row from the current page, retrieving the next
+        page when the current one has been consumed.
+        '''
+        if self.pages is None:
+            self.pages = self.iterPages()
+        while self.batchPos >= len(self.batch):
+            # raises StopIteration once there are no more pages
+            self.batch = next(self.pages)
+            self.batchPos = 0
+        retVal = self.batch[self.batchPos]
+        self.batchPos += 1
+        self.recordCnt += 1
+        return retVal
+
+    def iterPages(self, pageSize=None):
+        '''
+        generator that yields the results of the query one page at a time
+        using keyset pagination on the keyColumn, see the class description.
+        The checkpoint is updated when the next page is requested, ie once
+        the caller is done with the previous one.
+
+        :param pageSize: the number of rows in each page, if not provided
+                         defaults to the arraysize
+        :type pageSize: int
+        '''
+        if not self.keyColumn:
+            msg = 'a keyColumn is required to paginate the query'
+            raise ValueError(msg)
+        if not pageSize:
+            pageSize = self.arraysize
+        lastKey, pagedRows = self.loadCheckpoint()
+        while True:
+            rows = self.fetchPage(lastKey, pageSize)
+            if not rows:
+                break
+            yield rows
+            lastKey = rows[-1][self.keyPosition]
+            pagedRows += len(rows)
+            self.saveCheckpoint(lastKey, pagedRows)
+            if len(rows) < pageSize:
+                break
+        self.logger.debug("paginated %s rows for the query: %s", pagedRows,
+                          self.sql)
+        self.clearCheckpoint()
+
+    def getPageSql(self, lastKey):
+        '''
+        :return: the query that retrieves the page of rows that follows the
+                 lastKey, with the binds :lastKey and :pageSize
+        '''
+        sql = 'SELECT * FROM ({0}) pagesrc'.format(self.sql)
+        if lastKey is not None:
+            sql = sql + ' WHERE pagesrc.{0} > :lastKey'.format(self.keyColumn)
+        sql = sql + ' ORDER BY pagesrc.{0}'.format(self.keyColumn)
+        return 'SELECT * FROM ({0}) WHERE ROWNUM <= :pageSize'.format(sql)
+
+    def fetchPage(self, lastKey, pageSize):
+        '''
+        retrieves the page of rows that follow the lastKey.  If the database
+        call fails the connection is replaced and the page retried up to
+        maxRetries times.
+
+        :param lastKey: the key of the last row of the previous page, None
+                        for the first page
+        :param pageSize: the max number of rows to retrieve
+        :return: list of rows
+        '''
+        sql = self.getPageSql(lastKey)
+        binds = {'pageSize': pageSize}
+        if lastKey is not None:
+            binds['lastKey'] = lastKey
+        attempt = 0
+        while True:
+            try:
+                cur = self.connection.getConnection().cursor()
+                try:
+                    cur.arraysize = pageSize
+                    cur.execute(sql, binds)
+                    rows = cur.fetchall()
+                    if self.keyPosition is None:
+                        self.keyPosition = self.getKeyPosition(
+                            cur.description)
+                finally:
+                    self.closeCursor(cur)
+                return rows
+            except cx_Oracle.DatabaseError as e:  # pylint: disable=no-member
+                if attempt >= self.maxRetries:
+                    raise
+                if not hasattr(self.connection, 'reconnect'):
+                    self.logger.error("retrieving the page after the key " +
+                                      "%s failed, the connection %s can " +
+                                      "not be re-established as it has no " +
+                                      "reconnect() method", lastKey,
+                                      type(self.connection).__name__)
+                    raise
+                attempt += 1
+                self.logger.warning("retrieving the page after the key %s " +
+                                    "failed, reconnecting and retrying: %s",
+                                    lastKey, e)
+                self.connection.reconnect()
+
+    def closeCursor(self, cur):
+        '''
+        closes a cursor, ignoring errors as the session it belongs to may
+        have been lost
+        '''
+        try:
+            cur.close()
+        except cx_Oracle.DatabaseError as e:  # pylint: disable=no-member
+            self.logger.debug("error closing the cursor: %s", e)
+
+    def getKeyPosition(self, description):
+        '''
+        :param description: the cursor description of the page query
+        :return: the position of the key column in the rows
+        '''
+        columnNames = [column[0].upper() for column in description]
+        if self.keyColumn.upper() not in columnNames:
+            msg = 'the key column {0} is not one of the columns returned ' + \
+                  'by the query: {1}'
+            msg = msg.format(self.keyColumn, self.sql)
+            self.logger.error(msg)
+            raise ValueError(msg)
+        return columnNames.index(self.keyColumn.upper())
+
+    def loadCheckpoint(self):
+        '''
+        :return: the last key and the number of rows already retrieved from
+                 the checkpoint file, (None, 0) when there is no checkpoint
+        '''
+        if not self.checkpointFile or not self.resume or \
+                not os.path.exists(self.checkpointFile):
+            return None, 0
+        with open(self.checkpointFile, 'r') as checkpointFH:
+            checkpoint = json.load(checkpointFH)
+        if checkpoint['sql'] != self.sql or \
+                checkpoint['keyColumn'] != self.keyColumn:
+            msg = 'the checkpoint file {0} was created for a different ' + \
+                  'query or key column'
+            msg = msg.format(self.checkpointFile)
+            self.logger.error(msg)
+            raise ValueError(msg)
+        lastKey = self.decodeKey(checkpoint['lastKey'])
+        self.logger.info("resuming the query after the key %s, %s rows " +
+                         "have already been retrieved", lastKey,
+                         checkpoint['rows'])
+        return lastKey, checkpoint['rows']
+
+    def encodeKey(self, key):
         '''
+        :param key: a key column value
+        :return: the key in a form that can be written to the json
+                 checkpoint, dates, timestamps and decimals are written as
+                 strings tagged with their type
+        '''
+        if key is None or isinstance(key, (str, int, float)):
+            return key
+        # datetime is a subclass of date so is checked first
+        if isinstance(key, datetime.datetime):
+            return {'type': 'datetime', 'value': key.isoformat()}
+        if isinstance(key, datetime.date):
+            return {'type': 'date', 'value': key.isoformat()}
+        if isinstance(key, decimal.Decimal):
+            return {'type': 'decimal', 'value': str(key)}
+        msg = 'the key column {0} contains values of the type {1} which ' + \
+              'can not be recorded in the checkpoint file'
+        msg = msg.format(self.keyColumn, type(key).__name__)
+        self.logger.error(msg)
+        raise ValueError(msg)
+
+    def decodeKey(self, key):
+        '''
+        :param key: a key read from the checkpoint file
+        :return: the key column value that was encoded by encodeKey
+        '''
+        if not isinstance(key, dict):
+            return key
+        # parsed with strptime as fromisoformat requires python 3.7,
+        # isoformat() leaves out the microseconds when they are 0
+        if key['type'] == 'datetime':
+            dateFormat = self.isoDateTimeFormat
+            if '.' in key['value']:
+                dateFormat = dateFormat + '.%f'
+            return datetime.datetime.strptime(key['value'], dateFormat)
+        if key['type'] == 'date':
+            return datetime.datetime.strptime(key['value'],
+                                              self.isoDateFormat).date()
+        return decimal.Decimal(key['value'])
+
+    def saveCheckpoint(self, lastKey, rows):
+        '''
+        records the last key in the checkpoint file.  Written to a temporary
+        file that is then renamed so an interruption never leaves a partially
+        written checkpoint.
+
+        :param lastKey: the key of the last row that has been consumed, see
+                        encodeKey for the types supported
+        :param rows: the number of rows that have been consumed
+        '''
+        if not self.checkpointFile:
+            return
+        checkpoint = {'sql': self.sql, 'keyColumn': self.keyColumn,
+                      'lastKey': self.encodeKey(lastKey), 'rows': rows}
+        checkpointDir = os.path.dirname(os.path.abspath(self.checkpointFile))
+        tmpFH, tmpFile = tempfile.mkstemp(dir=checkpointDir, suffix='.tmp')
+        try:
+            with os.fdopen(tmpFH, 'w') as checkpointFH:
+                json.dump(checkpoint, checkpointFH)
+            os.replace(tmpFile, self.checkpointFile)
+        except Exception:
+            os.remove(tmpFile)
+            raise
+
+    def clearCheckpoint(self):
+        '''
+        removes the checkpoint file if it exists
+        '''
+        if self.checkpointFile and os.path.exists(self.checkpointFile):
+            os.remove(self.checkpointFile)
+
+    def iterBatches(self, batchSize=None):
+        '''
+        Runs the query on its own cursor and yields the results as lists of
+        rows, each list containing up to batchSize rows.  Allows downstream
+        code to process the results in chunks without materializing the
+        entire result set.
+
+        :param batchSize: the number of rows to include in each batch, if not
+                          provided defaults to the arraysize
+        :type batchSize: int
+        '''
+        if not batchSize:
+            batchSize = self.arraysize
+        cur = self.openCursor(batchSize)
+        try:
+            while True:
+                rows = cur.fetchmany(batchSize)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cur.close()
+
+    def openCursor(self, arraysize=None):
+        '''
+        creates a cursor, configures its arraysize and executes the query
+        on it.
+
+        :returns: the cursor that the query was executed on
+        '''
+        if not arraysize:
+            arraysize = self.arraysize
         self.logger.info("running the query: %s", self.sql)
         dbConn = self.connection.getConnection()
         cur = dbConn.cursor()
-        cur.execute(self.sql)
+        try:
+            cur.arraysize = arraysize
+            cur.execute(self.sql)
+        except Exception:
+            self.closeCursor(cur)
+            raise
+        return cur
+
+    def runQuery(self):
+        '''
+        run's the query that was set up, making the results available as an
+        iterator
+        '''
+        cur = self.openCursor()
         self.results = cur.fetchall()
         cur.close()
         self.recordCnt = 0
 
+    def close(self):
+        '''
+        closes the cursor used by the streaming mode if it is open
+        '''
+        if self.cursor is not None:
+            self.cursor.close()
+            self.cursor = None
+
+
 class DbConnection(object):
     '''
-    used to create a database connection,
+    used to create a database connection, if usePool is set the connection
+    is checked out of the shared session pool instead of being opened
+    directly.
+
+    dsn can be used to provide a connect descriptor that has already been
+    resolved (see TNSNamesParser.TNSNames.getConnectDescriptors), in which
+    case it is used instead of building one from the host / port / service
+    name.  Pooled connections are always keyed by host / port / service name.
+
+    If useRegistry is set the connection comes from the process wide
+    connection registry (see DbPool.ConnectionRegistry), reusing any
+    connection released with the same credentials and dsn.  The connection
+    is given back to the pool or the registry by close().
+
+    usePool can not be combined with useRegistry or a dsn, a ValueError is
+    raised if they are.
     '''
 
-    def __init__(self, user, pswd, host, sn, port, pmpLabel):
+    def __init__(self, user, pswd, host, sn, port, pmpLabel, usePool=False,  # pylint: disable=too-many-arguments
+                 dsn=None, useRegistry=False):
         self.logger = logging.getLogger(__name__)
+        if usePool and (useRegistry or dsn is not None):
+            msg = 'usePool can not be combined with useRegistry or a dsn, ' + \
+                  'pooled connections are keyed by host / port / service ' + \
+                  'name'
+            self.logger.error(msg)
+            raise ValueError(msg)
         self.user = user
         self.pswd = pswd
         self.host = host
@@ -68,7 +458,12 @@ class DbConnection(object):
         self.pmpLabel = pmpLabel
         self.service_name = sn
         self.conn = None
-        self.dsn = cx_Oracle.makedsn(self.host, self.port, service_name=self.service_name)
+        self.usePool = usePool
+        self.useRegistry = useRegistry
+        if dsn is not None:
+            self.dsn = getattr(dsn, 'dsn', dsn)
+        else:
+            self.dsn = cx_Oracle.makedsn(self.host, self.port, service_name=self.service_name)
         self.createConn()
 
     def getLabel(self):
@@ -85,8 +480,33 @@ class DbConnection(object):
 
     def createConn(self):
         self.close()
-        self.conn = cx_Oracle.connect(self.user, self.pswd, self.dsn)
-        self.logger.info("created a connection using schema %s", self.user)
+        if self.usePool:
+            poolManager = DbPool.getPoolManager()
+            self.conn = poolManager.acquire(self.user, self.pswd,
+                                            self.service_name, self.host,
+                                            self.port)
+            self.logger.info("acquired a pooled connection using schema %s",
+                             self.user)
+        elif self.useRegistry:
+            connRegistry = DbPool.getConnectionRegistry()
+            self.conn = connRegistry.acquire(self.user, self.pswd, self.dsn)
+            self.logger.info("acquired a registered connection using " +
+                             "schema %s", self.user)
+        else:
+            self.conn = cx_Oracle.connect(self.user, self.pswd, self.dsn)
+            self.logger.info("created a connection using schema %s", self.user)
+
+    def reconnect(self):
+        '''
+        replaces the connection, used when the session has been lost.
+        Errors closing the old connection are ignored.
+        '''
+        try:
+            self.close()
+        except cx_Oracle.DatabaseError as e:  # pylint: disable=no-member
+            self.logger.debug("error closing the lost connection: %s", e)
+            self.conn = None
+        self.createConn()
 
     def getConnection(self):
         if not self.conn:
@@ -95,4 +515,10 @@ class DbConnection(object):
 
     def close(self):
         if self.conn:
-            self.conn.close()
+            if self.usePool:
+                DbPool.getPoolManager().release(self.conn)
+            elif self.useRegistry:
+                DbPool.getConnectionRegistry().release(self.conn)
+            else:
+                self.conn.close()
+            self.conn = None
@@ -0,0 +1,228 @@
+'''
+Created on Oct 18, 2026
+
+Runs a list of queries in parallel, each on its own database connection.
+cx_Oracle releases the GIL while it waits on the database, so a simple
+thread pool is enough to have many queries in flight at once.
+
+example:
+    connParams = {'user': 'schema', 'pswd': 'pswd', 'serviceName': 'sn',
+                  'host': 'host', 'port': 1521}
+    jobs = [ParallelQuery.QueryJob(connParams, sql, {'owner': schema})
+            for schema in schemas]
+    runner = ParallelQuery.ParallelQueryRunner(maxWorkers=8)
+    for result in runner.run(jobs):
+        if result.error:
+            print(result.job.label, result.error)
+        else:
+            print(result.job.label, result.rows)
+'''
+import collections
+import concurrent.futures
+import logging
+import time
+
+from . import DbLib
+
+
+class QueryJob(object):
+    '''
+    a single query to be run by the ParallelQueryRunner
+
+    :ivar connParams: dictionary with the keys user, pswd, serviceName, host
+                      and optionally port, see DbLib.DbMethods.connectNoDSN
+    :ivar sql: the query to run
+    :ivar values: bind values for the query
+    :ivar timeout: max number of seconds the query is allowed to take, None
+                   means no limit.  Enforced with Connection.callTimeout,
+                   which requires cx_Oracle 7.2 or later, with older
+                   versions a warning is logged and the query is not
+                   limited.
+    :ivar label: a label to identify the job in the results and logs
+    '''
+
+    def __init__(self, connParams, sql, values=None, timeout=None, label=None):
+        self.connParams = connParams
+        self.sql = sql
+        self.values = values
+        self.timeout = timeout
+        self.label = label
+
+    def getDatabaseKey(self):
+        '''
+        :return: key identifying the database that the job runs against
+        '''
+        return (self.connParams['host'].lower(),
+                int(self.connParams.get('port', 1521)),
+                self.connParams['serviceName'].upper())
+
+
+class QueryResult(object):
+    '''
+    The outcome of a QueryJob
+
+    :ivar job: the QueryJob that was run
+    :ivar rows: list of rows returned by the query, None if it failed
+    :ivar error: the exception raised if the job failed, otherwise None
+    :ivar seconds: the time the job took, including connecting
+    :ivar closeError: the exception raised while resetting or closing the
+                      connection once the job was done, otherwise None.  The
+                      rows are still complete when it is set.
+    '''
+
+    def __init__(self, job, rows=None, error=None, seconds=None):
+        self.job = job
+        self.rows = rows
+        self.error = error
+        self.seconds = seconds
+        self.closeError = None
+
+
+class ParallelQueryRunner(object):
+    '''
+    Fans a list of QueryJobs out across a thread pool, each job running on
+    its own connection.  A job is only handed to the thread pool once its
+    database is running fewer than maxPerDatabase jobs, so jobs waiting on
+    a busy database never hold up the jobs for other databases.
+
+    :ivar maxWorkers: the max number of jobs running at once
+    :ivar maxPerDatabase: the max number of jobs running at once against any
+                          single database
+    :ivar usePool: when true connections are checked out of the shared
+                   session pool (see DbPool) instead of opened per job
+    '''
+
+    def __init__(self, maxWorkers=8, maxPerDatabase=4, usePool=False):
+        self.logger = logging.getLogger(__name__)
+        self.maxWorkers = maxWorkers
+        self.maxPerDatabase = maxPerDatabase
+        self.usePool = usePool
+
+    def runJob(self, job):
+        '''
+        Connects, runs a single job and fetches all its rows.  Any error,
+        including the job exceeding its timeout, is captured in the
+        returned result rather than raised.  Errors closing the connection
+        afterwards, (common once a call has timed out), are captured in
+        the closeError of the result.
+
+        :param job: the job to run
+        :type job: QueryJob
+        :rtype: QueryResult
+        '''
+        startTime = time.time()
+        db = DbLib.DbMethods()
+        params = job.connParams
+        try:
+            port = params.get('port', 1521)
+            if self.usePool:
+                db.connectPooled(params['user'], params['pswd'],
+                                 params['serviceName'], params['host'], port)
+            else:
+                db.connectNoDSN(params['user'], params['pswd'],
+                                params['serviceName'], params['host'], port)
+        except Exception as e:  # pylint: disable=broad-except
+            self.logger.error("unable to connect for the job %s: %s",
+                              job.label, e)
+            return QueryResult(job, error=e, seconds=time.time() - startTime)
+        timeoutSet = False
+        try:
+            if job.timeout:
+                if hasattr(db.connObj, 'callTimeout'):
+                    # milliseconds, the database call is interrupted once it
+                    # is exceeded
+                    db.connObj.callTimeout = int(job.timeout * 1000)
+                    timeoutSet = True
+                else:
+                    self.logger.warning("call timeouts require cx_Oracle " +
+                                        "7.2 or later, the job %s is run " +
+                                        "without a timeout", job.label)
+            cur = db.executeOracleSql(job.sql, job.values)
+            rows = cur.fetchall()
+            cur.close()
+            result = QueryResult(job, rows=rows)
+        except Exception as e:  # pylint: disable=broad-except
+            self.logger.error("the job %s failed: %s", job.label, e)
+            result = QueryResult(job, error=e)
+        finally:
+            closeError = self.closeJobConnection(db, job, timeoutSet)
+        result.closeError = closeError
+        result.seconds = time.time() - startTime
+        self.logger.debug("job %s completed in %.3f seconds", job.label,
+                          result.seconds)
+        return result
+
+    def closeJobConnection(self, db, job, resetTimeout):
+        '''
+        resets the call timeout and closes the connection used by a job
+
+        :param db: the DbMethods object the job was run with
+        :param job: the job that was run
+        :param resetTimeout: when true the call timeout was set for the job
+        :return: the first exception raised, None if the connection was
+                 closed without error
+        '''
+        closeError = None
+        if resetTimeout:
+            try:
+                db.connObj.callTimeout = 0
+            except Exception as e:  # pylint: disable=broad-except
+                closeError = e
+        try:
+            db.closeDbConnection()
+        except Exception as e:  # pylint: disable=broad-except
+            closeError = closeError or e
+        if closeError:
+            self.logger.error("unable to close the connection for the job " +
+                              "%s: %s", job.label, closeError)
+        return closeError
+
+    def run(self, jobs):
+        '''
+        Runs the jobs in parallel and yields their results in the same
+        order that the jobs were provided, each result being yielded as
+        soon as it and all the results before it are available.
+
+        :param jobs: list of QueryJob objects
+        :type jobs: list
+        :returns: generator of QueryResult objects
+        '''
+        waiting = list(enumerate(jobs))
+        # future -> (job index, database key) for the jobs submitted
+        running = {}
+        dbRunning = collections.Counter()
+        finished = {}
+        nextIndex = 0
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.maxWorkers) as executor:
+            while waiting or running:
+                # submit the waiting jobs, in order, whose database has a
+                # free slot
+                stillWaiting = []
+                for jobIndex, job in waiting:
+                    key = job.getDatabaseKey()
+                    if len(running) < self.maxWorkers and \
+                            dbRunning[key] < self.maxPerDatabase:
+                        future = executor.submit(self.runJob, job)
+                        running[future] = (jobIndex, key)
+                        dbRunning[key] += 1
+                    else:
+                        stillWaiting.append((jobIndex, job))
+                waiting = stillWaiting
+
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    jobIndex, key = running.pop(future)
+                    dbRunning[key] -= 1
+                    finished[jobIndex] = future.result()
+                while nextIndex in finished:
+                    yield finished.pop(nextIndex)
+                    nextIndex += 1
+
+    def runAll(self, jobs):
+        '''
+        :returns: list with the results of all the jobs, in job order
+        :rtype: list
+        '''
+        return list(self.run(jobs))
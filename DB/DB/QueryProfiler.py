@@ -0,0 +1,302 @@
+'''
+Created on Oct 18, 2026
+
+Instrumentation for the sql statements issued through DbLib.DbMethods.
+Once a QueryProfiler has been attached to a DbMethods object with
+setProfiler() every statement it runs is timed and the timings are
+aggregated by normalized sql text (literals replaced with ?), so the
+statements that dominate a jobs runtime can be identified.
+
+example:
+    profiler = QueryProfiler.QueryProfiler(slowThreshold=2)
+    profiler.registerAtExit()
+    db = DbLib.DbMethods()
+    db.connectNoDSN(user, pswd, serviceName, host)
+    db.setProfiler(profiler)
+    ... run the job ...
+'''
+import atexit
+import logging
+import math
+import re
+import threading
+import time
+
+
+class QueryStats(object):
+    '''
+    aggregated timings for a single normalized sql statement
+
+    parseSeconds is the time spent preparing the statement on the client,
+    (statement cache lookup), the server side parse is part of the execute
+    round trip and therefore included in executeSeconds.  Round trips are
+    estimated from the number of execute and fetch calls and the cursor
+    arraysize.
+    '''
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.executions = 0
+        self.parseSeconds = 0.0
+        self.executeSeconds = 0.0
+        self.fetchSeconds = 0.0
+        self.maxSeconds = 0.0
+        self.rows = 0
+        self.roundTrips = 0
+
+    def getTotalSeconds(self):
+        '''
+        :return: the total time spent on the statement
+        '''
+        return self.parseSeconds + self.executeSeconds + self.fetchSeconds
+
+    def asDict(self):
+        '''
+        :return: the statistics as a dictionary
+        '''
+        return {'sql': self.sql,
+                'executions': self.executions,
+                'parseSeconds': self.parseSeconds,
+                'executeSeconds': self.executeSeconds,
+                'fetchSeconds': self.fetchSeconds,
+                'totalSeconds': self.getTotalSeconds(),
+                'maxSeconds': self.maxSeconds,
+                'rows': self.rows,
+                'roundTrips': self.roundTrips}
+
+
+class QueryProfiler(object):
+    '''
+    Collects per statement timings.  Can be shared by several DbMethods
+    objects, including ones used from different threads.
+
+    :ivar slowThreshold: statements that take longer than this number of
+                         seconds to execute are logged along with their
+                         binds. None disables the slow query log.
+    :ivar logBinds: when false the bind values are left out of the slow
+                    query log, (they may contain sensitive values)
+    '''
+    stringLiteralRegex = re.compile(r"'(?:[^']|'')*'")
+    numberLiteralRegex = re.compile(r'(?<![\w:.])\d+(\.\d+)?\b')
+    whitespaceRegex = re.compile(r'\s+')
+
+    def __init__(self, slowThreshold=None, logBinds=True):
+        self.logger = logging.getLogger(__name__)
+        self.slowThreshold = slowThreshold
+        self.logBinds = logBinds
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def normalizeSql(self, sql):
+        '''
+        replaces string and numeric literals in the sql with ? and collapses
+        whitespace so that statements that only differ by their literal
+        values are aggregated together.
+
+        :param sql: the sql statement
+        :type sql: str
+        :return: the normalized sql
+        :rtype: str
+        '''
+        sql = self.stringLiteralRegex.sub('?', sql)
+        sql = self.numberLiteralRegex.sub('?', sql)
+        sql = self.whitespaceRegex.sub(' ', sql)
+        return sql.strip()
+
+    def getStats(self, sql):
+        '''
+        :return: the QueryStats object for the statement, created if it
+                 does not exist.  Must be called while holding the lock
+        '''
+        normalized = self.normalizeSql(sql)
+        if normalized not in self.stats:
+            self.stats[normalized] = QueryStats(normalized)
+        return self.stats[normalized]
+
+    def recordExecute(self, sql, values, parseSeconds, executeSeconds):
+        '''
+        records the execution of a statement, logging it if it exceeded the
+        slow query threshold
+
+        :param sql: the statement that was executed
+        :param values: the bind values used
+        :param parseSeconds: time spent preparing the statement
+        :param executeSeconds: time spent executing the statement
+        '''
+        with self.lock:
+            stats = self.getStats(sql)
+            stats.executions += 1
+            stats.roundTrips += 1
+            stats.parseSeconds += parseSeconds
+            stats.executeSeconds += executeSeconds
+            stats.maxSeconds = max(stats.maxSeconds,
+                                   parseSeconds + executeSeconds)
+            normalized = stats.sql
+        elapsed = parseSeconds + executeSeconds
+        if self.slowThreshold is not None and elapsed >= self.slowThreshold:
+            if self.logBinds:
+                self.logger.warning("slow query (%.3f seconds): %s binds: %s",
+                                    elapsed, normalized, values)
+            else:
+                self.logger.warning("slow query (%.3f seconds): %s",
+                                    elapsed, normalized)
+
+    def recordFetch(self, sql, fetchSeconds, rows, roundTrips):
+        '''
+        adds the time spent fetching rows for a statement
+
+        :param sql: the statement the rows were fetched for
+        :param fetchSeconds: time spent in the fetch call
+        :param rows: number of rows retrieved
+        :param roundTrips: estimated number of round trips the fetch took
+        '''
+        with self.lock:
+            stats = self.getStats(sql)
+            stats.fetchSeconds += fetchSeconds
+            stats.rows += rows
+            stats.roundTrips += roundTrips
+
+    def wrapCursor(self, curObj, sql):
+        '''
+        :return: a ProfiledCursor wrapping the cursor so the time spent
+                 fetching its results is recorded against the statement
+        '''
+        return ProfiledCursor(curObj, sql, self)
+
+    def getReport(self):
+        '''
+        :return: list of dictionaries with the stats for each statement,
+                 ordered by total time, most expensive first
+        :rtype: list
+        '''
+        with self.lock:
+            report = [stats.asDict() for stats in self.stats.values()]
+        report.sort(key=lambda stats: stats['totalSeconds'], reverse=True)
+        return report
+
+    def formatReport(self, maxStatements=None):
+        '''
+        :param maxStatements: only include this many of the most expensive
+                              statements, None includes all of them
+        :return: the report as a human readable string
+        :rtype: str
+        '''
+        report = self.getReport()
+        if maxStatements:
+            report = report[:maxStatements]
+        lines = ['query profile, {0} distinct statements'.format(len(report))]
+        template = '{totalSeconds:10.3f}s total {executions:7d} execs ' + \
+                   '{parseSeconds:8.3f}s parse {executeSeconds:8.3f}s ' + \
+                   'execute {fetchSeconds:8.3f}s fetch {rows:9d} rows ' + \
+                   '{roundTrips:7d} round trips: {sql}'
+        for stats in report:
+            lines.append(template.format(**stats))
+        return '\n'.join(lines)
+
+    def dumpReport(self, outFile=None, maxStatements=None):
+        '''
+        writes the report to the log, or to a file if one is provided
+
+        :param outFile: path to the file to write the report to
+        :param maxStatements: see formatReport
+        '''
+        reportStr = self.formatReport(maxStatements)
+        if outFile:
+            with open(outFile, 'w') as fh:
+                fh.write(reportStr + '\n')
+        else:
+            self.logger.info(reportStr)
+
+    def registerAtExit(self, outFile=None, maxStatements=None):
+        '''
+        dumps the report when the process exits, see dumpReport
+        '''
+        atexit.register(self.dumpReport, outFile, maxStatements)
+
+    def reset(self):
+        '''
+        discards all the collected statistics
+        '''
+        with self.lock:
+            self.stats = {}
+
+
+class ProfiledCursor(object):
+    '''
+    Thin wrapper around a cx_Oracle cursor that times the calls used to
+    fetch results and reports them to the profiler.  Everything else is
+    passed through to the wrapped cursor.  Python looks special methods
+    up on the class, bypassing __getattr__, so the ones the cursor
+    supports (iteration and use as a context manager) are defined here.
+    '''
+
+    def __init__(self, curObj, sql, profiler):
+        self.__dict__['curObj'] = curObj
+        self.__dict__['sql'] = sql
+        self.__dict__['profiler'] = profiler
+
+    def __getattr__(self, name):
+        return getattr(self.curObj, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.curObj, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback):
+        self.curObj.close()
+        return False
+
+    def getRoundTrips(self, rows):
+        '''
+        :return: estimated number of round trips required to fetch the rows
+        '''
+        return max(1, int(math.ceil(float(rows) / max(1, self.curObj.arraysize))))
+
+    def fetchone(self):
+        startTime = time.time()
+        row = self.curObj.fetchone()
+        self.profiler.recordFetch(self.sql, time.time() - startTime,
+                                  1 if row is not None else 0, 0)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        startTime = time.time()
+        rows = self.curObj.fetchmany(*args, **kwargs)
+        self.profiler.recordFetch(self.sql, time.time() - startTime,
+                                  len(rows), 1)
+        return rows
+
+    def fetchall(self):
+        startTime = time.time()
+        rows = self.curObj.fetchall()
+        self.profiler.recordFetch(self.sql, time.time() - startTime,
+                                  len(rows), self.getRoundTrips(len(rows)))
+        return rows
+
+    def __iter__(self):
+        rowCnt = 0
+        fetchSeconds = 0.0
+        rowIter = iter(self.curObj)
+        try:
+            while True:
+                startTime = time.time()
+                try:
+                    row = next(rowIter)
+                except StopIteration:
+                    break
+                finally:
+                    fetchSeconds += time.time() - startTime
+                rowCnt += 1
+                yield row
+        finally:
+            # also recorded when the caller stops iterating early
+            self.profiler.recordFetch(self.sql, fetchSeconds, rowCnt,
+                                      self.getRoundTrips(rowCnt))
+
+    def __next__(self):
+        startTime = time.time()
+        row = next(self.curObj)
+        self.profiler.recordFetch(self.sql, time.time() - startTime, 1, 0)
+        return row
@@ -39,6 +39,13 @@ a) a parser that will return a dictionary with the structure:
         }
     }
 
+    A parameter that occurs more than once at the same level, for example
+    several ADDRESS entries in an ADDRESS_LIST, is stored as a list of its
+    values in the order they occur:
+        {'ADDRESS_LIST':
+            {'ADDRESS': [{'HOST': 'host1.domain', 'PORT': '1521'},
+                         {'HOST': 'host2.domain', 'PORT': '1521'}]}}
+
     There is also a class that will wrap this datastructure with methods that
     allow recursive searches for parameters, or specific retrieval of specific
     parameters.  This class has been developed on an as needed basis.  Inother words
@@ -46,9 +53,13 @@ a) a parser that will return a dictionary with the structure:
     is when the method will be defined
 '''
 
-import re
-import pprint
+import hashlib
 import logging
+import os
+import pickle
+import pprint
+import re
+import tempfile
 
 
 class TNSConst(object):
@@ -65,25 +76,92 @@ class TNSConst(object):
     manualData = {
     }
 
+    # bump when the structure produced by the parser changes so that
+    # existing parse caches are ignored
+    cacheVersion = 3
+    cacheSuffix = '.tnscache'
+
+
+class ConnectDescriptor(object):
+    '''
+    a tnsnames entry resolved to a connect descriptor that can be handed
+    straight to cx_Oracle in place of a dsn created with makedsn().  The
+    descriptor text is taken from the tnsnames file, so ADDRESS_LIST,
+    FAILOVER, LOAD_BALANCE etc. are preserved.
+
+    :ivar label: the tnsnames entry the descriptor was resolved from
+    :ivar dsn: the connect descriptor text
+    :ivar serviceName: the service name, None if the entry uses a SID
+    :ivar sid: the SID, None if the entry uses a service name
+    :ivar addresses: list of (host, port) tuples in the order they occur
+                     in the descriptor
+    :ivar loadBalance: whether client load balancing is enabled
+    :ivar failover: whether connect time failover is enabled
+    '''
+    addressRegex = re.compile(r'\(ADDRESS=((?:\([^()]*\))+)\)', re.IGNORECASE)
+    paramRegex = re.compile(r'\(([^()=]+)=([^()]*)\)')
+    enabledValues = ('ON', 'YES', 'TRUE')
+
+    def __init__(self, label, dsn, serviceName=None, sid=None):
+        self.label = label
+        self.dsn = dsn
+        self.serviceName = serviceName
+        self.sid = sid
+        self.addresses = []
+        for addressMatch in self.addressRegex.finditer(dsn):
+            params = self.getParams(addressMatch.group(1))
+            self.addresses.append((params.get(TNSConst.key_Host),
+                                   params.get(TNSConst.key_Port)))
+        params = self.getParams(dsn)
+        self.loadBalance = \
+            params.get('LOAD_BALANCE', '').upper() in self.enabledValues
+        # connect time failover is on by default when there are several
+        # addresses
+        self.failover = \
+            params.get('FAILOVER', 'ON').upper() in self.enabledValues
+
+    def getParams(self, text):
+        '''
+        :return: dictionary of the innermost parameters in the text, for
+                 repeated parameters the first occurrence is kept
+        '''
+        params = {}
+        for key, value in self.paramRegex.findall(text):
+            key = key.strip().upper()
+            if key not in params:
+                params[key] = value.strip()
+        return params
+
+    def __str__(self):
+        return self.dsn
+
+    def __repr__(self):
+        return 'ConnectDescriptor({0!r}, {1!r})'.format(self.label, self.dsn)
+
 
 class TNSNames(object):
 
-    def __init__(self, struct):
+    def __init__(self, struct, descriptors=None):
         self.const = TNSConst
 
-        modDotClass = '{0}.{1}'.formatSql(__name__, self.__class__.__name__)
+        modDotClass = '{0}.{1}'.format(__name__, self.__class__.__name__)
         self.logger = logging.getLogger(modDotClass)
 
         self.struct = struct
+        # alias -> the descriptor text from the tnsnames file, see
+        # TNSParser.parse()
+        self.descriptors = descriptors if descriptors is not None else {}
+        self.connectDescriptors = {}
         for entry in self.const.manualData.keys():
             if entry in self.struct:
                 msg = 'the manually configured entry for {0} already exists in the tnsnames file'
-                msg = msg.formatSql(entry)
-                raise ValueError, msg
+                msg = msg.format(entry)
+                raise ValueError(msg)
             else:
                 # print 'self.struct type:', type(self.struct)
                 self.struct[entry] = self.const.manualData[entry]
         self.pp = None
+        self.buildIndexes()
 
     def pprint(self):
         if not self.pp:
@@ -110,112 +188,251 @@ class TNSNames(object):
         retVal = retVal.strip()
         return retVal
 
-    def getTNSEntryByLabelNoSuffix(self, serverName, inStruct=None, rootKey=None):
-        rootCall = False
-        if not inStruct:
-            inStruct = self.struct
-            rootCall = True
-        serverNameNoSuffix = self.removeSuffix(serverName)
-        matchedServers = []
-        for entry in inStruct.keys():
-            if not rootKey:
-                rootKey = entry
-            entryNameNoSuffix = self.removeSuffix(entry)
-            if serverNameNoSuffix.upper() == entryNameNoSuffix.upper():
-                matchedServers.append(entry)
-        if not matchedServers:
-            for entry in inStruct.keys():
-                if isinstance(inStruct[entry], dict):
-                    retVal = self.getTNSEntryByLabelNoSuffix(serverName, inStruct[entry], rootKey)
-                    if retVal:
-                        matchedServers.extend(retVal)
-                else:
-                    entryNameNoSuffix = self.removeSuffix(entry)
-                    if serverNameNoSuffix.upper() == entryNameNoSuffix.upper():
-                        matchedServers.append(rootKey)
-                        print 'found match for key {0}, and value {1}'.formatSql(entry, inStruct[entry])
-        if rootCall:
-            if len(matchedServers) > 1:
-                msg = 'found more than one entry in the TNSNames file for the server name: {0}' + \
-                      ' entries include: {1}'
-                # if they all have the same servicename / host / port then send back
-                # any of them.
-                cmprHost, cmprPort, cmprSrvNm, cmprSid = [None, None, None, None]
-                for matchedServer in matchedServers:
-                    matchStruct = self.getTNSEntryByLabel(matchedServer)
-                    curHost = self.getHostFromStruct(matchStruct)
-                    curPort = self.getPortFromStruct(matchStruct)
-                    curSrvNm = self.getServicenameFromStruct(matchStruct)
-                    curSid = self.getSIDFromStruct(matchStruct)
-                    # if these are none values then convert to strings
-                    # because comparison does case insensitive test
-                    if not curSid:
-                        curSid = str(curSid)
-                    if not curSrvNm:
-                        curSrvNm = str(curSrvNm)
-                    if not cmprHost:
-                        cmprHost = curHost
-                        cmprPort = curPort
-                        cmprSrvNm = curSrvNm
-                        cmprSid = curSid
-                    elif curHost.lower() <> cmprHost.lower() or \
-                         curPort <> cmprPort or \
-                         curSrvNm.lower() <> cmprSrvNm.lower() or \
-                         curSid.lower() <> cmprSid.lower():
-                        msg = 'multiple hosts: {0} match the entry name {1} but have ' + \
-                              'differing connect params.\n  host: {2} {3}\n  port: {4} {5}\n' + \
-                              '  curSrvNm: {6} {7}\n  curSid  {8} {9}\n label {10}\n {11}'
-                        raise ValueError, msg.formatSql(
-                            matchedServers, serverName, curHost, cmprHost, \
-                            curPort, cmprPort, curSrvNm, cmprSrvNm, \
-                            curSid, cmprSid, matchedServer, matchStruct)
+    def getEntryParams(self, struct, params=None):
+        '''
+        flattens the nested structure for a single entry into a dictionary
+        of parameter name -> cleaned value.  When a parameter occurs more
+        than once the first occurrence is kept, same as getKey()
+        '''
+        if params is None:
+            params = {}
+        for key in struct.keys():
+            values = struct[key]
+            if not isinstance(values, list):
+                values = [values]
+            for value in values:
+                if isinstance(value, dict):
+                    self.getEntryParams(value, params)
+                elif key.upper() not in params:
+                    params[key.upper()] = self.clean(value)
+        return params
+
+    def getAddresses(self, struct, addresses=None):
+        '''
+        :param struct: the nested structure for a single entry
+        :return: list of (host, port) tuples for every parameter group that
+                 defines a HOST, in the order they occur, port is None if
+                 the group does not define one
+        '''
+        if addresses is None:
+            addresses = []
+        host = struct.get(self.const.key_Host)
+        if host and not isinstance(host, (dict, list)):
+            port = struct.get(self.const.key_Port)
+            if isinstance(port, (dict, list)):
+                port = None
+            addresses.append((self.clean(host), self.clean(port)))
+        for value in struct.values():
+            values = value if isinstance(value, list) else [value]
+            for curValue in values:
+                if isinstance(curValue, dict):
+                    self.getAddresses(curValue, addresses)
+        return addresses
+
+    def addToIndex(self, index, indexKey, value):
+        if indexKey:
+            if indexKey not in index:
+                index[indexKey] = []
+            if value not in index[indexKey]:
+                index[indexKey].append(value)
+
+    def buildIndexes(self):
+        '''
+        builds the hash indexes that the lookup methods use, so that
+        resolving a label or a service name does not require walking the
+        whole structure.  Built once when the object is created, if
+        self.struct is modified afterwards this method needs to be called
+        again.
+
+        indexes, all keyed by case normalized values:
+          - aliasIndex: alias -> key in self.struct
+          - aliasNoSuffixIndex: alias without domain -> list of keys
+          - serviceNameIndex: service name -> list of keys
+          - sidIndex: SID -> list of keys
+          - hostPortIndex: host:port -> list of keys, every address of
+            an entry is indexed, including the failover addresses in an
+            ADDRESS_LIST
+          - valueIndex: value of any of the searchable parameters (service
+            name, host, global name, SID, instance name) -> list of
+            [key, parameter name, value]
+        '''
+        self.entryParams = {}
+        self.aliasIndex = {}
+        self.aliasNoSuffixIndex = {}
+        self.serviceNameIndex = {}
+        self.sidIndex = {}
+        self.hostPortIndex = {}
+        self.valueIndex = {}
+        srchFields = [self.const.key_Service_Name, self.const.key_Host,
+                      self.const.key_GlobalName, self.const.key_SID,
+                      self.const.key_Inst]
+        for entry in self.struct.keys():
+            aliases = [self.clean(entry)]
+            if ',' in entry:
+                aliases.extend(entry.split(','))
+            for alias in aliases:
+                alias = alias.strip().upper()
+                if alias and alias not in self.aliasIndex:
+                    self.aliasIndex[alias] = entry
+            self.addToIndex(self.aliasNoSuffixIndex,
+                            self.removeSuffix(entry).upper(), entry)
+
+            if not isinstance(self.struct[entry], dict):
+                continue
+            params = self.getEntryParams(self.struct[entry])
+            self.entryParams[entry] = params
+            srvNm = params.get(self.const.key_Service_Name)
+            if srvNm:
+                self.addToIndex(self.serviceNameIndex, srvNm.upper(), entry)
+            sid = params.get(self.const.key_SID)
+            if sid:
+                self.addToIndex(self.sidIndex, sid.upper(), entry)
+            for host, port in self.getAddresses(self.struct[entry]):
+                self.addToIndex(self.hostPortIndex,
+                                self.getHostPortKey(host, port), entry)
+            for srchField in srchFields:
+                value = params.get(srchField)
+                if value:
+                    self.addToIndex(self.valueIndex, value.upper(),
+                                    [entry, srchField, value])
+
+    def getHostPortKey(self, host, port):
+        '''
+        :return: the normalized host:port string used as the key for the
+                 hostPortIndex
+        '''
+        return '{0}:{1}'.format(host.strip().lower(), str(port).strip())
+
+    def getEntryParam(self, entry, paramName):
+        '''
+        :param entry: the key in self.struct
+        :param paramName: the parameter to retrieve, example SERVICE_NAME
+        :return: the value of the parameter for the entry, None if the
+                 entry does not define it
+        '''
+        params = self.entryParams.get(entry, {})
+        return params.get(paramName.upper())
+
+    def getAliasesForServiceName(self, serviceName):
+        '''
+        reverse lookup, service name to the tnsnames aliases that connect
+        to it.
+
+        :param serviceName: the service name, case insensitive
+        :return: list of the aliases, empty if none match
+        :rtype: list
+        '''
+        return list(self.serviceNameIndex.get(serviceName.strip().upper(), []))
+
+    def getAliasesForSID(self, sid):
+        '''
+        :param sid: the SID, case insensitive
+        :return: list of the aliases that connect to the SID
+        :rtype: list
+        '''
+        return list(self.sidIndex.get(sid.strip().upper(), []))
+
+    def getAliasesForHostPort(self, host, port=1521):
+        '''
+        :param host: the host name, case insensitive
+        :param port: the listener port
+        :return: list of the aliases that connect to the host / port
+        :rtype: list
+        '''
+        return list(self.hostPortIndex.get(self.getHostPortKey(host, port), []))
+
+    def getTNSEntryByLabelNoSuffix(self, serverName):
+        '''
+        finds the entry whose label matches the server name once the domain
+        suffix has been removed from both.
+
+        :param serverName: the label to search for, with or without domain
+        :return: the matching key in self.struct, None if there is no match
+        :raises ValueError: if several entries match and they do not all
+                            connect to the same host / port / service
+        '''
+        serverNameNoSuffix = self.removeSuffix(serverName).upper()
+        matchedServers = self.aliasNoSuffixIndex.get(serverNameNoSuffix, [])
+        if len(matchedServers) > 1:
+            msg = 'found more than one entry in the TNSNames file for the server name: {0}' + \
+                  ' entries include: {1}'
+            # if they all have the same servicename / host / port then send back
+            # any of them.
+            cmprHost, cmprPort, cmprSrvNm, cmprSid = [None, None, None, None]
+            for matchedServer in matchedServers:
+                matchStruct = self.getTNSEntryByLabel(matchedServer)
+                curHost = self.getHostFromStruct(matchStruct)
+                curPort = self.getPortFromStruct(matchStruct)
+                curSrvNm = self.getServicenameFromStruct(matchStruct)
+                curSid = self.getSIDFromStruct(matchStruct)
+                # if these are none values then convert to strings
+                # because comparison does case insensitive test
+                if not curSid:
+                    curSid = str(curSid)
+                if not curSrvNm:
+                    curSrvNm = str(curSrvNm)
+                if not cmprHost:
+                    cmprHost = curHost
+                    cmprPort = curPort
+                    cmprSrvNm = curSrvNm
+                    cmprSid = curSid
+                elif curHost.lower() != cmprHost.lower() or \
+                     curPort != cmprPort or \
+                     curSrvNm.lower() != cmprSrvNm.lower() or \
+                     curSid.lower() != cmprSid.lower():
+                    msg = 'multiple hosts: {0} match the entry name {1} but have ' + \
+                          'differing connect params.\n  host: {2} {3}\n  port: {4} {5}\n' + \
+                          '  curSrvNm: {6} {7}\n  curSid  {8} {9}\n label {10}\n {11}'
+                    raise ValueError(msg.format(
+                        matchedServers, serverName, curHost, cmprHost, \
+                        curPort, cmprPort, curSrvNm, cmprSrvNm, \
+                        curSid, cmprSid, matchedServer, matchStruct))
+            retVal = matchedServers[0]
+        else:
+            if matchedServers:
                 retVal = matchedServers[0]
             else:
-                if matchedServers:
-                    retVal = matchedServers[0]
-                else:
-                    retVal = None
-        else:
-            retVal = None
+                retVal = None
         return retVal
 
-    def getServiceName(self, text2srch, inStruct=None):
+    def getServiceName(self, text2srch):
         '''
-        small sample of the data in the self.struct variable:
-            ...
+        :param text2srch: either a label, or the value of one of the
+                          searchable parameters (service name, host, global
+                          name, SID, instance name)
+        :return: if text2srch is a label the service name of that entry,
+                 otherwise the matching parameter value, None if nothing
+                 matches
         '''
-        # srchFields are the columns to search for the value
-        # in the variable 'text2srch'
-        if not inStruct:
-            inStruct = self.struct
         retVal = None
-        srchFields = [self.const.key_Service_Name, self.const.key_Host, self.const.key_GlobalName, self.const.key_SID]
-        for entry in inStruct.keys():
-            if text2srch.upper() == entry.upper():
-                value = inStruct[entry][self.const.key_Description][self.const.key_ConnectData][self.const.key_Service_Name]
-                value = self.clean(value)
-                retVal = value
-        if not retVal:
-            # for srchField in srchFields:
-                    # if entry.upper() == srchField.upper():
-                    #    # now is the value the same
-                    #    value =
-            key, value = self.recursiveSearch(text2srch, inStruct)
-            print 'found the value in the key: ', key
-            retVal = value
+        entry = self.aliasIndex.get(self.clean(text2srch).upper())
+        if entry:
+            retVal = self.getEntryParam(entry, self.const.key_Service_Name)
+        else:
+            matches = self.valueIndex.get(self.clean(text2srch).upper())
+            if matches:
+                entry, key, retVal = matches[0]
+                self.logger.debug("found the value in the key: %s", key)
         return retVal
 
     def getKey(self, srchKey, struct):
         retVal = None
         keys = struct.keys()
         for key in keys:
+            values = struct[key]
+            if not isinstance(values, list):
+                values = [values]
             if key.upper() == srchKey.upper():
-                retVal = struct[key]
+                # repeated parameters, the first occurrence is used
+                retVal = values[0]
+                break
+            for value in values:
+                if isinstance(value, dict):
+                    retVal = self.getKey(srchKey, value)
+                    if retVal:
+                        break
+            if retVal:
                 break
-            elif  isinstance(struct[key], dict):
-                retVal = self.getKey(srchKey, struct[key])
-                if retVal:
-                    break
         retVal = self.clean(retVal)
         return retVal
 
@@ -230,13 +447,13 @@ class TNSNames(object):
         return retVal
 
     def getServicenameFromStruct(self, struct):
-        self.logger.debug("struct {0}".formatSql(struct))
+        self.logger.debug("struct {0}".format(struct))
         retVal = self.getKey(self.const.key_Service_Name, struct)
         retVal = self.clean(retVal)
         return retVal
 
     def getSIDFromStruct(self, struct):
-        self.logger.debug("struct {0}".formatSql(struct))
+        self.logger.debug("struct {0}".format(struct))
         retVal = self.getKey(self.const.key_SID, struct)
         retVal = self.clean(retVal)
         return retVal
@@ -253,320 +470,453 @@ class TNSNames(object):
         other information about that connection will be easier.
         '''
         retVal = None
-        for entry in self.struct.keys():
-            entrycln = self.clean(entry)
-            if text2srch.upper() == entrycln.upper():
-                retVal = entrycln
-                break
-        if not retVal:
-            for entry in self.struct.keys():
-                retList = self.recursiveSearch(text2srch, self.struct[entry])
-                if retList:
-                    if retList[1]:
-                        retVal = entry
-                        break
+        text2srch = self.clean(text2srch).upper()
+        entry = self.aliasIndex.get(text2srch)
+        if entry:
+            retVal = self.clean(entry)
+        else:
+            matches = self.valueIndex.get(text2srch)
+            if matches:
+                retVal = matches[0][0]
         return retVal
 
     def recursiveSearch(self, text2srch, struct):
         structKeys = struct.keys()
         retVal = None
         for structKey in structKeys:
-            if isinstance(struct[structKey], dict):
-                retVal = self.recursiveSearch(text2srch, struct[structKey])
+            value = struct[structKey]
+            if isinstance(value, list):
+                # repeated parameters, the first occurrence is searched
+                value = value[0]
+            if isinstance(value, dict):
+                retVal = self.recursiveSearch(text2srch, value)
                 break
             else:
-                value = self.clean(struct[structKey])
-                print '{0} : {1}'.formatSql(text2srch, value)
+                value = self.clean(value)
+                self.logger.debug("%s : %s", text2srch, value)
                 if text2srch == value or text2srch.upper() == value.upper():
                     retVal = [structKey, value]
-                    print 'found the value'
+                    self.logger.debug("found the value")
                     break
         return retVal
 
     def getTNSEntryByLabel(self, label):
         retVal = None
-        structKeys = self.struct.keys()
         if label:
-            for entry in structKeys:
-                if ',' in entry:
-                    entryList = entry.split(',')
-                    for singleEntry in entryList:
-                        if singleEntry == label:
-                            retVal = self.struct[entry]
-                            break
-                entryCln = self.clean(entry)
-                if entryCln.upper() == label.upper():
-                    retVal = self.struct[entry]
-                    break
+            entry = self.aliasIndex.get(label.strip().upper())
+            if entry:
+                retVal = self.struct[entry]
+        return retVal
+
+    def formatDescriptor(self, struct):
+        '''
+        converts the structure for an entry back into descriptor text, used
+        for entries that were not read from a file (manualData)
+        '''
+        descriptor = []
+        for key in struct.keys():
+            values = struct[key]
+            if not isinstance(values, list):
+                values = [values]
+            for value in values:
+                if isinstance(value, dict):
+                    value = self.formatDescriptor(value)
+                descriptor.append('({0}={1})'.format(key, value))
+        return ''.join(descriptor)
+
+    def getConnectDescriptor(self, label):
+        '''
+        resolves a label to a ConnectDescriptor.  Labels are matched the
+        same way as getTNSEntryByLabel(), falling back to matching without
+        the domain suffix.  Descriptors are built once per entry and reused
+        on subsequent calls.
+
+        :param label: the tnsnames label
+        :return: the connect descriptor, None if the label does not exist
+        :rtype: ConnectDescriptor
+        '''
+        entry = self.aliasIndex.get(label.strip().upper())
+        if not entry:
+            entry = self.getTNSEntryByLabelNoSuffix(label)
+        if not entry:
+            return None
+        if entry not in self.connectDescriptors:
+            dsn = self.descriptors.get(entry)
+            if not dsn:
+                dsn = self.formatDescriptor(self.struct[entry])
+            self.connectDescriptors[entry] = ConnectDescriptor(
+                entry, dsn,
+                self.getEntryParam(entry, self.const.key_Service_Name),
+                self.getEntryParam(entry, self.const.key_SID))
+        return self.connectDescriptors[entry]
+
+    def getConnectDescriptors(self, labels, ignoreMissing=False):
+        '''
+        bulk version of getConnectDescriptor()
+
+        :param labels: list of tnsnames labels
+        :param ignoreMissing: when true labels that cannot be resolved are
+                              left out of the results instead of raising an
+                              error
+        :return: dictionary of label -> ConnectDescriptor
+        :rtype: dict
+        :raises ValueError: if any of the labels cannot be resolved and
+                            ignoreMissing is false
+        '''
+        retVal = {}
+        missing = []
+        for label in labels:
+            descriptor = self.getConnectDescriptor(label)
+            if descriptor is None:
+                missing.append(label)
+            else:
+                retVal[label] = descriptor
+        if missing:
+            msg = 'unable to find the labels {0} in the tnsnames file'
+            msg = msg.format(', '.join(missing))
+            if not ignoreMissing:
+                self.logger.error(msg)
+                raise ValueError(msg)
+            self.logger.warning(msg)
         return retVal
 
 
 class TNSParser(object):
-
-    def __init__(self, tnsNamesPathName):
+    '''
+    Parses a tnsnames.ora file into the nested dictionary structure
+    described at the top of this module.
+
+    The file is processed in a single pass: a tokenizer breaks the text
+    up into brackets, equals signs, commas and words, and a stack based
+    parser assembles the tokens into the nested structure as they arrive,
+    so parsing time grows linearly with the size of the file.
+
+    Supports:
+      - comma separated lists of aliases, on one or several lines, each
+        alias gets its own entry in the structure
+      - IFILE = path entries, the referenced file is parsed and its
+        entries included.  Relative paths are resolved against the
+        directory of the file containing the IFILE.
+
+    If a cacheDir is provided the parsed structure is pickled to that
+    directory and reused by later parses for as long as the size and
+    modification time of the tnsnames file, and of any files it includes,
+    remain the same.
+    '''
+    tokenRegex = re.compile(r'''
+        (?P<comment>\#[^\n]*) |
+        (?P<whitespace>\s+) |
+        (?P<open>\() |
+        (?P<close>\)) |
+        (?P<equals>=) |
+        (?P<comma>,) |
+        (?P<quoted>"[^"]*"|'[^']*') |
+        (?P<word>[^\s()=,#"']+)
+        ''', re.VERBOSE)
+    ifileKey = 'IFILE'
+
+    def __init__(self, tnsNamesPathName, cacheDir=None):
+        self.logger = logging.getLogger(__name__)
+        self.const = TNSConst
         self.tnsNamesPathName = tnsNamesPathName
-        # self.destFile = destFile
+        self.cacheDir = cacheDir
         self.populatedStruct = {}
-        print 'self.tnsNamesPathName', self.tnsNamesPathName
-
-        self.tnsNamesFH = open(self.tnsNamesPathName, 'r')
-        self.tnsNamesContent = []
-        regexMultiLineLabel = re.compile('^\s*\w+(\.\w+)*,\s*$', re.IGNORECASE)
-        bufferStr = ''
-        for tnsNameLine in self.tnsNamesFH:
-            # move the multiline labels onto a single line
-            if regexMultiLineLabel.match(tnsNameLine):
-                bufferStr = bufferStr + tnsNameLine
-            else:
-                bufferStr = bufferStr + tnsNameLine
-                bufferStr = bufferStr.replace('\n', ' ') + '\n'
-                self.tnsNamesContent.append(bufferStr)
-                # print 'bufferStr', bufferStr,
-                bufferStr = ''
-        self.tnsNamesFH.close()
-        # self.contents = open(self.destFile, 'w')
-        #labelRegex = re.compile("\w\.(\w\.)*\s*=\s*")
-
-        #parseLevel = 0
-        #dataStruct = {}
-        self.labelLineLoc = None
-        # self.pp = pprint.PrettyPrinter(indent=4)
+        # alias -> connect descriptor text, with comments and whitespace
+        # removed
+        self.descriptors = {}
+        # the real paths of the files that went into the last parse
+        self.sourceFiles = []
+        self.logger.debug('self.tnsNamesPathName: %s', self.tnsNamesPathName)
+
+    def tokenize(self, text):
+        '''
+        generator that breaks the text of a tnsnames file up into tokens,
+        comments and whitespace are dropped.
+
+        :param text: the contents of a tnsnames file
+        :returns: generator of (token type, token text, start position,
+                  end position) tuples
+        '''
+        for match in self.tokenRegex.finditer(text):
+            tokenType = match.lastgroup
+            if tokenType in ('comment', 'whitespace'):
+                continue
+            yield tokenType, match.group(), match.start(), match.end()
+
+    def getLineNumber(self, text, position):
+        '''
+        :return: the line number of the character position, used to report
+                 errors
+        '''
+        return text.count('\n', 0, position) + 1
 
     def parse(self):
-        # self.getRootLabels()
-        bracketLocations = self.getBracketLocations()
-        rcrsr = RecurseStruct(bracketLocations)
-        rcrsr.createStruct()
-        structuredBrackets = rcrsr.getNestedStruct()
-        populatedStruct = {}
-        self.populateStruct(populatedStruct, structuredBrackets, True)
-        # self.pp.pprint(populatedStruct)
-        # DONE, this struct 'populatedStruct' can be used to retrieve values!
-        return populatedStruct
+        '''
+        parses the tnsnames file that was provided to the constructor, or
+        if caching is enabled and the cache is current, loads the
+        previously parsed structure from the cache.
 
-    def getTNSNames(self):
+        :returns: dictionary with the parsed tnsnames entries
+        :rtype: dict
         '''
-        if the file has not already been parsed, it will parse it and
-        populate the structure self.populatedStruct.
+        populatedStruct = None
+        if self.cacheDir:
+            populatedStruct = self.loadCache()
+        if populatedStruct is None:
+            with open(self.tnsNamesPathName, 'r') as tnsNamesFH:
+                tnsNamesContent = tnsNamesFH.read()
+            includedFiles = set([os.path.realpath(self.tnsNamesPathName)])
+            self.descriptors = {}
+            populatedStruct = self.parseText(tnsNamesContent,
+                                             self.tnsNamesPathName,
+                                             includedFiles, self.descriptors)
+            self.sourceFiles = sorted(includedFiles)
+            if self.cacheDir:
+                self.saveCache(populatedStruct)
+        self.populatedStruct = populatedStruct
+        return populatedStruct
 
-        It will then create a TNSNames object which includes a wrapper
-        wrapper class around the data structure self.populatedStruct.
+    def getCacheFile(self):
         '''
-        populatedStruct = self.parse()
-        TNSNamesObj = TNSNames(populatedStruct)
+        :return: the path to the cache file for the tnsnames file, the name
+                 is derived from the real path of the tnsnames file
+        '''
+        realPath = os.path.realpath(self.tnsNamesPathName)
+        pathHash = hashlib.sha1(realPath.encode('utf-8')).hexdigest()
+        return os.path.join(self.cacheDir, pathHash + self.const.cacheSuffix)
 
-        return TNSNamesObj
+    def getFileSignatures(self, paths):
+        '''
+        :param paths: list of file paths
+        :return: list of (path, size, modification time) tuples, used to
+                 determine if the cache is still current
+        '''
+        signatures = []
+        for path in paths:
+            fileStat = os.stat(path)
+            signatures.append((path, fileStat.st_size, fileStat.st_mtime_ns))
+        return signatures
 
-    def populateStruct(self, newStruct, oldStruct, start=False):
-        for elemStr in oldStruct.keys():
-            elemInt = map(int, elemStr.split(','))
-            elemLabel = self.getNestedLabel(elemInt)
-            if start:
-                rootLabel = self.getLabel(elemInt)
-                newStruct[rootLabel] = {}
-                newStruct[rootLabel][elemLabel] = {}
-            elif oldStruct[elemStr]:
-                newStruct[elemLabel] = {}
-            else:
-                # get the actual value for this parameter
-                elemValue = self.getNestedValue(elemInt)
-                newStruct[elemLabel] = elemValue
-            if start:
-                # print 'newStruct[rootLabel][elemLabel]', newStruct[rootLabel][elemLabel]
-                # print 'oldStruct[elemStr]', oldStruct[elemStr]
-                self.populateStruct(newStruct[rootLabel][elemLabel], oldStruct[elemStr])
-            else:
-                self.populateStruct(newStruct[elemLabel], oldStruct[elemStr])
-
-    def getRootLabels(self):
-        '''
-        Searching for the start of a label
-        '''
-        firstLine = re.compile(r'^\s*\w(\.\w)*\s*=*\s*.*$')
-        lineCnt = 0
-        self.labelStruct = {}
-        self.labelLineLoc = []
-        # lineCnt = 0
-        # while lineCnt < len(self.tnsNamesContent):
-        #    tnsNamesLine = self.tnsNamesContent[lineCnt]
-        for tnsNamesLine in self.tnsNamesContent:
-            tnsNamesLineStrp = tnsNamesLine.strip()
-            if (tnsNamesLineStrp) and tnsNamesLineStrp[0] <> '#':
-                if firstLine.match(tnsNamesLine):
-                    # if the last character has a , in it read the next line and
-                    # append
-                    # while tnsNamesLine[0] == ',':
-                    # print 'labelLine:', tnsNamesLine
-                    label, rest = tnsNamesLine.split('=')
-                    label = label.strip()
-                    self.labelStruct[label] = {}
-                    self.labelLineLoc.append(lineCnt)
-            lineCnt += 1
-
-    def getLabel(self, currentBrackets):
-        '''
-        returns the root label for the bracket
-        '''
-        startLine = currentBrackets[0]
-        if not self.labelLineLoc:
-            self.getRootLabels()
-        for labelPos in self.labelLineLoc:
-            if labelPos < startLine:
-                curValue = labelPos
-            if labelPos > startLine:
-                break
-        label, rest = self.tnsNamesContent[curValue].split('=')
-        label = label.strip()
-        return label
-
-    def getBracketLocations(self):
-        openBrackets = []
-        linecnt = 0
-        level = 0
-
-        position = {}
-        arrayPos = 0
-
-        for tnsLine in self.tnsNamesContent:
-            tnsLineStripped = tnsLine.strip()
-            if (tnsLineStripped) and tnsLineStripped[0] <> '#':
-                # find the open bracets:
-                charcntr = 0
-                for char in tnsLine:
-                    if char == '(':
-                        openBrackets.append([linecnt, charcntr])
-                        position[level] = arrayPos
-                        arrayPos += 1
-                        level += 1
-                    elif char == ')':
-                        level -= 1
-                        openBrackets[position[level]].extend([linecnt, charcntr])
-                    charcntr += 1
-            linecnt += 1
-        # pp = pprint.PrettyPrinter(indent=4)
-        # pp.pprint(openBrackets)
-        # self.openBrackets = openBrackets
-        return openBrackets
-
-    def getValue(self, param):
-        # deal with this later
-        return 'value'
-
-    def __getNestedData(self, bracketParams, paramType):
-        startLine = bracketParams[0]
-        endLine = bracketParams[2]
-        startChar = bracketParams[1]
-        endChar = bracketParams[3]
-
-        data = []
-        if startLine == endLine:
-            data.append(self.tnsNamesContent[startLine][startChar:endChar + 1])
-        else:
-            dataCntr = startLine
-            while endLine > dataCntr:
-                if dataCntr == startLine:
-                    data.append(self.tnsNamesContent[dataCntr][startChar:])
-                elif dataCntr == endLine:
-                    data.append(self.tnsNamesContent[dataCntr][:endChar + 1])
+    def loadCache(self):
+        '''
+        :return: the cached structure if the cache exists and none of the
+                 source files have changed since it was written, otherwise
+                 None
+        '''
+        cacheFile = self.getCacheFile()
+        if not os.path.exists(cacheFile):
+            return None
+        try:
+            with open(cacheFile, 'rb') as cacheFH:
+                cache = pickle.load(cacheFH)
+            if cache['version'] != self.const.cacheVersion:
+                return None
+            paths = [signature[0] for signature in cache['sources']]
+            if self.getFileSignatures(paths) != cache['sources']:
+                self.logger.debug("tnsnames cache %s is stale", cacheFile)
+                return None
+        except (OSError, EOFError, KeyError, pickle.UnpicklingError) as e:
+            self.logger.warning("unable to use the tnsnames cache %s: %s",
+                                cacheFile, e)
+            return None
+        self.logger.debug("loaded tnsnames from the cache %s", cacheFile)
+        self.sourceFiles = paths
+        self.descriptors = cache['descriptors']
+        return cache['struct']
+
+    def saveCache(self, struct):
+        '''
+        writes the parsed structure to the cache.  The cache is written to a
+        temporary file that is then renamed so other processes never see a
+        partially written cache.
+        '''
+        cache = {'version': self.const.cacheVersion,
+                 'sources': self.getFileSignatures(self.sourceFiles),
+                 'struct': struct,
+                 'descriptors': self.descriptors}
+        cacheFile = self.getCacheFile()
+        try:
+            if not os.path.exists(self.cacheDir):
+                os.makedirs(self.cacheDir)
+            tmpFH, tmpFile = tempfile.mkstemp(dir=self.cacheDir,
+                                              suffix=self.const.cacheSuffix)
+            with os.fdopen(tmpFH, 'wb') as cacheFH:
+                pickle.dump(cache, cacheFH, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpFile, cacheFile)
+        except OSError as e:
+            # caching is an optimization, a failure to write it is not fatal
+            self.logger.warning("unable to write the tnsnames cache %s: %s",
+                                cacheFile, e)
+
+    def parseText(self, text, sourceName, includedFiles, descriptors=None):  # pylint: disable=too-many-branches, too-many-statements, too-many-locals
+        '''
+        does the actual parsing of the text of a tnsnames file.
+
+        The parser keeps a stack with a frame for each bracket that is
+        currently open.  A frame keeps track of the parameter name, the
+        dictionary the parameter is to be stored in, and either the nested
+        dictionary (when the parameter contains other parameters) or the
+        position where its value starts.  Parameters that are repeated in
+        the same dictionary are stored as a list, see addValue().
+
+        :param text: the contents of the tnsnames file
+        :param sourceName: the name of the file, used in error messages
+                           and to resolve IFILE paths
+        :param includedFiles: the real paths of the files that have been
+                              parsed, used to stop IFILE loops
+        :param descriptors: if provided the descriptor text for each alias
+                            is added to this dictionary
+        :returns: dictionary with the parsed tnsnames entries
+        :rtype: dict
+        '''
+        struct = {}
+        stack = []
+        aliases = []
+        entryStruct = None
+        # the tokens that make up the descriptor currently being parsed
+        descTokens = []
+        # the states of the top level of the file (outside brackets):
+        #   alias - expecting an alias or a comma
+        #   value - after the = that follows the aliases
+        #   descriptor - after the closing bracket of a descriptor
+        state = 'alias'
+        for tokenType, token, start, end in self.tokenize(text):
+            if stack or tokenType == 'open':
+                if descTokens and tokenType in ('word', 'quoted') and \
+                        descTokens[-1][0] in ('word', 'quoted'):
+                    descTokens.append(('whitespace', ' '))
+                descTokens.append((tokenType, token))
+            if stack:
+                frame = stack[-1]
+                if tokenType == 'open':
+                    if frame['key'] is None:
+                        self.raiseParseError(text, sourceName, start,
+                                             'expected a parameter name')
+                    if frame['children'] is None:
+                        frame['children'] = {}
+                        self.addValue(frame['parent'], frame['key'],
+                                      frame['children'])
+                    stack.append({'key': None, 'parent': frame['children'],
+                                  'children': None, 'valueStart': None})
+                elif tokenType == 'close':
+                    stack.pop()
+                    if frame['children'] is None:
+                        if frame['valueStart'] is None:
+                            self.raiseParseError(text, sourceName, start,
+                                                 'parameter without a value')
+                        value = text[frame['valueStart']:start].strip()
+                        self.addValue(frame['parent'], frame['key'], value)
+                    if not stack:
+                        state = 'descriptor'
+                        if descriptors is not None:
+                            descriptor = ''.join([descToken[1] for descToken in descTokens])
+                            for alias in aliases:
+                                descriptors[alias] = descriptor
+                elif frame['key'] is None:
+                    if tokenType not in ('word', 'quoted'):
+                        self.raiseParseError(text, sourceName, start,
+                                             'expected a parameter name')
+                    frame['key'] = token.upper()
+                elif frame['valueStart'] is None and \
+                        frame['children'] is None:
+                    if tokenType != 'equals':
+                        self.raiseParseError(text, sourceName, start,
+                                             'expected =')
+                    frame['valueStart'] = end
+                # anything else is part of the value, which is sliced out
+                # of the text once the closing bracket is found
+            elif tokenType == 'open':
+                if state == 'alias':
+                    self.raiseParseError(text, sourceName, start,
+                                         'expected an alias')
+                if state == 'value':
+                    entryStruct = {}
+                    for alias in aliases:
+                        struct[alias] = entryStruct
+                    descTokens = descTokens[-1:]
+                state = 'descriptor'
+                stack.append({'key': None, 'parent': entryStruct,
+                              'children': None, 'valueStart': None})
+            elif tokenType in ('word', 'quoted'):
+                if state == 'value':
+                    # a top level entry without brackets, ie IFILE = path
+                    self.addTopLevelValue(struct, aliases, token, sourceName,
+                                          includedFiles, descriptors)
+                    state = 'alias'
                 else:
-                    data.append(self.tnsNamesContent[dataCntr])
-                dataCntr += 1
-        # print 'data: {0} {1}'.formatSql(data, type(data))
-        dataStr = ' '.join(data)
-        paramsplit = dataStr.split('=')
-        if paramType == 'label':
-            retVal = paramsplit[0]
-            retVal = retVal.replace('(', '')
+                    if state == 'descriptor':
+                        aliases = []
+                        state = 'alias'
+                    aliases.append(token)
+            elif tokenType == 'comma' and state == 'alias':
+                continue
+            elif tokenType == 'equals' and state == 'alias' and aliases:
+                state = 'value'
+            else:
+                self.raiseParseError(text, sourceName, start,
+                                     'unexpected {0}'.format(token))
+        if stack:
+            self.raiseParseError(text, sourceName, len(text),
+                                 'unclosed bracket at the end of the file')
+        return struct
+
+    def addValue(self, parent, key, value):
+        '''
+        adds a parameter to the dictionary it was found in, when the
+        parameter already exists the values are kept in a list, in the
+        order they occur
+        '''
+        if key not in parent:
+            parent[key] = value
+        elif isinstance(parent[key], list):
+            parent[key].append(value)
         else:
-            retVal = paramsplit[1]
-        retVal = retVal.strip()
-        # print 'retVal', retVal
-        return retVal
-
-    def getNestedLabel(self, bracketParams):
-        return self.__getNestedData(bracketParams, 'label')
-
-    def getNestedValue(self, bracketParams):
-        return self.__getNestedData(bracketParams, 'value')
+            parent[key] = [parent[key], value]
 
+    def addTopLevelValue(self, struct, aliases, value, sourceName,  # pylint: disable=too-many-arguments
+                         includedFiles, descriptors=None):
+        '''
+        deals with entries that have a value instead of a descriptor, the
+        only one currently supported is IFILE, which includes the entries
+        from another file.
+        '''
+        value = value.strip('"\'')
+        if len(aliases) == 1 and aliases[0].upper() == self.ifileKey:
+            ifilePath = os.path.join(os.path.dirname(sourceName), value)
+            realPath = os.path.realpath(ifilePath)
+            if realPath in includedFiles:
+                self.logger.warning("skipping the IFILE %s as it has " +
+                                    "already been included", ifilePath)
+                return
+            includedFiles.add(realPath)
+            self.logger.debug("including the IFILE: %s", ifilePath)
+            with open(ifilePath, 'r') as ifileFH:
+                ifileContent = ifileFH.read()
+            struct.update(self.parseText(ifileContent, ifilePath,
+                                         includedFiles, descriptors))
+        else:
+            self.logger.warning("ignoring the entry %s = %s in %s",
+                                ', '.join(aliases), value, sourceName)
 
-class RecurseStruct(object):
+    def raiseParseError(self, text, sourceName, position, problem):
+        '''
+        raises a ValueError describing where the parser found a problem
+        '''
+        msg = 'unable to parse the tnsnames file {0}, {1} on line {2}'
+        msg = msg.format(sourceName, problem,
+                         self.getLineNumber(text, position))
+        self.logger.error(msg)
+        raise ValueError(msg)
 
-    def __init__(self, bracketList):
-        self.pp = pprint.PrettyPrinter(indent=4)
-        self.openBrackets = bracketList
-        self.accounted = []
-        self.struct = {}
-        self.rootElems = self.getRootElements()
+    def getTNSNames(self):
+        '''
+        if the file has not already been parsed, it will parse it and
+        populate the structure self.populatedStruct.
 
-    def getRootElements(self):
-        rootElems = []
-        for bracket in self.openBrackets:
-            if not rootElems:
-                rootElems.append(bracket)
-                currentRoot = bracket
-            else:
-                if not self.isNested(currentRoot, bracket):
-                    rootElems.append(bracket)
-                    currentRoot = bracket
-        pp = pprint.PrettyPrinter(indent=4)
-        # print 'ROOT ELEMENTS'
-        # pp.pprint(rootElems)
-        return rootElems
-
-    def isNested(self, param1, param2):
-        '''
-        is param2 nested in param1
-        These are nested
-            param1 [6, 2, 14, 2]
-            param2 [7, 4, 9, 4]
-
-        These are not:
-            param1 [12, 6, 12, 29],
-            param2 [17, 2, 25, 2],
-
-
-        example:
-        '''
-        retVal = True
-        if param2[0] > param1[2]:
-            retVal = False
-        elif param2[0] == param1[2]:
-            if param2[1] > param1[3]:
-                retVal = False
-        return retVal
+        It will then create a TNSNames object which includes a wrapper
+        wrapper class around the data structure self.populatedStruct.
+        '''
+        populatedStruct = self.parse()
+        TNSNamesObj = TNSNames(populatedStruct, self.descriptors)
 
-    def getChildren(self, bracketList):
-        children = []
-        for chld in self.openBrackets:
-            if chld[0] >= bracketList[0] and chld[2] <= bracketList[2]:
-                if chld[0] == bracketList[0] and chld[2] == bracketList[2]:
-                    if chld[1] > bracketList[1] and chld[3] <= bracketList[3]:
-                        children.append(chld)
-                else:
-                    # yes its a child
-                    children.append(chld)
-        return children
-
-    def createStruct(self):
-        oneElem = self.rootElems[0]
-        for rootElem in self.rootElems:
-            # print 'rootElem', rootElem
-            self.restruct(rootElem, self.struct)
-        # self.pp.pprint(self.struct)
-        # for rootElem in self.rootElems:
-        #    rootElemStr = ','.join(map(str, rootElem))
-
-    def restruct(self, elem, struct):
-        # print 'elem', elem
-        elemKey = ','.join(map(str, elem))
-        if not elem in self.accounted:
-            self.accounted.append(elem)
-            struct[elemKey] = {}
-            struct = struct[elemKey]
-            elemChildren = self.getChildren(elem)
-            for chld in elemChildren:
-                self.restruct(chld, struct)
-
-    def getNestedStruct(self):
-        return self.struct
+        return TNSNamesObj
@@ -0,0 +1,333 @@
+'''
+Created on Oct 18, 2026
+
+Compares a table in one database with a table in another, for example a
+replicated BCGW table with its source, without pulling the tables across
+the network.
+
+The tables are split into ranges of a unique key column and for each range
+the row count and the sum of the row hashes are calculated by the
+databases.  A row hash is the sum of ORA_HASH of each column, so values are
+hashed in their internal form without any NLS dependent conversion to text,
+and wide rows are not limited by the max length of a string.  The source and
+destination aggregates are calculated in parallel, each on its own
+connection, and only the ranges whose aggregates differ are split up
+further.  Once a differing range is small enough the key and row hash of
+each row in the range are retrieved and compared to identify the individual
+rows that differ.
+
+example:
+    srcDb = DbLib.DbMethods()
+    srcDb.connectNoDSN(user, pswd, srcServiceName, srcHost)
+    destDb = DbLib.DbMethods()
+    destDb.connectNoDSN(user, pswd, destServiceName, destHost)
+    differ = TableDiff.TableDiff(srcDb, destDb, 'WHSE.ROADS', 'OBJECTID')
+    result = differ.diff()
+    if not result.isIdentical():
+        print(result.missing, result.extra, result.changed)
+'''
+import concurrent.futures
+import logging
+import re
+
+
+class TableDiffConst(object):
+    '''
+    defaults used by the TableDiff class
+    '''
+    # number of ranges each differing range is split into
+    chunks = 16
+    # ranges with at most this many rows are compared row by row
+    leafRows = 1000
+    # column types that ORA_HASH does not support, these columns are left
+    # out of the row hash
+    unhashableTypes = ['BLOB', 'CLOB', 'NCLOB', 'BFILE', 'LONG', 'LONG RAW',
+                       'SDO_GEOMETRY', 'XMLTYPE']
+    # the max bucket passed to ORA_HASH, and the value used for nulls which
+    # is outside the range of hash values
+    maxBucket = 4294967295
+    nullHash = 4294967296
+
+
+class TableDiffResult(object):
+    '''
+    the differences found between the tables
+
+    :ivar missing: keys of the rows that are in the source but not the
+                   destination
+    :ivar extra: keys of the rows that are in the destination but not the
+                 source
+    :ivar changed: keys of the rows that are in both tables but differ
+    :ivar rangesCompared: the number of key ranges whose aggregates were
+                          compared
+    :ivar queries: the number of queries issued against each database
+    '''
+
+    def __init__(self):
+        self.missing = []
+        self.extra = []
+        self.changed = []
+        self.rangesCompared = 0
+        self.queries = 0
+
+    def isIdentical(self):
+        '''
+        :return: boolean indicating that no differences were found
+        '''
+        return not (self.missing or self.extra or self.changed)
+
+
+class TableDiff(object):
+    '''
+    compares a table in the source database with a table in the
+    destination database, see the module description.
+
+    :ivar srcDb: DbLib.DbMethods object connected to the source database
+    :ivar destDb: DbLib.DbMethods object connected to the destination
+                  database, must be a different object to srcDb as the two
+                  are queried at the same time
+    :ivar srcTable: the source table, optionally prefixed with the owner
+    :ivar keyColumn: column that uniquely identifies the rows in both tables
+    :ivar destTable: the destination table, defaults to srcTable
+    :ivar columns: the columns to compare, defaults to all the columns in
+                   the source table that can be hashed
+    :ivar chunks: the number of ranges each differing range is split into
+    :ivar leafRows: ranges with at most this many rows are compared row by
+                    row
+    '''
+    identifierRegex = re.compile(r'^[A-Za-z][\w$#]*(\.[A-Za-z][\w$#]*)?$')
+
+    def __init__(self, srcDb, destDb, srcTable, keyColumn, destTable=None,  # pylint: disable=too-many-arguments
+                 columns=None, chunks=TableDiffConst.chunks,
+                 leafRows=TableDiffConst.leafRows):
+        self.logger = logging.getLogger(__name__)
+        self.srcDb = srcDb
+        self.destDb = destDb
+        self.srcTable = srcTable
+        self.destTable = destTable if destTable else srcTable
+        self.keyColumn = keyColumn
+        self.columns = columns
+        self.chunks = chunks
+        self.leafRows = leafRows
+        for identifier in [self.srcTable, self.destTable, self.keyColumn] + \
+                list(columns or []):
+            if not self.identifierRegex.match(identifier):
+                msg = '{0} is not a valid table or column name'
+                raise ValueError(msg.format(identifier))
+        self.result = None
+        self.executor = None
+
+    def getColumns(self):
+        '''
+        :return: the columns that are compared, if they were not provided
+                 to the constructor they are retrieved from ALL_TAB_COLUMNS
+                 for the source table
+        :rtype: list
+        '''
+        if self.columns is None:
+            if '.' in self.srcTable:
+                owner, tableName = self.srcTable.upper().split('.')
+                sql = 'SELECT column_name, data_type FROM all_tab_columns ' + \
+                      'WHERE owner = :owner AND table_name = :tableName ' + \
+                      'ORDER BY column_id'
+                values = {'owner': owner, 'tableName': tableName}
+            else:
+                sql = 'SELECT column_name, data_type FROM user_tab_columns ' + \
+                      'WHERE table_name = :tableName ORDER BY column_id'
+                values = {'tableName': self.srcTable.upper()}
+            rows = self.fetchAll(self.srcDb, sql, values)
+            self.columns = []
+            for columnName, dataType in rows:
+                if dataType in TableDiffConst.unhashableTypes:
+                    self.logger.warning("the column %s of the type %s is " +
+                                        "not included in the comparison",
+                                        columnName, dataType)
+                else:
+                    self.columns.append(columnName)
+        return self.columns
+
+    def getRowHash(self):
+        '''
+        :return: sql expression that calculates the hash of a row, the sum
+                 of the hashes of each column.  The column position is used
+                 as the hash seed so values swapped between columns change
+                 the row hash.
+        '''
+        columnHashes = []
+        for cnt, column in enumerate(self.getColumns()):
+            columnHashes.append('NVL(ORA_HASH({0}, {1}, {2}), {3})'.format(
+                column, TableDiffConst.maxBucket, cnt,
+                TableDiffConst.nullHash))
+        return '({0})'.format(' + '.join(columnHashes))
+
+    def getRangePredicate(self, lowKey, highKey, values):
+        '''
+        :param lowKey: the keys in the range are greater than this value,
+                       None for no lower limit
+        :param highKey: the keys in the range are less than or equal to
+                        this value, None for no upper limit
+        :param values: dictionary that the bind values are added to
+        :return: the where clause that restricts a query to the key range
+        '''
+        predicates = []
+        if lowKey is not None:
+            predicates.append('{0} > :lowKey'.format(self.keyColumn))
+            values['lowKey'] = lowKey
+        if highKey is not None:
+            predicates.append('{0} <= :highKey'.format(self.keyColumn))
+            values['highKey'] = highKey
+        if not predicates:
+            return ''
+        return ' WHERE ' + ' AND '.join(predicates)
+
+    def fetchAll(self, db, sql, values=None):
+        '''
+        runs a query and returns all its rows
+        '''
+        cur = db.executeOracleSql(sql, values)
+        rows = cur.fetchall()
+        cur.close()
+        return rows
+
+    def runOnBoth(self, srcSql, destSql, values):
+        '''
+        runs the queries against the source and destination databases in
+        parallel
+
+        :return: the rows returned by the source and destination queries
+        '''
+        self.result.queries += 1
+        srcFuture = self.executor.submit(self.fetchAll, self.srcDb, srcSql,
+                                         dict(values))
+        destFuture = self.executor.submit(self.fetchAll, self.destDb, destSql,
+                                          dict(values))
+        return srcFuture.result(), destFuture.result()
+
+    def getBoundaries(self, db, table, lowKey, highKey):
+        '''
+        splits a key range into up to self.chunks ranges containing roughly
+        the same number of rows.
+
+        :return: list of the highest key in each range, the last range
+                 ending at highKey
+        '''
+        values = {'chunks': self.chunks}
+        sql = 'SELECT MAX({0}) FROM (SELECT {0}, NTILE(:chunks) OVER ' + \
+              '(ORDER BY {0}) diffchunk FROM {1}{2}) GROUP BY diffchunk ORDER BY 1'
+        sql = sql.format(self.keyColumn, table,
+                         self.getRangePredicate(lowKey, highKey, values))
+        self.result.queries += 1
+        boundaries = [row[0] for row in self.fetchAll(db, sql, values)]
+        if boundaries:
+            boundaries[-1] = highKey
+        return boundaries
+
+    def getDigestSql(self, table, lowKey, boundaries, values):
+        '''
+        :return: query that calculates the row count and the sum of the row
+                 hashes for each of the ranges that the boundaries split the
+                 key range into
+        '''
+        cases = []
+        for cnt, boundary in enumerate(boundaries[:-1]):
+            cases.append('WHEN {0} <= :boundary{1} THEN {1}'.format(
+                self.keyColumn, cnt))
+            values['boundary{0}'.format(cnt)] = boundary
+        chunkExpr = str(len(boundaries) - 1)
+        if cases:
+            chunkExpr = 'CASE {0} ELSE {1} END'.format(' '.join(cases),
+                                                       chunkExpr)
+        sql = 'SELECT diffchunk, COUNT(*), SUM(rowhash) FROM (SELECT {0} diffchunk, ' + \
+              '{1} rowhash FROM {2}{3}) GROUP BY diffchunk'
+        return sql.format(
+            chunkExpr, self.getRowHash(), table,
+            self.getRangePredicate(lowKey, boundaries[-1], values))
+
+    def compareRange(self, lowKey, highKey, srcCount, destCount):
+        '''
+        compares the rows in the key range (lowKey, highKey], splitting it
+        into smaller ranges and comparing their digests, or comparing the
+        individual rows once the range is small enough.
+        '''
+        if max(srcCount, destCount) <= self.leafRows:
+            self.compareRows(lowKey, highKey)
+            return
+        # split the range using which ever side has the most rows in it
+        if srcCount >= destCount:
+            boundaries = self.getBoundaries(self.srcDb, self.srcTable, lowKey,
+                                            highKey)
+        else:
+            boundaries = self.getBoundaries(self.destDb, self.destTable,
+                                            lowKey, highKey)
+        if len(boundaries) <= 1:
+            self.compareRows(lowKey, highKey)
+            return
+        values = {}
+        srcSql = self.getDigestSql(self.srcTable, lowKey, boundaries, values)
+        destSql = self.getDigestSql(self.destTable, lowKey, boundaries, {})
+        srcRows, destRows = self.runOnBoth(srcSql, destSql, values)
+        srcDigests = dict([(row[0], row[1:]) for row in srcRows])
+        destDigests = dict([(row[0], row[1:]) for row in destRows])
+        chunkLowKey = lowKey
+        for cnt, boundary in enumerate(boundaries):
+            self.result.rangesCompared += 1
+            srcDigest = srcDigests.get(cnt, (0, None))
+            destDigest = destDigests.get(cnt, (0, None))
+            if srcDigest != destDigest:
+                self.logger.debug("the range %s to %s differs, source: %s " +
+                                  "destination: %s", chunkLowKey, boundary,
+                                  srcDigest, destDigest)
+                self.compareRange(chunkLowKey, boundary, srcDigest[0],
+                                  destDigest[0])
+            chunkLowKey = boundary
+
+    def compareRows(self, lowKey, highKey):
+        '''
+        retrieves the key and row hash of every row in the key range from
+        both tables and records the rows that differ
+        '''
+        values = {}
+        sql = 'SELECT {0}, {1} FROM {2}{3}'
+        predicate = self.getRangePredicate(lowKey, highKey, values)
+        srcSql = sql.format(self.keyColumn, self.getRowHash(), self.srcTable,
+                            predicate)
+        destSql = sql.format(self.keyColumn, self.getRowHash(),
+                             self.destTable, predicate)
+        srcRows, destRows = self.runOnBoth(srcSql, destSql, values)
+        srcHashes = dict(srcRows)
+        destHashes = dict(destRows)
+        for key in sorted(srcHashes):
+            if key not in destHashes:
+                self.result.missing.append(key)
+            elif srcHashes[key] != destHashes[key]:
+                self.result.changed.append(key)
+        for key in sorted(destHashes):
+            if key not in srcHashes:
+                self.result.extra.append(key)
+
+    def diff(self):
+        '''
+        compares the tables
+
+        :return: the differences that were found
+        :rtype: TableDiffResult
+        '''
+        self.result = TableDiffResult()
+        self.getColumns()
+        countSql = 'SELECT COUNT(*) FROM {0}'
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            self.executor = executor
+            try:
+                srcRows, destRows = self.runOnBoth(
+                    countSql.format(self.srcTable),
+                    countSql.format(self.destTable), {})
+                self.compareRange(None, None, srcRows[0][0], destRows[0][0])
+            finally:
+                self.executor = None
+        self.logger.info("compared %s to %s, %s ranges compared using %s " +
+                         "queries, %s missing, %s extra and %s changed rows",
+                         self.srcTable, self.destTable,
+                         self.result.rangesCompared, self.result.queries,
+                         len(self.result.missing), len(self.result.extra),
+                         len(self.result.changed))
+        return self.result
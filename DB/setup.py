@@ -18,5 +18,8 @@ setup(name='DB',
       install_requires=[
           'cx_Oracle',
       ],
+      extras_require={
+          'async': ['oracledb'],
+      },
       dependency_links = ['git+https://github.com/bcgov/dbc-pylib@v2.3.1#egg=Misc&subdirectory=Misc'],
       zip_safe=False)
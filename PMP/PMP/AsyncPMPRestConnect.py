@@ -0,0 +1,391 @@
+'''
+Created on Oct 18, 2026
+
+asyncio counterpart to PMPRestConnect.PMP.  Built on aiohttp so that
+credentials can be retrieved from pmp by an event loop without blocking
+it, and so that many lookups can be in flight at once over a small pool
+of keep-alive connections.
+
+aiohttp is an optional dependency of this package, install it with the
+async extra, (pip install PMP[async]).  It is only imported when the
+first request is made.
+
+example:
+    async def main():
+        pmp = AsyncPMPRestConnect.AsyncPMP(pmpConfDict)
+        try:
+            lookups = [pmp.getAccountPassword(schema, 'RESOURCE_NAME')
+                       for schema in schemas]
+            passwords = await asyncio.gather(*lookups)
+        finally:
+            await pmp.close()
+'''
+import asyncio
+import time
+from urllib.parse import urlparse
+
+from . import PMPRestConnect
+
+
+class AsyncPMP(PMPRestConnect.PMPRestBase):
+    '''
+    Coroutine based pmp api.  All the requests share a single
+    aiohttp.ClientSession, created when the first request is made, and at
+    most maxConcurrent requests are sent to pmp at the same time.  Requests
+    that fail with a 429 or 5xx status, or with an aiohttp.ClientError, are
+    retried with an exponential backoff, same as PMP.
+
+    The resource list and the account lists are cached for cacheTTL
+    seconds, concurrent lookups against the same resource share a single
+    request.  Same as PMP, a name that is not found in a cached list is
+    looked up again after the list is retrieved from pmp, in case it was
+    added since the list was cached.
+
+    :ivar maxConcurrent: the max number of requests sent at the same time
+    :ivar scheme: the url scheme used to communicate with pmp, http can be
+                  used when testing against a local server
+    :ivar session: the aiohttp.ClientSession used for all the requests
+    '''
+
+    def __init__(self, configDict,
+                 maxConcurrent=PMPRestConnect.PMPConst.maxWorkers,
+                 cacheTTL=PMPRestConnect.PMPConst.cacheTTL, scheme='https',
+                 session=None):
+        PMPRestConnect.PMPRestBase.__init__(self, configDict)
+        self.maxConcurrent = maxConcurrent
+        self.cacheTTL = cacheTTL
+        self.scheme = scheme
+        self.session = session
+        self.semaphore = None
+        # cache key -> (time loaded, task retrieving the value)
+        self.cache = {}
+
+    def getUrl(self, *pathElements):
+        '''
+        :return: the url to the pmp rest api end point made up of the path
+                 elements
+        '''
+        path = '/'.join([str(element) for element in pathElements])
+        return '{0}://{1}{2}{3}'.format(self.scheme, self.baseUrl,
+                                        self.restDir, path)
+
+    def getSession(self):
+        '''
+        :return: the aiohttp session, created if it does not exist yet.  Must
+                 be called from a coroutine running in the event loop
+        '''
+        if self.session is None:
+            import aiohttp  # pylint: disable=import-outside-toplevel
+            # certificates are not verified, same as PMP
+            connector = aiohttp.TCPConnector(limit=self.const.poolMaxSize,
+                                             ssl=False)
+            self.session = aiohttp.ClientSession(connector=connector)
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.maxConcurrent)
+        return self.session
+
+    async def close(self):
+        '''
+        closes the session and the connections it holds
+        '''
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        self.semaphore = None
+        self.cache = {}
+
+    async def get(self, url):
+        '''
+        makes a get request to pmp, retrying it if pmp responds with one of
+        the PMPConst.retryStatusCodes or the request fails with an
+        aiohttp.ClientError, (connection reset, timeout etc)
+
+        :param url: the url to request, the token is added as a parameter
+        :return: the json structure that pmp responded with
+        '''
+        import aiohttp  # pylint: disable=import-outside-toplevel
+        session = self.getSession()
+        self.logger.debug("url: %s", url)
+        async with self.semaphore:
+            for attempt in range(self.const.retries + 1):
+                lastAttempt = attempt == self.const.retries
+                try:
+                    async with session.get(url,
+                                           params=self.getTokenDict()) as r:
+                        if r.status not in self.const.retryStatusCodes or \
+                                lastAttempt:
+                            if r.status >= 400:
+                                msg = 'unsuccessful connection status ' + \
+                                      'code: {0} for the url {1}'
+                                msg = msg.format(r.status, url)
+                                self.logger.error(msg)
+                                raise PMPRestConnect.PMPCommunicationProblem(
+                                    msg)
+                            return await r.json(content_type=None)
+                        reason = 'status {0}'.format(r.status)
+                except aiohttp.ClientError as e:
+                    if lastAttempt:
+                        self.logger.error("request to %s failed: %s", url, e)
+                        raise
+                    reason = repr(e)
+                delay = self.const.retryBackoffFactor * (2 ** attempt)
+                self.logger.debug("%s, retrying in %s seconds", reason, delay)
+                await asyncio.sleep(delay)
+
+    async def getCached(self, key, loader, refreshBefore=None):
+        '''
+        :param key: the key the value is cached under
+        :param loader: coroutine function that retrieves the value
+        :param refreshBefore: when provided the value is only retrieved
+                              again if it was cached before this time,
+                              used to refresh the value once after a
+                              lookup in it misses.  Concurrent lookups
+                              that miss share the refresh.
+        :return: the cached value, retrieved with the loader if it is not
+                 cached or the cached value is older than cacheTTL
+        '''
+        cached = self.cache.get(key)
+        if refreshBefore is not None and cached is not None:
+            reload = cached[0] < refreshBefore
+        else:
+            reload = cached is None or not self.cacheTTL or \
+                time.time() - cached[0] >= self.cacheTTL
+        if reload:
+            cached = (time.time(), asyncio.ensure_future(loader()))
+            self.cache[key] = cached
+        try:
+            # shielded so a caller being cancelled does not cancel the
+            # request for the other callers waiting on it
+            return await asyncio.shield(cached[1])
+        except Exception:
+            if self.cache.get(key) is cached:
+                del self.cache[key]
+            raise
+
+    def clearCache(self):
+        '''
+        discards the cached resource and account lists
+        '''
+        self.cache = {}
+
+    async def getResources(self):
+        '''
+        :return: the resources that are available to the token
+        '''
+        return self.parseResources(await self.get(self.getUrl('resources')))
+
+    async def getResourceIdMap(self, refreshBefore=None):
+        '''
+        :param refreshBefore: see getCached
+        :return: dictionary of upper case resource name -> resource id
+        '''
+        async def loadResourceIdMap():
+            resourceIdMap = {}
+            for resource in await self.getResources():
+                resourceIdMap.setdefault(
+                    resource[self.const.resourceKeys_resourceName].upper(),
+                    resource[self.const.resourceKeys_resourceID])
+            return resourceIdMap
+        return await self.getCached('resources', loadResourceIdMap,
+                                    refreshBefore)
+
+    async def getResourceId(self, resourceName):
+        '''
+        :param resourceName: the name of the resource
+        :return: the resource id for the resource name, raises
+                 ResourceNotFound if the token cannot see the resource
+        '''
+        startTime = time.time()
+        resourceIdMap = await self.getResourceIdMap()
+        resourceId = resourceIdMap.get(resourceName.upper())
+        if not resourceId:
+            # the resource may have been added since the list was cached
+            resourceIdMap = await self.getResourceIdMap(
+                refreshBefore=startTime)
+            resourceId = resourceIdMap.get(resourceName.upper())
+        if not resourceId:
+            msg = 'Unable to find the resource: {0}.  Resources that are ' + \
+                  'currently visible: {1}'
+            msg = msg.format(resourceName, ', '.join(sorted(resourceIdMap)))
+            self.logger.error(msg)
+            raise PMPRestConnect.ResourceNotFound(msg)
+        return resourceId
+
+    async def getAccountsForResourceID(self, resId):
+        '''
+        :param resId: the resource id
+        :return: the list of accounts in the resource
+        '''
+        return (await self.getAccountsCache(resId))[0]
+
+    async def getAccountsCache(self, resId, refreshBefore=None):
+        '''
+        :param resId: the resource id
+        :param refreshBefore: see getCached
+        :return: a tuple with the list of accounts in the resource and a
+                 dictionary of lower case account name -> account id
+        '''
+        async def loadAccounts():
+            struct = await self.get(self.getUrl('resources', resId,
+                                                'accounts'))
+            accnts = self.parseAccounts(struct)
+            accntIdMap = {}
+            for accnt in accnts:
+                accntName = accnt[self.const.resourceKeys_accountName]
+                accntIdMap.setdefault(accntName.lower().strip(),
+                                      accnt[self.const.resourceKeys_accountID])
+            return accnts, accntIdMap
+        return await self.getCached(('accounts', resId), loadAccounts,
+                                    refreshBefore)
+
+    async def getAccounts(self, resourceName):
+        '''
+        :param resourceName: the name of the resource
+        :return: the list of accounts in the resource, see PMP.getAccounts
+        '''
+        resId = await self.getResourceId(resourceName)
+        return await self.getAccountsForResourceID(resId)
+
+    async def getAccountDetails(self, accntId, resourceId):
+        '''
+        :return: the details structure for the account
+        '''
+        return await self.get(self.getUrl('resources', resourceId, 'accounts',
+                                          accntId))
+
+    async def getAccountPasswordWithAccountId(self, accntId, resourceId):
+        '''
+        :return: the password for the account, raises a ValueError if the
+                 token does not have access to the password
+        '''
+        struct = await self.get(self.getUrl('resources', resourceId,
+                                            'accounts', accntId, 'password'))
+        return self.parsePassword(struct, accntId, resourceId)
+
+    async def getAccountPassword(self, accntName, resourceName):
+        '''
+        :param accntName: the account name, case insensitive
+        :param resourceName: the name of the resource the account is in
+        :return: the password for the account, None if the account does not
+                 exist in the resource
+        '''
+        # lists retrieved after the lookup started, (possibly by a
+        # concurrent lookup), are not refreshed when the account is missing
+        startTime = time.time()
+        resId = await self.getResourceId(resourceName)
+        accntName = accntName.lower().strip()
+        accntId = (await self.getAccountsCache(resId))[1].get(accntName)
+        if not accntId:
+            # the account may have been added since the list was cached
+            accntId = (await self.getAccountsCache(
+                resId, refreshBefore=startTime))[1].get(accntName)
+        if accntId:
+            return await self.getAccountPasswordWithAccountId(accntId, resId)
+        msg = 'unable to find the account: {0} in the resource: {1}'
+        self.logger.debug(msg.format(accntName, resourceName))
+        return None
+
+    async def getRestAPIAccountId(self, resId, key, refreshBefore=None):
+        '''
+        async version of PMP.getRestAPIAccountId, the details of the
+        accounts with a matching username are retrieved concurrently and
+        the keys extracted from them are cached
+
+        :param resId: the id of the resource with the rest api accounts
+        :param key: the (lower case username, lower case url domain) tuple
+                    to look for
+        :param refreshBefore: see getCached, the accounts are refreshed
+                              along with their keys
+        :return: the id of the first matching account, None if there is no
+                 match
+        '''
+        import aiohttp  # pylint: disable=import-outside-toplevel
+        accnts = (await self.getAccountsCache(resId, refreshBefore))[0]
+        candidates = []
+        for accnt in accnts:
+            accntName, _ = self.splitAccountUrl(
+                accnt[self.const.resourceKeys_accountName])
+            if accntName.lower() == key[0]:
+                candidates.append(accnt)
+
+        async def getKeys(accnt):
+            accntId = accnt[self.const.resourceKeys_accountID]
+
+            async def loadKeys():
+                details = await self.getAccountDetails(accntId, resId)
+                return self.getRestAPIKeys(accnt, details)
+            return await self.getCached(('restapikeys', resId, accntId),
+                                        loadKeys, refreshBefore)
+        keysList = await asyncio.gather(
+            *[getKeys(accnt) for accnt in candidates], return_exceptions=True)
+        errors = {}
+        for accnt, accntKeys in zip(candidates, keysList):
+            accntId = accnt[self.const.resourceKeys_accountID]
+            if isinstance(accntKeys, (ValueError, KeyError, TypeError,
+                                      PMPRestConnect.PMPCommunicationProblem,
+                                      aiohttp.ClientError)):
+                self.logger.warning("unable to retrieve the details for " +
+                                    "the account id %s: %s", accntId,
+                                    accntKeys)
+                errors[accntId] = accntKeys
+            elif isinstance(accntKeys, BaseException):
+                raise accntKeys
+            elif key in accntKeys:
+                return accntId
+        if errors:
+            msg = 'unable to retrieve the details for the account ids {0} ' + \
+                  'in the resource id {1}: {2}'
+            msg = msg.format(', '.join([str(accntId) for accntId in errors]),
+                             resId, list(errors.values()))
+            self.logger.error(msg)
+            raise PMPRestConnect.PMPCommunicationProblem(msg)
+        return None
+
+    async def getRestAPIPassword(self, accountName, apiUrl, resourceName):
+        '''
+        async version of PMP.getRestAPIPassword
+
+        :param accountName: the account name, username or username@url
+        :param apiUrl: the url of the rest api
+        :param resourceName: the name of the resource
+        :return: the password for the account
+        '''
+        justUser, _ = self.splitAccountUrl(accountName)
+        key = (justUser.lower(), urlparse(apiUrl).netloc.lower().strip())
+        startTime = time.time()
+        resId = await self.getResourceId(resourceName)
+        accntId = await self.getRestAPIAccountId(resId, key)
+        if not accntId:
+            # the account may have been added since the list was cached
+            accntId = await self.getRestAPIAccountId(resId, key,
+                                                     refreshBefore=startTime)
+        if not accntId:
+            accnts = await self.getAccountsForResourceID(resId)
+            msg = 'unable to find an account that matches the account ' + \
+                  'name: {0} and the resource name {1}, accounts that ' + \
+                  'are visible: {2}'
+            msg = msg.format(accountName, resourceName, ', '.join(
+                [accnt[self.const.resourceKeys_accountName]
+                 for accnt in accnts]))
+            self.logger.error(msg)
+            raise PMPRestConnect.AccountNotFound(msg)
+        return await self.getAccountPasswordWithAccountId(accntId, resId)
+
+    async def getExtDBPassword(self, accountName, serviceName, resourceName):  # pylint: disable=unused-argument
+        '''
+        async version of PMP.getExtDBPassword
+
+        :param accountName: the account name, username@service_name
+        :param serviceName: not used, kept for compatibility with PMP
+        :param resourceName: the name of the external database resource
+        :return: the password for the account, None if there is no matching
+                 account
+        '''
+        resId = await self.getResourceId(resourceName)
+        accntList = await self.getAccountsForResourceID(resId)
+        accntid = self.getExtDBAccountId(accntList, accountName)
+        password = None
+        if accntid:
+            password = await self.getAccountPasswordWithAccountId(accntid,
+                                                                  resId)
+        return password
@@ -6,10 +6,16 @@ Created on Sep 2, 2014
 playing around for now trying to figure out if I can connect
 to the PMP rest interface from python
 '''
+import concurrent.futures
 import logging
 import os.path
+import queue
+import threading
+import time
 from urllib.parse import urlparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 class PMPConst(object):
@@ -47,13 +53,28 @@ class PMPConst(object):
     usernameDelimiter = '@'
     dbParamsDelimiter = ':'
 
+    # number of seconds that the resource and account lists retrieved from
+    # pmp are cached for
+    cacheTTL = 300
 
-class PMP(object):
+    # http connection pooling / retry parameters for the session shared by
+    # all the requests made to pmp
+    poolConnections = 4
+    poolMaxSize = 10
+    retries = 3
+    retryBackoffFactor = 0.5
+    retryStatusCodes = (429, 500, 502, 503, 504)
+
+    # number of passwords retrieved at the same time by getAccountPasswords,
+    # should not exceed poolMaxSize
+    maxWorkers = 8
+
+
+class PMPRestBase(object):
     '''
-    This class provides a simple python api that will
-    interface with the pmp rest api.  It interacts with
-    the rest api allowing for the retrieval of accounts
-    and then passwords assocated with those accounts.
+    The configuration and the parsing of the pmp rest api responses that
+    are shared by the PMP class and the AsyncPMPRestConnect.AsyncPMP
+    class.  None of the methods in this class communicate with pmp.
     '''
 
     def __init__(self, configDict):
@@ -75,32 +96,18 @@ class PMP(object):
         tokenDict = {self.const.tokenKey: self.token}
         return tokenDict
 
-    def getResources(self):
+    def parseResources(self, resources):
         '''
-        :return: the resources that are available to the token that you used to
-                 get access to pmp.
+        :param resources: the json structure returned by the resources
+                          request
+        :return: the list of resources in the structure
         '''
-        url = 'https://' + self.baseUrl + self.restDir + 'resources'
-        self.logger.debug("PMP resource url:" + url)
-        tokenDict = self.getTokenDict()
-
-        r = requests.get(url, params=tokenDict, verify=False)
-        if r.status_code >= 400 and r.status_code < 600:
-            # stop
-            msg = "unsuccessful connection status code: %s", r.status_code
-            self.logger.error(msg)
-            raise PMPCommunicationProblem(msg)
-
-        resources = r.json()
         resourcObjects = None
         resOpKey = self.const.resourcekeys_operation
         resDets = self.const.resourcekeys_Details
 
         if (resOpKey in resources) and resDets in resources[resOpKey]:
-
             resourcObjects = resources[resOpKey][resDets]
-            # self.logger.debug("returned resource objects: " + \
-            # str(resourcObjects))
         else:
             msg = 'unable to read resources from PMP. Probably a token ' + \
                   'problems!  PMP message {0}'
@@ -109,6 +116,384 @@ class PMP(object):
             raise PMPCommunicationProblem(msg)
         return resourcObjects
 
+    def parseAccounts(self, accnts):
+        '''
+        :param accnts: the json structure returned by the accounts request
+                       for a resource
+        :return: the list of accounts in the structure
+        '''
+        opKey = self.const.resourcekeys_operation
+        dets = self.const.resourcekeys_Details
+        accntList = self.const.resourceKeys_accountList
+        justAccnts = accnts[opKey][dets][accntList]
+        self.logger.debug("justAccnts: %s", justAccnts)
+        return justAccnts
+
+    def parsePassword(self, passwdStruct, accntId, resourceId):
+        '''
+        :param passwdStruct: the json structure returned by the password
+                             request for an account
+        :param accntId: the account id the password was requested for
+        :param resourceId: the resource id the password was requested for
+        :return: the password in the structure, raises a ValueError if the
+                 token does not have access to the password
+        '''
+        opKey = self.const.resourcekeys_operation
+        detKey = self.const.resourcekeys_Details
+        pssedKey = self.const.resourceKeys_password
+        psswd = passwdStruct[opKey][detKey][pssedKey]
+
+        if psswd.upper() == '[Request]'.upper():
+            msg = 'PMP response for the resource ID ({0}) and account ID ' + \
+                  '({1}) was {2}. which indicates the token used ({3}) ' + \
+                  'does not have permissions to access this password'
+            msg = msg.format(resourceId, accntId, psswd, self.token)
+            self.logger.error(msg)
+            raise ValueError(msg)
+        return psswd
+
+    def splitAccountUrl(self, accountName):
+        '''
+        rest api accounts can be named username or username@url
+
+        :param accountName: the account name to split
+        :return: a tuple with the username and the domain of the url, the
+                 domain is None if the account name does not include a url
+        '''
+        if '@' in accountName:
+            justUser, accntUrl = accountName.split('@')
+            # only comparing the domain right now
+            accntUrl = urlparse(accntUrl).netloc
+        else:
+            justUser = accountName
+            accntUrl = None
+        return justUser, accntUrl
+
+    def getExtDBAccountId(self, accntList, accountName):
+        '''
+        finds the external database account in the list of accounts,
+        see getExtDBPassword
+
+        :param accntList: the accounts in the external database resource
+        :param accountName: the account name, username@service_name
+        :return: the account id, None if there is no matching account
+        '''
+        accntid = None
+        for accntDict in accntList:
+            if accntDict['ACCOUNT NAME'] == accountName or \
+              accntDict['ACCOUNT NAME'].upper() == accountName.upper():
+                accntid = accntDict['ACCOUNT ID']
+                break
+            else:
+                # if no exact match then will check for
+                # a match after removing the domains.  example
+                # idwprod1.bcgov becomes just idwprod1
+                accntTemplateStr = '{0}@{1}'
+                if '@' in accntDict['ACCOUNT NAME']:
+                    iterAccntName = accntDict['ACCOUNT NAME']
+                    iterAccnt, server = accntDict['ACCOUNT NAME'].split('@')
+                    server = server.strip()
+                    stringList = server.split('.')
+                    server = stringList[0].strip()
+                    iterAccntName = accntTemplateStr.format(iterAccnt, server)
+
+                    # parse kevin@something.com to
+                    # kevin@something
+                    curAccnt, server = accountName.split('@')
+                    server = server.strip()
+                    stringList = server.split('.')
+                    server = stringList[0].strip()
+                    curAccnt = accntTemplateStr.format(curAccnt, server)
+                    if (curAccnt == iterAccntName or
+                      curAccnt.upper() == iterAccntName.upper()):  # @IgnorePep8
+                        accntid = accntDict['ACCOUNT ID']
+                        break
+        return accntid
+
+    def getRestAPIKeys(self, accnt, details):
+        '''
+        :param accnt: an account in the rest api resource
+        :param details: the details structure for the account
+        :return: the (lower case username, lower case url domain) keys that
+                 the rest api account matches, one for the domain of the url
+                 in its "Server" column and one for the domain of the url in
+                 its name when it is named username@url.  See
+                 getRestAPIPassword.
+        '''
+        accntName, accntUrl = self.splitAccountUrl(
+            accnt[self.const.resourceKeys_accountName])
+        server = self.getServerColumn(details)
+        return [(accntName.lower(), url.lower().strip())
+                for url in [urlparse(server or '').netloc, accntUrl] if url]
+
+    def getServerColumn(self, struct):
+        '''
+        Takes the structure returned by a getAccountDetails() method call
+        parses and returns the contents of the custom column 'Server'
+
+        example of a struct expected data structure.
+
+        {u'operation': {u'Details': {
+            u'PASSWORD STATUS': u'****',
+            u'LAST ACCESSED TIME': u'Nov 21, 2005 01:24 PM',
+            u'DESCRIPTION': u'',
+            u'EXPIRY STATUS': u'Valid',
+            u'COMPLIANT REASON': u'Password must have mixed case alphabets',
+            u'PASSWORD POLICY': u'APIs',
+            u'LAST MODIFIED TIME': u'N/A',
+            u'COMPLIANT STATUS': u'Non-Compliant',
+            u'CUSTOM FIELD': [{
+                u'CUSTOMFIELDTYPE': u'Character',
+                u'CUSTOMFIELDCOLUMNNAME': u'COLUMN_CHAR3',
+                u'CUSTOMFIELDVALUE': u'',
+                u'CUSTOMFIELDLABEL': u'API',
+                }, {
+                u'CUSTOMFIELDTYPE': u'Character',
+                u'CUSTOMFIELDCOLUMNNAME': u'COLUMN_CHAR4',
+                u'CUSTOMFIELDVALUE': u'https://google.com/googlerestapi',
+                u'CUSTOMFIELDLABEL': u'Server',
+                }, {
+                u'CUSTOMFIELDTYPE': u'Character',
+                u'CUSTOMFIELDCOLUMNNAME': u'COLUMN_CHAR1',
+                u'CUSTOMFIELDVALUE': u'',
+                u'CUSTOMFIELDLABEL': u'Login ID',
+                }, {
+                u'CUSTOMFIELDTYPE': u'Character',
+                u'CUSTOMFIELDCOLUMNNAME': u'COLUMN_CHAR2',
+                u'CUSTOMFIELDVALUE': u'',
+                u'CUSTOMFIELDLABEL': u'billsnotes',
+                }],
+            u'PASSWDID': u'1234',
+            }, u'name': u'GET RESOURCE ACCOUNT DETAILS',
+                u'result': {u'status': u'Success',
+                            u'message': u'Account details fetched successfully'}}}  # @IgnorePep8
+
+
+        '''
+        server = self.getCustomFieldLabel(struct,
+                                          self.const.customFieldLblServer)
+        return server
+
+    def getCustomFieldLabel(self, struct, labelName2Get):
+        '''
+        PMP has a set of standard fields.  This method will search the pmp
+        entry for a specific custom field, and if it exists then returns
+        the value associated with it.  If it doesn't then just returns
+        null
+        :param struct: The python data structure that should be searched to
+                       find the custom parameter in.
+        :param labelName2Get: the label or name of the custom property that
+                              is to be extracted.
+        '''
+        retVal = None
+        if self.const.resourcekeys_operation in struct:
+            operation = struct[self.const.resourcekeys_operation]
+            if self.const.resourcekeys_Details in operation:
+                details = operation[self.const.resourcekeys_Details]
+                if self.const.resourceKeys_customFields in details:
+                    customFields = \
+                        details[self.const.resourceKeys_customFields]
+                    for fld in customFields:
+                        fldLabel = \
+                            fld[self.const.resourceKeys_customFieldLabel]
+                        if fldLabel.lower() == labelName2Get.lower():
+                            retVal = \
+                                fld[self.const.resourceKeys_customFieldValue]
+                            break
+        if not retVal:
+            msg = 'Unable to find the custom field label: %s'
+            self.logger.warning(msg, labelName2Get)
+        return retVal
+
+    def getDetailsColumn(self, struct):
+        '''
+        This will return the contents of the details column parsed out
+        of the structure returned by a getAccountDetails() returned
+        structure.
+        :param struct: the data structure returned by the getAccountDetails()
+                       method
+        :type struct: dictionary
+        :return: Returns the contents of the "description" column from the
+                 struct that is sent
+        :rtype: str
+        '''
+        details = None
+        opkey = self.const.resourcekeys_operation
+        reskey = self.const.resourcekeys_Details
+        resdesc = self.const.resourceKeys_description
+        if ((self.const.resourcekeys_operation in struct) and
+            reskey in struct[opkey]) and \
+                resdesc in struct[opkey][reskey]:
+            # leaving this here in case the logic above was translated
+            # incorrectly
+            # if ((struct.has_key(self.const.resourcekeys_operation)) and \
+            #      struct[opkey].has_key(reskey)) and \
+            #      struct[opkey][reskey].has_key(resdesc):
+
+            urlFromDetails = struct[opkey][reskey][resdesc]
+            self.logger.debug("url details: %s", urlFromDetails)
+
+            parsed_uri = urlparse(urlFromDetails)
+            details = parsed_uri.netloc
+            self.logger.debug("urlFromDetails: %s", details)
+        return details
+
+
+class PMP(PMPRestBase):
+    '''
+    This class provides a simple python api that will
+    interface with the pmp rest api.  It interacts with
+    the rest api allowing for the retrieval of accounts
+    and then passwords assocated with those accounts.
+
+    The resource list and the account lists for each resource are cached
+    for cacheTTL seconds, so repeated password lookups only need to make
+    the password request.  A cacheTTL of None disables the caching, and
+    clearCache() discards anything that has been cached.
+
+    The requests go through requests.Session objects so the connections to
+    the pmp server are kept alive and reused instead of negotiating a new
+    TLS connection for every call.  requests does not guarantee that a
+    session can be used by several threads at the same time, so each
+    request borrows an idle session from a pool and returns it once the
+    response is read.  A single thread only ever uses the first session,
+    more are created when requests are sent from several threads at once,
+    (one for each request in flight).  Requests that fail with a 429 or
+    5xx status are retried with an exponential backoff.
+    '''
+
+    def __init__(self, configDict, cacheTTL=PMPConst.cacheTTL, session=None):
+        PMPRestBase.__init__(self, configDict)
+        self.cacheTTL = cacheTTL
+        # (time loaded, resource name -> resource id, resource names)
+        self.resourceCache = None
+        # resource id -> (time loaded, accounts, account name -> account id)
+        self.accountsCache = {}
+        # resource id -> (accounts time loaded, account id -> the
+        # (username, url) keys from getRestAPIKeys)
+        self.restAPIKeysCache = {}
+        self.cacheLock = threading.Lock()
+        self.session = session if session is not None else self.createSession()
+        # all the sessions that have been created, and the ones that are not
+        # currently being used by a request
+        self.sessions = [self.session]
+        self.idleSessions = queue.LifoQueue()
+        self.idleSessions.put(self.session)
+
+    def createSession(self):
+        '''
+        :return: a requests session with an adapter that pools the
+                 connections to pmp and retries failed requests
+        '''
+        retry = Retry(total=self.const.retries,
+                      backoff_factor=self.const.retryBackoffFactor,
+                      status_forcelist=self.const.retryStatusCodes,
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=self.const.poolConnections,
+                              pool_maxsize=self.const.poolMaxSize,
+                              max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def close(self):
+        '''
+        closes the connections held by the sessions
+        '''
+        with self.cacheLock:
+            sessions = self.sessions
+            self.sessions = [self.session]
+        for session in sessions:
+            session.close()
+        self.idleSessions = queue.LifoQueue()
+        self.idleSessions.put(self.session)
+
+    def get(self, url):
+        '''
+        makes a get request to pmp using an idle session, a new session is
+        created if all of them are being used by other threads
+
+        :param url: the url to request, the token is added as a parameter
+        :return: the requests response object
+        '''
+        try:
+            session = self.idleSessions.get_nowait()
+        except queue.Empty:
+            session = self.createSession()
+            with self.cacheLock:
+                self.sessions.append(session)
+        try:
+            return session.get(url, params=self.getTokenDict(), verify=False)
+        finally:
+            self.idleSessions.put(session)
+
+    def isCacheCurrent(self, loadTime):
+        '''
+        :param loadTime: the time the cached data was retrieved
+        :return: boolean indicating if cached data retrieved at that time
+                 can still be used
+        '''
+        return bool(self.cacheTTL) and time.time() - loadTime < self.cacheTTL
+
+    def clearCache(self, resourceName=None):
+        '''
+        discards the cached resource and account lists
+
+        :param resourceName: if provided only the accounts cached for this
+                             resource are discarded
+        '''
+        with self.cacheLock:
+            if resourceName is None:
+                self.resourceCache = None
+                self.accountsCache = {}
+                self.restAPIKeysCache = {}
+            elif self.resourceCache:
+                resId = self.resourceCache[1].get(resourceName.upper())
+                self.accountsCache.pop(resId, None)
+                self.restAPIKeysCache.pop(resId, None)
+
+    def getResourceCache(self, refresh=False):
+        '''
+        :param refresh: when true the resources are retrieved from pmp even
+                        if they are cached
+        :return: the resource cache, a tuple with the time the resources
+                 were retrieved, a dictionary of upper case resource name ->
+                 resource id and the list of resource names
+        '''
+        with self.cacheLock:
+            resourceCache = self.resourceCache
+        if refresh or not resourceCache or \
+                not self.isCacheCurrent(resourceCache[0]):
+            resourceIdMap = {}
+            resourceNames = []
+            for resource in self.getResources():
+                resourceName = resource[self.const.resourceKeys_resourceName]
+                resourceNames.append(resourceName)
+                resourceIdMap.setdefault(
+                    resourceName.upper(),
+                    resource[self.const.resourceKeys_resourceID])
+            resourceCache = (time.time(), resourceIdMap, resourceNames)
+            with self.cacheLock:
+                self.resourceCache = resourceCache
+        return resourceCache
+
+    def getResources(self):
+        '''
+        :return: the resources that are available to the token that you used to
+                 get access to pmp.
+        '''
+        url = 'https://' + self.baseUrl + self.restDir + 'resources'
+        self.logger.debug("PMP resource url:" + url)
+
+        r = self.get(url)
+        if r.status_code >= 400 and r.status_code < 600:
+            # stop
+            msg = "unsuccessful connection status code: %s", r.status_code
+            self.logger.error(msg)
+            raise PMPCommunicationProblem(msg)
+        return self.parseResources(r.json())
+
     def getResourceId(self, resourceName):
         '''
         pmp organizes everything by numeric ids. This method takes a
@@ -119,18 +504,16 @@ class PMP(object):
         :return: the resource id corresponding to the
                  resourceName
         '''
-        resourceId = None
         self.logger.debug("getting the resource id for the resource name:" +
                           str(resourceName))
-        resources = self.getResources()
-        iterResourceNames = []
-        for resource in resources:
-            iterResourceName = resource[self.const.resourceKeys_resourceName]
-            iterResourceNames.append(iterResourceName)
-            if resource[self.const.resourceKeys_resourceName].upper() == \
-               resourceName.upper():
-                resourceId = resource[self.const.resourceKeys_resourceID]
-                break
+        startTime = time.time()
+        loadTime, resourceIdMap, iterResourceNames = self.getResourceCache()
+        resourceId = resourceIdMap.get(resourceName.upper())
+        if not resourceId and loadTime < startTime:
+            # the resource may have been added since the list was cached
+            loadTime, resourceIdMap, iterResourceNames = \
+                self.getResourceCache(refresh=True)
+            resourceId = resourceIdMap.get(resourceName.upper())
         self.logger.debug("resource id for (" + str(resourceName) + ') is (' +
                           str(resourceId) + ')')
         if not resourceId:
@@ -226,20 +609,45 @@ class PMP(object):
                 u'PASSWORD STATUS': u'****'},
                 ...
         ]
+
+        The accounts are cached, see the class description.
+        '''
+        return self.getAccountsCache(resId)[1]
+
+    def getAccountsCache(self, resId, refresh=False):
+        '''
+        :param resId: the resource id
+        :param refresh: when true the accounts are retrieved from pmp even if
+                        they are cached
+        :return: the cache entry for the resource, a tuple with the time the
+                 accounts were retrieved, the list of accounts and a
+                 dictionary of lower case account name -> account id
+        '''
+        with self.cacheLock:
+            accountsCache = self.accountsCache.get(resId)
+        if refresh or not accountsCache or \
+                not self.isCacheCurrent(accountsCache[0]):
+            accnts = self.requestAccountsForResourceID(resId)
+            accntIdMap = {}
+            for accnt in accnts:
+                accntName = accnt[self.const.resourceKeys_accountName]
+                accntIdMap.setdefault(accntName.lower().strip(),
+                                      accnt[self.const.resourceKeys_accountID])
+            accountsCache = (time.time(), accnts, accntIdMap)
+            with self.cacheLock:
+                self.accountsCache[resId] = accountsCache
+        return accountsCache
+
+    def requestAccountsForResourceID(self, resId):
+        '''
+        retrieves the accounts for the resource id from pmp, bypassing the
+        cache, see getAccountsForResourceID
         '''
         url = 'https://' + self.baseUrl + self.restDir + \
               'resources' + '/' + str(resId) + '/accounts'
-        tokenDict = self.getTokenDict()
         self.logger.debug("using the url: %s", url)
-        r = requests.get(url, params=tokenDict, verify=False)
-        accnts = r.json()
-
-        opKey = self.const.resourcekeys_operation
-        dets = self.const.resourcekeys_Details
-        accntList = self.const.resourceKeys_accountList
-        justAccnts = accnts[opKey][dets][accntList]
-        self.logger.debug("justAccnts: %s", justAccnts)
-        return justAccnts
+        r = self.get(url)
+        return self.parseAccounts(r.json())
 
     def getAccountId(self, accntName, resourceId):
         '''
@@ -247,16 +655,15 @@ class PMP(object):
         :param resourceId: The numeric resource id to look for the account in
         :return: the numeric id for the given account name
         '''
-        accntId = None
-
-        accnts = self.getAccountsForResourceID(resourceId)
+        startTime = time.time()
+        loadTime, _, accntIdMap = self.getAccountsCache(resourceId)
         self.logger.debug("accounts retrieved for resource id (%s): %s",
-                          resourceId, len(accnts))
-        for accnt in accnts:
-            if accnt[self.const.resourceKeys_accountName].lower().strip() == \
-               accntName.lower().strip():
-                accntId = accnt[self.const.resourceKeys_accountID]
-                break
+                          resourceId, len(accntIdMap))
+        accntId = accntIdMap.get(accntName.lower().strip())
+        if not accntId and loadTime < startTime:
+            # the account may have been added since the list was cached
+            accntIdMap = self.getAccountsCache(resourceId, refresh=True)[2]
+            accntId = accntIdMap.get(accntName.lower().strip())
         self.logger.debug("Account id for the account name (" +
                           "(" + str(accntName) + ") is (" + str(accntId) + ')')
         if not accntId:
@@ -298,6 +705,71 @@ class PMP(object):
             self.logger.debug(msg)
         return psswd
 
+    def getAccountPasswords(self, pairs, maxWorkers=PMPConst.maxWorkers):
+        '''
+        Retrieves the passwords for many accounts at once.  The pairs are
+        grouped by resource so the resource and account ids are only
+        looked up once per resource, then the passwords are requested in
+        parallel using up to maxWorkers threads.
+
+        :param pairs: list of (account name, resource name) tuples
+        :param maxWorkers: the max number of passwords requested at the
+                           same time
+        :return: a tuple with two dictionaries, both keyed by the
+                 (account name, resource name) tuples that were passed in.
+                 The first contains the passwords that were retrieved, the
+                 second the exception raised for any pair whose password
+                 could not be retrieved, including the errors communicating
+                 with pmp while looking up the resource and account ids.
+        '''
+        pairErrors = (ValueError, KeyError, PMPCommunicationProblem,
+                      requests.exceptions.RequestException)
+        passwords = {}
+        errors = {}
+        # resource name -> list of the pairs in that resource
+        resourcePairs = {}
+        for pair in pairs:
+            resourcePairs.setdefault(pair[1].upper(), []).append(pair)
+
+        # pair -> (account id, resource id)
+        pairIds = {}
+        for resourcePairList in resourcePairs.values():
+            try:
+                resId = self.getResourceId(resourcePairList[0][1])
+            except (ResourceNotFound,) + pairErrors as e:
+                for pair in resourcePairList:
+                    errors[pair] = e
+                continue
+            for pair in resourcePairList:
+                try:
+                    accntId = self.getAccountId(pair[0], resId)
+                except pairErrors as e:
+                    errors[pair] = e
+                    continue
+                if accntId:
+                    pairIds[pair] = (accntId, resId)
+                else:
+                    msg = 'unable to find the account: {0} in the ' + \
+                          'resource: {1}'
+                    errors[pair] = AccountNotFound(msg.format(*pair))
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=maxWorkers) as executor:
+            futures = {}
+            for pair, ids in pairIds.items():
+                future = executor.submit(self.getAccountPasswordWithAccountId,
+                                         *ids)
+                futures[future] = pair
+            for future in concurrent.futures.as_completed(futures):
+                pair = futures[future]
+                try:
+                    passwords[pair] = future.result()
+                except pairErrors as e:
+                    errors[pair] = e
+        self.logger.debug("retrieved %s passwords, %s errors", len(passwords),
+                          len(errors))
+        return passwords, errors
+
     def getPasswordFiles(self, accntName, resourceName):
         '''
         Some pmp accounts contain files, example ssh keys etc.  This method
@@ -325,9 +797,8 @@ class PMP(object):
         urlTemplate = 'https://{0}{1}/resources/{2}/accounts/{3}/downloadfile'
         url = urlTemplate.format(self.baseUrl, self.restDir, resId, accntId)
 
-        tokenDict = self.getTokenDict()
         self.logger.debug("url used to get password %s", url)
-        r = requests.get(url, params=tokenDict, verify=False)
+        r = self.get(url)
         retVal = r.text
         return retVal
 
@@ -337,14 +808,20 @@ class PMP(object):
         :param resourceId: The resource id for the resource that the account is
                             located inside of
         :return: a python data structure with the details of the account.
+                 Raises PMPCommunicationProblem if pmp responds with an
+                 error status code.
         '''
         url = 'https://' + self.baseUrl + self.restDir + \
               'resources/' + str(resourceId) + '/accounts/' + \
               str(accntId)
-        tokenDict = self.getTokenDict()
         self.logger.debug('url: %s', url)
-        r = requests.get(url, params=tokenDict, verify=False)
+        r = self.get(url)
         self.logger.debug("status_code: %s", r.status_code)
+        if r.status_code >= 400:
+            msg = 'unsuccessful connection status code: {0} for the url {1}'
+            msg = msg.format(r.status_code, url)
+            self.logger.error(msg)
+            raise PMPCommunicationProblem(msg)
         accntDtls = r.json()
         self.logger.debug("response: %s", accntDtls)
         return accntDtls
@@ -361,22 +838,16 @@ class PMP(object):
           a) accountName received if it includes @http://rest.api...
              the account name and the url are separated
           b) retrieves the accounts for the resourceName
-          c) iterates through each account, if the account name includes
-             a url it is separated from the username
-              - bare usernames are compared for a match, ie just the user
-                name supplied as an arg and just the user name in the iteration
-                of accounts for the resourceName
-              - if usernames match then retrieve the url from the
-                  "Account Notes"
-                if the url matches the received apiUrl then get the password
-                and return it for that account.
-              - if the the "account notes" url does not match and there was a
-                url appended to the end of the username example:
-                user@http://blah
-                then that url is compared with the supplied url.
-                if they match then get th password.
-
-              - if neither of the url's match then raises and error saying
+          c) iterates through the accounts with the same bare username, in
+             order, retrieving their details until one of them has either
+             a url in the "Server" column of the details, or a url appended
+             to the account name, example user@http://blah, with the same
+             domain as the apiUrl.  (see getRestAPIAccountId, the details
+             are only retrieved once while the account list is cached)
+
+              - if no account matches, and the account list was cached, the
+                list is retrieved again in case the account was added since.
+              - if there is still no match then raises and error saying
                 there is no account for the username url combination
 
         :param  accountName: The name account name who's password we want
@@ -397,75 +868,24 @@ class PMP(object):
         apiUrl = parsed_uri.netloc
         self.logger.debug("apiUrl: %s", apiUrl)
 
-        # checking to see if the syntax for the account is
-        # username@url or if it is just username
-        #   example 'apiuser'
-        #   or can come as 'apiuser@https://blah.com/blah/blah/blah'
-        if '@' in accountName:
-            justUser, apiUrlfromAccntName = accountName.split('@')
-            # only comparing the domain right now
-            parsed_uri = urlparse(apiUrlfromAccntName)
-            apiUrlfromAccntName = parsed_uri.netloc
-            self.logger.debug("apiUrlfromAccntName: %s", apiUrlfromAccntName)
-        else:
-            justUser = accountName
-            apiUrlfromAccntName = None
+        # the account can come as just the username, example 'apiuser'
+        # or as 'apiuser@https://blah.com/blah/blah/blah'
+        justUser, _ = self.splitAccountUrl(accountName)
+        key = (justUser.lower(), apiUrl.lower().strip())
 
-        # a get the resource id
         resId = self.getResourceId(resourceName)
-
-        # now get all the accounts for that resource using a heuristic
-        # to search for the userName.
-        # start by getting all the accounts for the userid
-        accnts = self.getAccountsForResourceID(resId)
-        accntsRetrieved = []
-        # will be where the extracted account name is stored assuming it is
-        # found
-        extractedAccntId = None
-        self.logger.debug("found (%s) accounts in the resource", len(accnts))
-        for accnt in accnts:
-            # splitting up the received account name and url in case
-            # the version stored in pmp is username@url
-            self.logger.debug("current Account name: %s, searching for: %s",
-                              accnt[self.const.resourceKeys_accountName],
-                              justUser)
-            accntsRetrieved.append(accnt[self.const.resourceKeys_accountName])
-            if '@' in accnt[self.const.resourceKeys_accountName]:
-                currAccntName, currAccntUrl = \
-                    accnt[self.const.resourceKeys_accountName].split('@')
-                parsed_uri = urlparse(currAccntUrl)
-                currAccntUrl = parsed_uri.netloc
-                self.logger.debug("currAccntUrl: %s", currAccntUrl)
-            else:
-                currAccntName = accnt[self.const.resourceKeys_accountName]
-                currAccntUrl = None
-            currAccntId = accnt[self.const.resourceKeys_accountID]
-            self.logger.debug("account id: %s", currAccntId)
-            # if the usernames match, next we want to check if the
-            # urls matches
-            if currAccntName.lower() == justUser.lower():
-                # get the details for the account and pull the url
-                # from the details field
-                details = self.getAccountDetails(currAccntId, resId)
-                server = self.getServerColumn(details)
-
-                parsed_uri = urlparse(server)
-                urlFromDetails = parsed_uri.netloc
-                self.logger.debug("Server from Details: %s", urlFromDetails)
-
-                # now if the urlFromDetails matches apiUrl provided as an arg
-                # then assume this is the account
-                if urlFromDetails.lower().strip() == apiUrl.lower().strip():
-                    extractedAccntId = currAccntId
-                    break
-
-                # otherwise check to see if the url in the account name in
-                # pmp matches the url sent as an arg
-                elif currAccntUrl:
-                    if apiUrl.lower().strip() == currAccntUrl.lower().strip():
-                        extractedAccntId = currAccntId
-                        break
+        startTime = time.time()
+        loadTime, accnts, _ = self.getAccountsCache(resId)
+        extractedAccntId = self.getRestAPIAccountId(resId, loadTime, accnts,
+                                                    key)
+        if not extractedAccntId and loadTime < startTime:
+            # the account may have been added since the list was cached
+            loadTime, accnts, _ = self.getAccountsCache(resId, refresh=True)
+            extractedAccntId = self.getRestAPIAccountId(resId, loadTime,
+                                                        accnts, key)
         if not extractedAccntId:
+            accntsRetrieved = [accnt[self.const.resourceKeys_accountName]
+                               for accnt in accnts]
             self.logger.debug("account name: %s", accountName)
             msg = 'unable to find an account that matches the account name:' + \
                   ' {0} and the resource name {1}, accounts that are ' + \
@@ -477,117 +897,64 @@ class PMP(object):
 
         return self.getAccountPasswordWithAccountId(extractedAccntId, resId)
 
-    def getServerColumn(self, struct):
-        '''
-        Takes the structure returned by a getAccountDetails() method call
-        parses and returns the contents of the custom column 'Server'
-
-        example of a struct expected data structure.
-
-        {u'operation': {u'Details': {
-            u'PASSWORD STATUS': u'****',
-            u'LAST ACCESSED TIME': u'Nov 21, 2005 01:24 PM',
-            u'DESCRIPTION': u'',
-            u'EXPIRY STATUS': u'Valid',
-            u'COMPLIANT REASON': u'Password must have mixed case alphabets',
-            u'PASSWORD POLICY': u'APIs',
-            u'LAST MODIFIED TIME': u'N/A',
-            u'COMPLIANT STATUS': u'Non-Compliant',
-            u'CUSTOM FIELD': [{
-                u'CUSTOMFIELDTYPE': u'Character',
-                u'CUSTOMFIELDCOLUMNNAME': u'COLUMN_CHAR3',
-                u'CUSTOMFIELDVALUE': u'',
-                u'CUSTOMFIELDLABEL': u'API',
-                }, {
-                u'CUSTOMFIELDTYPE': u'Character',
-                u'CUSTOMFIELDCOLUMNNAME': u'COLUMN_CHAR4',
-                u'CUSTOMFIELDVALUE': u'https://google.com/googlerestapi',
-                u'CUSTOMFIELDLABEL': u'Server',
-                }, {
-                u'CUSTOMFIELDTYPE': u'Character',
-                u'CUSTOMFIELDCOLUMNNAME': u'COLUMN_CHAR1',
-                u'CUSTOMFIELDVALUE': u'',
-                u'CUSTOMFIELDLABEL': u'Login ID',
-                }, {
-                u'CUSTOMFIELDTYPE': u'Character',
-                u'CUSTOMFIELDCOLUMNNAME': u'COLUMN_CHAR2',
-                u'CUSTOMFIELDVALUE': u'',
-                u'CUSTOMFIELDLABEL': u'billsnotes',
-                }],
-            u'PASSWDID': u'1234',
-            }, u'name': u'GET RESOURCE ACCOUNT DETAILS',
-                u'result': {u'status': u'Success',
-                            u'message': u'Account details fetched successfully'}}}  # @IgnorePep8
-
-
-        '''
-        server = self.getCustomFieldLabel(struct,
-                                          self.const.customFieldLblServer)
-        return server
-
-    def getCustomFieldLabel(self, struct, labelName2Get):
-        '''
-        PMP has a set of standard fields.  This method will search the pmp
-        entry for a specific custom field, and if it exists then returns
-        the value associated with it.  If it doesn't then just returns
-        null
-        :param struct: The python data structure that should be searched to
-                       find the custom parameter in.
-        :param labelName2Get: the label or name of the custom property that
-                              is to be extracted.
-        '''
-        retVal = None
-        if self.const.resourcekeys_operation in struct:
-            operation = struct[self.const.resourcekeys_operation]
-            if self.const.resourcekeys_Details in operation:
-                details = operation[self.const.resourcekeys_Details]
-                if self.const.resourceKeys_customFields in details:
-                    customFields = \
-                        details[self.const.resourceKeys_customFields]
-                    for fld in customFields:
-                        fldLabel = \
-                            fld[self.const.resourceKeys_customFieldLabel]
-                        if fldLabel.lower() == labelName2Get.lower():
-                            retVal = \
-                                fld[self.const.resourceKeys_customFieldValue]
-                            break
-        if not retVal:
-            msg = 'Unable to find the custom field label: %s'
-            self.logger.warning(msg, labelName2Get)
-        return retVal
-
-    def getDetailsColumn(self, struct):
+    def getRestAPIAccountId(self, resId, loadTime, accnts, key):
         '''
-        This will return the contents of the details column parsed out
-        of the structure returned by a getAccountDetails() returned
-        structure.
-        :param struct: the data structure returned by the getAccountDetails()
-                       method
-        :type struct: dictionary
-        :return: Returns the contents of the "description" column from the
-                 struct that is sent
-        :rtype: str
+        finds the first account with the same username as the key whose
+        details match the url in the key.  The details are only retrieved
+        for accounts with a matching username, and the keys extracted from
+        them are cached for as long as the account list is, so later
+        lookups for the same account do not request them again.  An
+        account whose details cannot be retrieved is skipped, it is
+        requested again by the next lookup.
+
+        :param resId: the id of the resource with the rest api accounts
+        :param loadTime: the time the accounts were retrieved
+        :param accnts: the accounts in the rest api resource
+        :param key: the (lower case username, lower case url domain) tuple
+                    to look for
+        :return: the id of the matching account, None if there is no match.
+                 Raises PMPCommunicationProblem if there is no match and
+                 the details of one of the candidate accounts could not be
+                 retrieved.
         '''
-        details = None
-        opkey = self.const.resourcekeys_operation
-        reskey = self.const.resourcekeys_Details
-        resdesc = self.const.resourceKeys_description
-        if ((self.const.resourcekeys_operation in struct) and
-            reskey in struct[opkey]) and \
-                resdesc in struct[opkey][reskey]:
-            # leaving this here in case the logic above was translated
-            # incorrectly
-            # if ((struct.has_key(self.const.resourcekeys_operation)) and \
-            #      struct[opkey].has_key(reskey)) and \
-            #      struct[opkey][reskey].has_key(resdesc):
-
-            urlFromDetails = struct[opkey][reskey][resdesc]
-            self.logger.debug("url details: %s", urlFromDetails)
-
-            parsed_uri = urlparse(urlFromDetails)
-            details = parsed_uri.netloc
-            self.logger.debug("urlFromDetails: %s", details)
-        return details
+        with self.cacheLock:
+            keysCache = self.restAPIKeysCache.get(resId)
+            if not keysCache or keysCache[0] != loadTime:
+                keysCache = (loadTime, {})
+                if self.cacheTTL:
+                    self.restAPIKeysCache[resId] = keysCache
+        keysById = keysCache[1]
+        errors = {}
+        for accnt in accnts:
+            accntName, _ = self.splitAccountUrl(
+                accnt[self.const.resourceKeys_accountName])
+            if accntName.lower() != key[0]:
+                continue
+            accntId = accnt[self.const.resourceKeys_accountID]
+            accntKeys = keysById.get(accntId)
+            if accntKeys is None:
+                try:
+                    details = self.getAccountDetails(accntId, resId)
+                    accntKeys = self.getRestAPIKeys(accnt, details)
+                except (ValueError, KeyError, TypeError,
+                        PMPCommunicationProblem,
+                        requests.exceptions.RequestException) as e:
+                    self.logger.warning("unable to retrieve the details " +
+                                        "for the account id %s: %s",
+                                        accntId, e)
+                    errors[accntId] = e
+                    continue
+                keysById[accntId] = accntKeys
+            if key in accntKeys:
+                return accntId
+        if errors:
+            msg = 'unable to retrieve the details for the account ids {0} ' + \
+                  'in the resource id {1}: {2}'
+            msg = msg.format(', '.join([str(accntId) for accntId in errors]),
+                             resId, list(errors.values()))
+            self.logger.error(msg)
+            raise PMPCommunicationProblem(msg)
+        return None
 
     def getAccountPasswordWithAccountId(self, accntId, resourceId):
         '''
@@ -601,23 +968,9 @@ class PMP(object):
         url = 'https://' + self.baseUrl + self.restDir + \
               'resources/' + str(resourceId) + '/accounts/' + \
               str(accntId) + '/password'
-        tokenDict = self.getTokenDict()
         self.logger.debug("url used to get password %s", url)
-        r = requests.get(url, params=tokenDict, verify=False)
-        passwdStruct = r.json()
-        opKey = self.const.resourcekeys_operation
-        detKey = self.const.resourcekeys_Details
-        pssedKey = self.const.resourceKeys_password
-        psswd = passwdStruct[opKey][detKey][pssedKey]
-
-        if psswd.upper() == '[Request]'.upper():
-            msg = 'PMP response for the resource ID ({0}) and account ID ' + \
-                  '({1}) was {2}. which indicates the token used ({3}) ' + \
-                  'does not have permissions to access this password'
-            msg = msg.format(resourceId, accntId, psswd, self.token)
-            self.logger.error(msg)
-            raise ValueError(msg)
-        return psswd
+        r = self.get(url)
+        return self.parsePassword(r.json(), accntId, resourceId)
 
     def getExtDBPassword(self, accountName, serviceName, resourceName):
         '''
@@ -637,36 +990,7 @@ class PMP(object):
         # get accounts for the resourceName
         resId = self.getResourceId(resourceName)
         accntList = self.getAccountsForResourceID(resId)
-        accntid = None
-        for accntDict in accntList:
-            if accntDict['ACCOUNT NAME'] == accountName or \
-              accntDict['ACCOUNT NAME'].upper() == accountName.upper():
-                accntid = accntDict['ACCOUNT ID']
-                break
-            else:
-                # if no exact match then will check for
-                # a match after removing the domains.  example
-                # idwprod1.bcgov becomes just idwprod1
-                accntTemplateStr = '{0}@{1}'
-                if '@' in accntDict['ACCOUNT NAME']:
-                    iterAccntName = accntDict['ACCOUNT NAME']
-                    iterAccnt, server = accntDict['ACCOUNT NAME'].split('@')
-                    server = server.strip()
-                    stringList = server.split('.')
-                    server = stringList[0].strip()
-                    iterAccntName = accntTemplateStr.format(iterAccnt, server)
-
-                    # parse kevin@something.com to
-                    # kevin@something
-                    curAccnt, server = accountName.split('@')
-                    server = server.strip()
-                    stringList = server.split('.')
-                    server = stringList[0].strip()
-                    curAccnt = accntTemplateStr.format(curAccnt, server)
-                    if (curAccnt == iterAccntName or
-                      curAccnt.upper() == iterAccntName.upper()):  # @IgnorePep8
-                        accntid = accntDict['ACCOUNT ID']
-                        break
+        accntid = self.getExtDBAccountId(accntList, accountName)
         if accntid:
             # now get the password for the account id
             password = self.getAccountPasswordWithAccountId(accntid, resId)
@@ -17,4 +17,7 @@ setup(name='PMP',
       install_requires=[
           'requests>=2.18.4',
       ],
+      extras_require={
+          'async': ['aiohttp>=3.6'],
+      },
       zip_safe=False)
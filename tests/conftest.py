@@ -20,5 +20,10 @@ from fixtures.FMEServerApiData_fixtures import *
 from fixtures.pyKirkData_fixtures import *
 from fixtures.FMEServer_fixture import *
 from fixtures.PMP_Info import *
+from fixtures.PMP_Mock import *
 from fixtures.layerfile_fixture import *
 from fixtures.arcproregistryreader_fixture import *
+from fixtures.AsyncDb_fixtures import *
+from fixtures.TNSNames_fixtures import *
+from fixtures.TableDiff_fixtures import *
+from fixtures.DbLib_fixtures import *
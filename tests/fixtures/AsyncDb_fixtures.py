@@ -0,0 +1,118 @@
+'''
+Created on Oct 18, 2026
+
+A stand-in for the oracledb async api backed by an in memory sqlite
+database, used to test DB.AsyncDbLib without an oracle database.  sqlite
+happens to support the same :name bind variable syntax as oracle.
+'''
+import sqlite3
+import types
+
+import pytest
+
+
+class StandInBatchError(object):
+
+    def __init__(self, offset, message):
+        self.offset = offset
+        self.message = message
+
+
+class StandInCursor(object):
+
+    def __init__(self, conn):
+        self.cur = conn.cursor()
+        self.arraysize = 100
+        self.description = None
+        self.batchErrors = []
+        self.closed = False
+
+    async def execute(self, sql, values=None):
+        self.cur.execute(sql, values or {})
+        self.description = self.cur.description
+
+    async def executemany(self, sql, rows, batcherrors=False):
+        self.batchErrors = []
+        for offset, row in enumerate(rows):
+            try:
+                self.cur.execute(sql, row)
+            except sqlite3.Error as e:
+                if not batcherrors:
+                    raise
+                self.batchErrors.append(StandInBatchError(offset, str(e)))
+
+    def getbatcherrors(self):
+        return self.batchErrors
+
+    async def fetchall(self):
+        return self.cur.fetchall()
+
+    async def fetchmany(self, numRows=None):
+        return self.cur.fetchmany(numRows or self.arraysize)
+
+    def close(self):
+        self.closed = True
+        self.cur.close()
+
+
+class StandInConnection(object):
+
+    def __init__(self, conn, cursors):
+        self.conn = conn
+        self.cursors = cursors
+
+    def cursor(self):
+        curObj = StandInCursor(self.conn)
+        self.cursors.append(curObj)
+        return curObj
+
+    async def commit(self):
+        self.conn.commit()
+
+
+class StandInPool(object):
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.busy = 0
+        self.maxBusy = 0
+        # every cursor opened on the pool's connections
+        self.cursors = []
+
+    async def acquire(self):
+        self.busy += 1
+        self.maxBusy = max(self.busy, self.maxBusy)
+        return StandInConnection(self.conn, self.cursors)
+
+    async def release(self, conn):
+        self.busy -= 1
+
+    async def close(self):
+        self.conn.close()
+
+
+@pytest.fixture()
+def AsyncDb_StandInDriver():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE all_objects (owner TEXT, object_type TEXT, ' +
+                 'object_name TEXT)')
+    conn.execute('CREATE TABLE test_data (id INTEGER PRIMARY KEY, val TEXT)')
+    conn.executemany('INSERT INTO all_objects VALUES (?, ?, ?)',
+                     [('WHSE', 'TABLE', 'ROADS'),
+                      ('WHSE', 'VIEW', 'ROADS_VW'),
+                      ('APP', 'TABLE', 'JOBS')])
+    conn.commit()
+    driver = types.SimpleNamespace()
+    driver.pools = []
+
+    def makedsn(host, port, service_name=None):
+        return '{0}:{1}/{2}'.format(host, port, service_name)
+
+    def create_pool_async(**kwargs):  # pylint: disable=unused-argument
+        pool = StandInPool(conn)
+        driver.pools.append(pool)
+        return pool
+
+    driver.makedsn = makedsn
+    driver.create_pool_async = create_pool_async
+    yield driver
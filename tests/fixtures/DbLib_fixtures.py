@@ -0,0 +1,441 @@
+'''
+Created on Oct 18, 2026
+
+A stand-in for a cx_Oracle connection backed by an in memory sqlite
+database, used to test DB.DbLib and DB.OraIterator without an oracle
+database.  sqlite supports the same :name bind variable syntax as oracle,
+the few oracle only constructs used by the package (ROWNUM, SDO_UTIL) are
+translated to their sqlite equivalents.
+
+Every statement executed is recorded along with the cursor arraysize and
+prefetchrows at the time it was executed, so tests can check how the
+cursors were configured.
+
+TIMESTAMP and DATE columns are returned as datetime / date objects, same
+as cx_Oracle.
+'''
+import datetime
+import re
+import sqlite3
+import threading
+import time
+import types
+
+import cx_Oracle
+import pytest
+
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+sqlite3.register_converter(
+    'TIMESTAMP', lambda value: datetime.datetime.fromisoformat(value.decode()))
+sqlite3.register_converter(
+    'DATE', lambda value: datetime.date.fromisoformat(value.decode()))
+
+
+class StandInVar(object):
+
+    def __init__(self, varType):
+        self.type = varType
+
+
+class StandInBatchError(object):
+
+    def __init__(self, offset, message):
+        self.offset = offset
+        self.message = message
+
+
+class StandInCursor(object):
+    '''
+    implements the parts of the cx_Oracle cursor api that the package uses
+    '''
+    bindRegex = re.compile(r'(?<![:\w]):([A-Za-z]\w*)')
+    rownumRegex = re.compile(r'WHERE ROWNUM <= (:\w+)')
+
+    def __init__(self, standInConn):
+        self.standInConn = standInConn
+        self.cur = standInConn.conn.cursor()
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.outputtypehandler = None
+        self.description = None
+        self.rowcount = -1
+        self.statement = None
+        self.inputSizes = None
+        self.batchErrors = []
+        self.rowCounts = []
+        self.closed = False
+        if getattr(standInConn, 'noPrefetchRows', False):
+            del self.prefetchrows
+            self.noPrefetchRows = True
+
+    def __setattr__(self, name, value):
+        if name == 'prefetchrows' and self.__dict__.get('noPrefetchRows'):
+            raise AttributeError(name)
+        object.__setattr__(self, name, value)
+
+    def translateSql(self, sql):
+        sql = self.rownumRegex.sub(r'LIMIT \1', sql)
+        return sql.replace('SDO_UTIL.TO_WKBGEOMETRY', 'TO_WKBGEOMETRY')
+
+    def getBinds(self, sql, values):
+        '''
+        cx_Oracle binds a sequence to named bind variables by position,
+        sqlite needs a dictionary for that
+        '''
+        if isinstance(values, (list, tuple)):
+            names = []
+            for name in self.bindRegex.findall(sql):
+                if name not in names:
+                    names.append(name)
+            if names:
+                return dict(zip(names, values))
+        return values or {}
+
+    def describe(self, sqliteDescription):
+        if sqliteDescription is None:
+            return None
+        description = []
+        for column in sqliteDescription:
+            name = column[0].upper()
+            colType, precision, scale = self.standInConn.columnTypes.get(
+                name, (cx_Oracle.DB_TYPE_VARCHAR, None, None))
+            if self.outputtypehandler:
+                var = self.outputtypehandler(self, name, colType, None,
+                                             precision, scale)
+                if var is not None:
+                    colType = var.type
+            description.append((name, colType, None, None, precision, scale,
+                                True))
+        return description
+
+    def var(self, varType, arraysize=None, **kwargs):  # pylint: disable=unused-argument
+        return StandInVar(varType)
+
+    def prepare(self, sql):
+        self.statement = sql
+
+    def parse(self, sql):
+        self.statement = sql
+        binds = dict([(name, None) for name in self.bindRegex.findall(sql)])
+        # only queries are parsed, the description is available without
+        # fetching any rows
+        self.cur.execute(self.translateSql(sql), binds)
+        self.description = self.describe(self.cur.description)
+
+    def execute(self, sql, values=None):
+        if sql is None:
+            sql = self.statement
+        self.statement = sql
+        self.standInConn.executed.append((sql, self.arraysize,
+                                          getattr(self, 'prefetchrows',
+                                                  None)))
+        if self.standInConn.failExecutes:
+            self.standInConn.failExecutes -= 1
+            raise cx_Oracle.DatabaseError('ORA-03113: end-of-file on communication channel')  # pylint: disable=no-member
+        self.cur.execute(self.translateSql(sql), self.getBinds(sql, values))
+        self.rowcount = self.cur.rowcount
+        self.description = self.describe(self.cur.description)
+        return self if self.description else None
+
+    def executemany(self, sql, rows, batcherrors=False,
+                    arraydmlrowcounts=False):
+        self.standInConn.executed.append((sql, self.arraysize,
+                                          getattr(self, 'prefetchrows',
+                                                  None)))
+        self.batchErrors = []
+        self.rowCounts = []
+        self.rowcount = 0
+        for offset, row in enumerate(rows):
+            try:
+                self.cur.execute(self.translateSql(sql),
+                                 self.getBinds(sql, row))
+            except sqlite3.Error as e:
+                if not batcherrors:
+                    raise cx_Oracle.DatabaseError(str(e))  # pylint: disable=no-member
+                self.batchErrors.append(StandInBatchError(offset, str(e)))
+                self.rowCounts.append(0)
+                continue
+            self.rowcount += self.cur.rowcount
+            self.rowCounts.append(self.cur.rowcount)
+        if arraydmlrowcounts is False:
+            self.rowCounts = []
+
+    def getbatcherrors(self):
+        return self.batchErrors
+
+    def getarraydmlrowcounts(self):
+        return self.rowCounts
+
+    def setinputsizes(self, *args, **kwargs):
+        self.inputSizes = kwargs if kwargs else list(args)
+
+    def fetchone(self):
+        return self.cur.fetchone()
+
+    def fetchmany(self, numRows=None):
+        return self.cur.fetchmany(numRows or self.arraysize)
+
+    def fetchall(self):
+        return self.cur.fetchall()
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany()
+            if not rows:
+                break
+            for row in rows:
+                yield row
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self.closed = True
+        self.cur.close()
+
+
+class StandInConnection(object):
+    '''
+    a cx_Oracle connection stand in.
+
+    :ivar columnTypes: dictionary of upper case column name -> (type,
+                       precision, scale) used to describe query results, the
+                       columns that are not in it are described as VARCHAR2
+    :ivar executed: list of (sql, arraysize, prefetchrows) for each
+                    statement executed
+    :ivar failExecutes: the number of the next cursor.execute() calls that
+                        raise a cx_Oracle.DatabaseError
+    '''
+
+    def __init__(self, columnTypes=None):
+        # TableDiff and ParallelQuery use the connection from worker threads
+        self.conn = sqlite3.connect(':memory:', check_same_thread=False,
+                                    detect_types=sqlite3.PARSE_DECLTYPES)
+        self.conn.create_function('TO_WKBGEOMETRY', 1,
+                                  lambda geom: b'WKB:' + str(geom).encode())
+        # lets tests make a query take a while, SELECT SLEEP(seconds)
+        self.conn.create_function('SLEEP', 1, time.sleep)
+        self.columnTypes = columnTypes or {}
+        self.stmtcachesize = 20
+        # milliseconds, not enforced
+        self.callTimeout = 0
+        self.executed = []
+        self.failExecutes = 0
+        self.cursors = []
+        self.closed = False
+        # set by StandInConnect
+        self.user = None
+        self.dsn = None
+        self.openTime = time.time()
+        self.closeTime = None
+
+    def __setattr__(self, name, value):
+        if name == 'callTimeout' and self.__dict__.get('noCallTimeout'):
+            raise AttributeError(name)
+        object.__setattr__(self, name, value)
+
+    def cursor(self):
+        curObj = StandInCursor(self)
+        self.cursors.append(curObj)
+        return curObj
+
+    def getOpenCursors(self):
+        return [curObj for curObj in self.cursors if not curObj.closed]
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def ping(self):
+        if self.closed:
+            raise cx_Oracle.DatabaseError('not connected')  # pylint: disable=no-member
+
+    def close(self):
+        self.closed = True
+        self.closeTime = time.time()
+
+
+class StandInConnect(object):
+    '''
+    stand in for cx_Oracle.connect, every connection it opens contains the
+    test_data table.
+
+    :ivar connections: the StandInConnections opened, in order
+    :ivar failUsers: connecting as one of these users raises a
+                     cx_Oracle.DatabaseError
+    :ivar clientVersion: the cx_Oracle version the connections behave
+                         like, before 7.2 they do not have the callTimeout
+                         attribute and before 8.0 their cursors do not have
+                         the prefetchrows attribute
+    '''
+
+    def __init__(self):
+        self.connections = []
+        self.failUsers = set()
+        self.clientVersion = (8, 3)
+        self.lock = threading.Lock()
+
+    def __call__(self, user, pswd, dsn, **kwargs):  # pylint: disable=unused-argument
+        if user in self.failUsers:
+            raise cx_Oracle.DatabaseError('ORA-01017: invalid username/password')  # pylint: disable=no-member
+        standInConn = StandInConnection(
+            {'ID': (cx_Oracle.DB_TYPE_NUMBER, 10, 0)})
+        createTestData(standInConn)
+        standInConn.user = user
+        standInConn.dsn = dsn
+        if self.clientVersion < (7, 2):
+            del standInConn.callTimeout
+            standInConn.noCallTimeout = True
+        if self.clientVersion < (8, 0):
+            standInConn.noPrefetchRows = True
+        with self.lock:
+            self.connections.append(standInConn)
+        return standInConn
+
+
+class StandInDbConnection(object):
+    '''
+    stand in for OraIterator.DbConnection, reconnect() replaces the
+    connection with a new one to the same sqlite database
+    '''
+
+    def __init__(self, standInConn):
+        self.conn = standInConn
+        self.reconnects = 0
+
+    def getConnection(self):
+        return self.conn
+
+    def reconnect(self):
+        self.reconnects += 1
+
+
+class StandInSessionPool(object):
+    '''
+    stand in for cx_Oracle.SessionPool handing out StandInConnections,
+    every pool that is created is recorded in the class attribute created
+    '''
+    created = []
+
+    def __init__(self, user, pswd, dsn, min=1, max=2, increment=1, **kwargs):  # pylint: disable=redefined-builtin,unused-argument
+        self.user = user
+        self.pswd = pswd
+        self.dsn = dsn
+        self.min = min
+        self.max = max
+        self.opened = min
+        self.busy = 0
+        self.dropped = []
+        self.closed = False
+        # connections that fail their ping when they are acquired
+        self.brokenConns = 0
+        self.created.append(self)
+
+    def acquire(self):
+        conn = StandInConnection()
+        if self.brokenConns:
+            self.brokenConns -= 1
+            conn.closed = True
+        self.busy += 1
+        return conn
+
+    def release(self, conn):  # pylint: disable=unused-argument
+        self.busy -= 1
+
+    def drop(self, conn):
+        self.busy -= 1
+        self.dropped.append(conn)
+
+    def close(self, force=False):  # pylint: disable=unused-argument
+        self.closed = True
+
+
+def createTestData(standInConn, rowCnt=25):
+    '''
+    creates the table test_data with rowCnt rows
+    '''
+    standInConn.conn.execute('CREATE TABLE test_data (id INTEGER PRIMARY ' +
+                             'KEY, val TEXT)')
+    standInConn.conn.executemany(
+        'INSERT INTO test_data VALUES (?, ?)',
+        [(cnt, 'value {0}'.format(cnt)) for cnt in range(rowCnt)])
+    standInConn.conn.commit()
+
+
+@pytest.fixture()
+def DbLib_StandInConnection():
+    '''
+    a StandInConnection with the table test_data (id, val) containing the
+    rows 0 to 24
+    '''
+    standInConn = StandInConnection(
+        {'ID': (cx_Oracle.DB_TYPE_NUMBER, 10, 0)})
+    createTestData(standInConn)
+    yield standInConn
+
+
+@pytest.fixture()
+def DbLib_StandInDb(DbLib_StandInConnection):
+    '''
+    a DbLib.DbMethods object connected to the DbLib_StandInConnection
+    '''
+    import DB.DbLib  # pylint: disable=import-outside-toplevel
+    db = DB.DbLib.DbMethods()
+    db.connObj = DbLib_StandInConnection
+    db.initConnection()
+    yield db
+
+
+@pytest.fixture()
+def DbLib_StandInDbConnection(DbLib_StandInConnection):
+    '''
+    an OraIterator.DbConnection stand in for the DbLib_StandInConnection
+    '''
+    yield StandInDbConnection(DbLib_StandInConnection)
+
+
+@pytest.fixture()
+def DbLib_GeometryType():
+    '''
+    stand in for the cx_Oracle object type of SDO_GEOMETRY columns
+    '''
+    yield types.SimpleNamespace(name='SDO_GEOMETRY')
+
+
+@pytest.fixture()
+def DbPool_StandInSessionPool(monkeypatch):
+    '''
+    replaces cx_Oracle.SessionPool with the StandInSessionPool, yields the
+    list the pools that are created are added to
+    '''
+    monkeypatch.setattr(cx_Oracle, 'SessionPool', StandInSessionPool)
+    monkeypatch.setattr(StandInSessionPool, 'created', [])
+    yield StandInSessionPool.created
+
+
+@pytest.fixture()
+def DbLib_StandInConnect(monkeypatch):
+    '''
+    replaces cx_Oracle.connect with a StandInConnect, which is yielded
+    '''
+    standInConnect = StandInConnect()
+    monkeypatch.setattr(cx_Oracle, 'connect', standInConnect)
+    yield standInConnect
+
+
+@pytest.fixture()
+def DbPool_ConnectionRegistry(DbLib_StandInConnect, monkeypatch):  # pylint: disable=unused-argument
+    '''
+    replaces the process wide connection registry with a new one, the
+    connections it opens come from DbLib_StandInConnect
+    '''
+    import DB.DbPool  # pylint: disable=import-outside-toplevel
+    connRegistry = DB.DbPool.ConnectionRegistry()
+    monkeypatch.setattr(DB.DbPool, '_CONNECTION_REGISTRY', connRegistry)
+    yield connRegistry
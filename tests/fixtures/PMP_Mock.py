@@ -0,0 +1,181 @@
+'''
+Created on Oct 18, 2026
+
+A stand-in for the PMP rest api, used to test PMP.PMPRestConnect without
+access to a real PMP server.  Requests are answered from a small set of
+resources and accounts and counted so tests can check how many calls were
+made.
+'''
+import copy
+import re
+
+import pytest
+
+MOCK_CONFIG = {'token': 'mocktoken',
+               'baseurl': 'pmp.mock',
+               'restdir': '/restapi/json/v1/'}
+
+MOCK_RESOURCES = {
+    '1': {'name': 'DB_PRD',
+          'accounts': {'11': ('WHSE_A', ''),
+                       '12': ('WHSE_B', '')}},
+    '2': {'name': 'DB_DLV',
+          'accounts': {'21': ('WHSE_A', '')}},
+    '3': {'name': 'API',
+          'accounts': {'31': ('apiuser', 'https://api1.gov.bc.ca/rest'),
+                       '32': ('apiuser', 'https://api2.gov.bc.ca/rest'),
+                       '33': ('apiuser@https://api3.gov.bc.ca', ''),
+                       '34': ('norights', '')}}}
+
+
+class MockPMPApi(object):
+    '''
+    answers PMP rest api requests from a copy of the MOCK_RESOURCES, tests
+    can add resources and accounts to it
+    '''
+    routeRegex = re.compile(
+        r'resources(/(?P<resId>\w+)/accounts(/(?P<accntId>\w+)' +
+        r'(?P<password>/password)?)?)?$')
+
+    def __init__(self):
+        self.resources = copy.deepcopy(MOCK_RESOURCES)
+        self.calls = []
+        # number of requests to fail with a 503 before answering
+        self.failNext = 0
+        # url suffix -> status code to respond to those urls with
+        self.failUrls = {}
+
+    def getCallCount(self, suffix=''):
+        '''
+        :return: the number of requests made for urls ending with the suffix
+        '''
+        return len([url for url in self.calls if url.endswith(suffix)])
+
+    def getResponse(self, url, params):
+        '''
+        :return: the http status code and json structure for the request
+        '''
+        self.calls.append(url)
+        if self.failNext:
+            self.failNext -= 1
+            return 503, {}
+        for suffix, status in self.failUrls.items():
+            if url.endswith(suffix):
+                return status, {}
+        if params.get('AUTHTOKEN') != MOCK_CONFIG['token']:
+            return 200, {'operation': {'result': {'status': 'Failed'}}}
+        match = self.routeRegex.search(url)
+        if not match:
+            return 404, {}
+        resId, accntId = match.group('resId'), match.group('accntId')
+        if resId is None:
+            details = [{'RESOURCE NAME': resource['name'],
+                        'RESOURCE ID': resourceId}
+                       for resourceId, resource in self.resources.items()]
+            return 200, {'operation': {'Details': details}}
+        accnts = self.resources[resId]['accounts']
+        if accntId is None:
+            accntList = [{'ACCOUNT NAME': accnt[0], 'ACCOUNT ID': curId}
+                         for curId, accnt in accnts.items()]
+            return 200, {'operation': {'Details': {'ACCOUNT LIST': accntList}}}
+        if match.group('password'):
+            password = 'pswd' + accntId
+            if accnts[accntId][0] == 'norights':
+                password = '[Request]'
+            return 200, {'operation': {'Details': {'PASSWORD': password}}}
+        customFields = [{'CUSTOMFIELDLABEL': 'Server',
+                         'CUSTOMFIELDVALUE': accnts[accntId][1]}]
+        return 200, {'operation': {'Details': {'CUSTOM FIELD': customFields,
+                                               'DESCRIPTION': ''}}}
+
+
+class MockResponse(object):
+
+    def __init__(self, statusCode, struct):
+        self.status_code = statusCode
+        self.struct = struct
+        self.text = str(struct)
+
+    def json(self):
+        return self.struct
+
+
+class MockSession(object):
+    '''
+    replaces requests.Session.get with calls to the MockPMPApi
+    '''
+
+    def __init__(self, api):
+        self.api = api
+
+    def get(self, url, params=None, **kwargs):  # pylint: disable=unused-argument
+        return MockResponse(*self.api.getResponse(url, params or {}))
+
+
+@pytest.fixture()
+def PMP_MockApi(monkeypatch):
+    '''
+    patches requests.Session so the requests made by PMP.PMPRestConnect
+    are answered by a MockPMPApi, yields the MockPMPApi
+    '''
+    import requests  # pylint: disable=import-outside-toplevel
+    api = MockPMPApi()
+    mockSession = MockSession(api)
+
+    def sessionGet(session, url, **kwargs):  # pylint: disable=unused-argument
+        return mockSession.get(url, **kwargs)
+    monkeypatch.setattr(requests.Session, 'get', sessionGet)
+    yield api
+
+
+class MockPMPServer(object):
+    '''
+    a local http server answering requests with a MockPMPApi, used to test
+    AsyncPMP.  start() and stop() must be called from the event loop that
+    the test runs in.
+    '''
+
+    def __init__(self, api):
+        self.api = api
+        self.runner = None
+
+    async def handleRequest(self, request):
+        from aiohttp import web  # pylint: disable=import-outside-toplevel
+        status, struct = self.api.getResponse(request.path,
+                                              dict(request.query))
+        return web.json_response(struct, status=status)
+
+    async def start(self):
+        '''
+        starts the server on a free port
+
+        :return: a pmp config dictionary pointing at the server
+        '''
+        from aiohttp import web  # pylint: disable=import-outside-toplevel
+        app = web.Application()
+        app.router.add_get('/{path:.*}', self.handleRequest)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        configDict = dict(MOCK_CONFIG)
+        configDict['baseurl'] = '{0}:{1}'.format(host, port)
+        return configDict
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+@pytest.fixture()
+def PMP_MockServer():
+    '''
+    yields a MockPMPServer, skips the test if aiohttp is not installed
+    '''
+    pytest.importorskip('aiohttp')
+    yield MockPMPServer(MockPMPApi())
+
+
+@pytest.fixture()
+def PMP_MockConfigDict():
+    yield dict(MOCK_CONFIG)
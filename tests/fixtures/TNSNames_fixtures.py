@@ -0,0 +1,69 @@
+'''
+Created on Oct 18, 2026
+
+tnsnames.ora files used to test the TNSNamesParser module
+'''
+import os.path
+
+import pytest
+
+TNSNAMES_CONTENT = '''# sample tnsnames file
+idwprod1.bcgov =
+  (DESCRIPTION =
+    (ADDRESS = (PROTOCOL = TCP)(HOST = prodhost.bcgov)(PORT = 1521))
+    (CONNECT_DATA =
+      (SERVER = DEDICATED)
+      (SERVICE_NAME = idwprod1.bcgov)
+    )
+  )
+
+# aliases spread over several lines
+dlvr.bcgov,
+dlvr2.bcgov,
+  delivery.bcgov =
+  (DESCRIPTION =
+    (ADDRESS_LIST =
+      (LOAD_BALANCE = on)
+      (FAILOVER = on)
+      (ADDRESS = (PROTOCOL = TCP)(HOST = dlvhost1.bcgov)(PORT = 1522))
+      (ADDRESS = (PROTOCOL = TCP)(HOST = dlvhost2.bcgov)(PORT = 1522))
+    )
+    (CONNECT_DATA = (SID = dlvrsid))
+  )
+
+IFILE = included.ora
+'''
+
+INCLUDED_CONTENT = '''
+testdb.bcgov = (DESCRIPTION=(ADDRESS=(PROTOCOL=TCP)(HOST=testhost.bcgov)(PORT=1521))(CONNECT_DATA=(SERVICE_NAME=testdb.bcgov)))
+'''
+
+
+@pytest.fixture()
+def TNSNames_File(tmp_path):
+    tnsFile = os.path.join(str(tmp_path), 'tnsnames.ora')
+    with open(tnsFile, 'w') as fh:
+        fh.write(TNSNAMES_CONTENT)
+    with open(os.path.join(str(tmp_path), 'included.ora'), 'w') as fh:
+        fh.write(INCLUDED_CONTENT)
+    yield tnsFile
+
+
+@pytest.fixture()
+def TNSNames_LargeFile(tmp_path):
+    '''
+    synthetic tnsnames file with 10000 entries
+    '''
+    entryTemplate = '''db{0}.bcgov, db{0}_alias =
+  (DESCRIPTION =
+    (ADDRESS_LIST =
+      (ADDRESS = (PROTOCOL = TCP)(HOST = host{1}.bcgov)(PORT = 1521))
+    )
+    (CONNECT_DATA = (SERVICE_NAME = db{0}.bcgov))
+  )
+'''
+    tnsFile = os.path.join(str(tmp_path), 'tnsnames_large.ora')
+    with open(tnsFile, 'w') as fh:
+        for cnt in range(10000):
+            fh.write(entryTemplate.format(cnt, cnt % 50))
+    yield tnsFile
@@ -0,0 +1,67 @@
+'''
+Created on Oct 18, 2026
+
+Source and destination databases used to test DB.TableDiff, backed by in
+memory sqlite databases with ORA_HASH and NVL functions added.
+'''
+import sqlite3
+import zlib
+
+import pytest
+
+
+def oraHash(value, maxBucket, seed):
+    '''
+    stand in for ORA_HASH, returns null for null values same as oracle
+    '''
+    if value is None:
+        return None
+    valueStr = '{0}:{1!r}'.format(seed, value)
+    return zlib.crc32(valueStr.encode('utf-8')) % (maxBucket + 1)
+
+
+class StandInDb(object):
+    '''
+    provides the executeOracleSql method of DbLib.DbMethods on top of a
+    sqlite connection
+    '''
+
+    def __init__(self, rows):
+        # the diff engine queries each database from a worker thread
+        self.conn = sqlite3.connect(':memory:', check_same_thread=False)
+        self.conn.create_function('ORA_HASH', 3, oraHash)
+        self.conn.create_function(
+            'NVL', 2, lambda value, default: default if value is None else value)
+        self.conn.execute('CREATE TABLE roads (id INTEGER, name TEXT, ' +
+                          'length REAL)')
+        self.conn.executemany('INSERT INTO roads VALUES (?, ?, ?)', rows)
+        self.queries = 0
+
+    def executeOracleSql(self, sqlToExecute, values=None):
+        self.queries += 1
+        cur = self.conn.cursor()
+        cur.execute(sqlToExecute, values or {})
+        return cur
+
+
+def getRoadRows():
+    return [(cnt, 'road {0}'.format(cnt), cnt * 1.5)
+            for cnt in range(1, 20001)]
+
+
+@pytest.fixture()
+def TableDiff_Databases():
+    '''
+    a source table with 20000 rows and a destination table that has a row
+    missing, a row changed and an extra row
+    '''
+    rows = getRoadRows()
+    destRows = [row for row in rows if row[0] != 1234]
+    destRows[9000] = (destRows[9000][0], 'renamed', destRows[9000][2])
+    destRows.append((25000, 'new road', 3.0))
+    yield StandInDb(rows), StandInDb(destRows)
+
+
+@pytest.fixture()
+def TableDiff_IdenticalDatabases():
+    yield StandInDb(getRoadRows()), StandInDb(getRoadRows())
@@ -0,0 +1,126 @@
+'''
+Created on Oct 18, 2026
+'''
+import asyncio
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+import DB.AsyncDbLib
+from fixtures.AsyncDb_fixtures import StandInCursor
+
+
+async def getConnectedDb(driver):
+    db = DB.AsyncDbLib.AsyncDbMethods(driver=driver)
+    await db.connect('user', 'pswd', 'servicename', 'host', 1521)
+    return db
+
+
+def test_objExists(AsyncDb_StandInDriver):
+
+    async def checkAll():
+        db = await getConnectedDb(AsyncDb_StandInDriver)
+        checks = [db.objExists('whse', 'table', 'roads'),
+                  db.objExists('whse', 'view', 'roads_vw'),
+                  db.objExists('whse', 'table', 'roads_vw'),
+                  db.objExists(None, 'tables', 'jobs'),
+                  db.objExists('whse', 'table', 'jobs')]
+        return await asyncio.gather(*checks)
+
+    results = asyncio.run(checkAll())
+    assert results == [True, True, False, True, False]
+    assert AsyncDb_StandInDriver.pools[0].busy == 0
+
+
+def test_executeManyAndFetchBatches(AsyncDb_StandInDriver):
+    rows = [{'id': cnt, 'val': 'value {0}'.format(cnt)} for cnt in range(25)]
+    # duplicate key is reported as a batch error
+    rows.append({'id': 3, 'val': 'duplicate'})
+
+    async def loadAndRead():
+        db = await getConnectedDb(AsyncDb_StandInDriver)
+        batchResults = await db.executeMany(
+            'INSERT INTO test_data (id, val) VALUES (:id, :val)', rows,
+            batchSize=10, batchErrors=True)
+        batches = []
+        async for batch in db.fetchBatches(
+                'SELECT id, val FROM test_data ORDER BY id', batchSize=7):
+            batches.append(batch)
+        return batchResults, batches
+
+    batchResults, batches = asyncio.run(loadAndRead())
+    assert [result['rows'] for result in batchResults] == [10, 10, 6]
+    assert batchResults[2]['errors'][0][0] == 25
+    assert [len(batch) for batch in batches] == [7, 7, 7, 4]
+    assert batches[0][0] == (0, 'value 0')
+
+
+def test_executeManyGenerator(AsyncDb_StandInDriver, monkeypatch):
+    consumed = []
+    consumedAtExecute = []
+
+    def genRows():
+        for cnt in range(25):
+            consumed.append(cnt)
+            yield (cnt, 'value {0}'.format(cnt))
+
+    origExecutemany = StandInCursor.executemany
+
+    async def executemany(curObj, *args, **kwargs):
+        consumedAtExecute.append(len(consumed))
+        await origExecutemany(curObj, *args, **kwargs)
+
+    monkeypatch.setattr(StandInCursor, 'executemany', executemany)
+
+    async def load():
+        db = await getConnectedDb(AsyncDb_StandInDriver)
+        return await db.executeMany(
+            'INSERT INTO test_data (id, val) VALUES (:id, :val)', genRows(),
+            batchSize=10)
+
+    batchResults = asyncio.run(load())
+    assert [result['rows'] for result in batchResults] == [10, 10, 5]
+    # only the rows for the batch being sent are taken from the generator
+    assert consumedAtExecute == [10, 20, 25]
+
+
+def test_fetchBatchesClosedEarly(AsyncDb_StandInDriver):
+
+    async def readFirst():
+        db = await getConnectedDb(AsyncDb_StandInDriver)
+        await db.executeMany(
+            'INSERT INTO test_data (id, val) VALUES (:id, :val)',
+            [(cnt, 'value') for cnt in range(25)])
+        batches = db.fetchBatches('SELECT id, val FROM test_data',
+                                  batchSize=10)
+        async for batch in batches:
+            break
+        await batches.aclose()
+        return batch
+
+    assert len(asyncio.run(readFirst())) == 10
+    pool = AsyncDb_StandInDriver.pools[0]
+    assert pool.busy == 0
+    assert all(curObj.closed for curObj in pool.cursors)
+
+
+def test_executeError(AsyncDb_StandInDriver):
+
+    async def runBadSql():
+        db = await getConnectedDb(AsyncDb_StandInDriver)
+        await db.execute('SELECT * FROM missing_table')
+
+    with pytest.raises(sqlite3.Error):
+        asyncio.run(runBadSql())
+    pool = AsyncDb_StandInDriver.pools[0]
+    assert pool.busy == 0
+    assert all(curObj.closed for curObj in pool.cursors)
+
+
+def test_importWithoutCxOracle():
+    # blocks the import of cx_Oracle
+    code = 'import sys; sys.modules["cx_Oracle"] = None; ' + \
+           'import DB.AsyncDbLib'
+    subprocess.run([sys.executable, '-c', code], check=True)
@@ -0,0 +1,195 @@
+'''
+Created on Oct 18, 2026
+'''
+import asyncio
+
+import pytest
+
+import PMP.AsyncPMPRestConnect
+import PMP.PMPRestConnect
+
+
+def runWithServer(server, testCoroutine, **kwargs):
+    '''
+    starts the mock server, runs the test coroutine with an AsyncPMP
+    pointed at it, then shuts both down
+    '''
+    async def run():
+        configDict = await server.start()
+        pmp = PMP.AsyncPMPRestConnect.AsyncPMP(configDict, scheme='http',
+                                                **kwargs)
+        try:
+            return await testCoroutine(pmp)
+        finally:
+            await pmp.close()
+            await server.stop()
+    return asyncio.run(run())
+
+
+def test_getAccountPassword(PMP_MockServer):
+    async def getPasswords(pmp):
+        lookups = [pmp.getAccountPassword('WHSE_A', 'DB_PRD'),
+                   pmp.getAccountPassword('whse_b', 'db_prd'),
+                   pmp.getAccountPassword('WHSE_A', 'DB_DLV'),
+                   pmp.getAccountPassword('NOTTHERE', 'DB_PRD')]
+        return await asyncio.gather(*lookups)
+
+    passwords = runWithServer(PMP_MockServer, getPasswords, maxConcurrent=2)
+    assert passwords == ['pswd11', 'pswd12', 'pswd21', None]
+    api = PMP_MockServer.api
+    # concurrent lookups share the resource and account requests, the miss
+    # is not refreshed as the accounts were retrieved during the lookup
+    assert api.getCallCount('/resources') == 1
+    assert api.getCallCount('/accounts') == 2
+    assert api.getCallCount('/password') == 3
+
+
+def test_getAccountsAndErrors(PMP_MockServer):
+    async def getAccounts(pmp):
+        resources = await pmp.getResources()
+        accnts = await pmp.getAccounts('DB_PRD')
+        with pytest.raises(PMP.PMPRestConnect.ResourceNotFound):
+            await pmp.getAccounts('NOTTHERE')
+        with pytest.raises(ValueError):
+            await pmp.getAccountPassword('norights', 'API')
+        return resources, accnts
+
+    resources, accnts = runWithServer(PMP_MockServer, getAccounts)
+    assert len(resources) == 3
+    assert sorted([accnt['ACCOUNT NAME'] for accnt in accnts]) == \
+        ['WHSE_A', 'WHSE_B']
+
+
+def test_getRestAPIPassword(PMP_MockServer):
+    async def getPasswords(pmp):
+        return await asyncio.gather(
+            pmp.getRestAPIPassword('apiuser', 'https://api2.gov.bc.ca/x', 'API'),
+            pmp.getRestAPIPassword('apiuser', 'https://api1.gov.bc.ca', 'API'),
+            pmp.getRestAPIPassword('apiuser', 'https://api3.gov.bc.ca', 'API'))
+
+    passwords = runWithServer(PMP_MockServer, getPasswords)
+    assert passwords == ['pswd32', 'pswd31', 'pswd33']
+    # the details are retrieved once for the concurrent lookups, and only
+    # for the accounts with a matching username
+    assert PMP_MockServer.api.getCallCount('/accounts/32') == 1
+    assert PMP_MockServer.api.getCallCount('/accounts/34') == 0
+
+
+def test_getRestAPIPasswordDetailsError(PMP_MockServer):
+    api = PMP_MockServer.api
+    api.failUrls['/accounts/31'] = 404
+
+    async def getPasswords(pmp):
+        passwords = [await pmp.getRestAPIPassword(
+            'apiuser', 'https://api2.gov.bc.ca', 'API')]
+        with pytest.raises(PMP.PMPRestConnect.PMPCommunicationProblem):
+            await pmp.getRestAPIPassword('apiuser', 'https://api1.gov.bc.ca',
+                                         'API')
+        del api.failUrls['/accounts/31']
+        passwords.append(await pmp.getRestAPIPassword(
+            'apiuser', 'https://api1.gov.bc.ca', 'API'))
+        return passwords
+
+    # the account that failed is skipped and the failure is not cached
+    assert runWithServer(PMP_MockServer, getPasswords) == ['pswd32', 'pswd31']
+    assert api.getCallCount('/accounts/32') == 1
+
+
+def test_retry(PMP_MockServer, monkeypatch):
+    monkeypatch.setattr(PMP.PMPRestConnect.PMPConst, 'retryBackoffFactor', 0)
+    PMP_MockServer.api.failNext = 2
+
+    async def getPassword(pmp):
+        return await pmp.getAccountPassword('WHSE_A', 'DB_PRD')
+
+    assert runWithServer(PMP_MockServer, getPassword) == 'pswd11'
+    assert PMP_MockServer.api.getCallCount('/resources') == 3
+
+
+def test_staleCache(PMP_MockServer):
+    api = PMP_MockServer.api
+
+    async def getPasswords(pmp):
+        passwords = [await pmp.getAccountPassword('WHSE_A', 'DB_PRD'),
+                     await pmp.getRestAPIPassword(
+                         'apiuser', 'https://api1.gov.bc.ca', 'API')]
+        # added to pmp after the lists were cached
+        api.resources['1']['accounts']['13'] = ('WHSE_C', '')
+        api.resources['3']['accounts']['35'] = ('apiuser',
+                                                'https://api5.gov.bc.ca')
+        api.resources['4'] = {'name': 'DB_NEW',
+                              'accounts': {'41': ('WHSE_A', '')}}
+        passwords.extend(await asyncio.gather(
+            pmp.getAccountPassword('WHSE_C', 'DB_PRD'),
+            pmp.getAccountPassword('whse_c', 'db_prd'),
+            pmp.getRestAPIPassword('apiuser', 'https://api5.gov.bc.ca',
+                                   'API'),
+            pmp.getAccountPassword('WHSE_A', 'DB_NEW')))
+        return passwords
+
+    passwords = runWithServer(PMP_MockServer, getPasswords)
+    assert passwords == ['pswd11', 'pswd31', 'pswd13', 'pswd13', 'pswd35',
+                         'pswd41']
+    # each list is refreshed once, concurrent misses share the refresh
+    assert api.getCallCount('/resources') == 2
+    assert api.getCallCount('/resources/1/accounts') == 2
+    assert api.getCallCount('/resources/3/accounts') == 2
+    assert api.getCallCount('/accounts/35') == 1
+
+
+class FlakySession(object):
+    '''
+    wraps an aiohttp session, failing the first requests with a connection
+    error
+    '''
+
+    def __init__(self, session, failures):
+        self.session = session
+        self.failures = failures
+
+    def get(self, url, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            import aiohttp  # pylint: disable=import-outside-toplevel
+            raise aiohttp.ClientConnectionError('connection reset')
+        return self.session.get(url, **kwargs)
+
+    async def close(self):
+        await self.session.close()
+
+
+def test_retryClientError(PMP_MockServer, monkeypatch):
+    monkeypatch.setattr(PMP.PMPRestConnect.PMPConst, 'retryBackoffFactor', 0)
+    aiohttp = pytest.importorskip('aiohttp')
+
+    async def getPassword(failures):
+        configDict = await PMP_MockServer.start()
+        session = FlakySession(aiohttp.ClientSession(), failures)
+        pmp = PMP.AsyncPMPRestConnect.AsyncPMP(configDict, scheme='http',
+                                                session=session)
+        try:
+            return await pmp.getAccountPassword('WHSE_A', 'DB_PRD')
+        finally:
+            await pmp.close()
+            await PMP_MockServer.stop()
+
+    assert asyncio.run(getPassword(2)) == 'pswd11'
+    assert PMP_MockServer.api.getCallCount('/resources') == 1
+    with pytest.raises(aiohttp.ClientConnectionError):
+        asyncio.run(getPassword(PMP.PMPRestConnect.PMPConst.retries + 1))
+
+
+def test_getRestAPIPasswordNoCache(PMP_MockServer):
+    async def getPasswords(pmp):
+        passwords = [await pmp.getRestAPIPassword(
+            'apiuser', 'https://api2.gov.bc.ca/x', 'API') for _ in range(2)]
+        with pytest.raises(PMP.PMPRestConnect.AccountNotFound):
+            await pmp.getRestAPIPassword(
+                'apiuser', 'https://notthere.gov.bc.ca', 'API')
+        return passwords
+
+    passwords = runWithServer(PMP_MockServer, getPasswords, cacheTTL=None)
+    assert passwords == ['pswd32', 'pswd32']
+    # only the accounts with a matching username are retrieved
+    assert PMP_MockServer.api.getCallCount('/accounts/32') == 3
+    assert PMP_MockServer.api.getCallCount('/accounts/34') == 0
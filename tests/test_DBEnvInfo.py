@@ -0,0 +1,39 @@
+'''
+Created on Oct 18, 2026
+'''
+import json
+
+import pytest
+
+import DB.DBEnvInfo
+
+
+def getSecretsFile(tmp_path, dbParams):
+    secretsFile = tmp_path / 'secrets.json'
+    secretsFile.write_text(json.dumps({'DBPARAMS': dbParams,
+                                       'PMPPARAMS': {}}))
+    return str(secretsFile)
+
+
+def test_getKey(tmp_path):
+    dbParams = {'PROD': {'keyAliases': ['PRD', 'production'],
+                         'pmpres': 'prodres'},
+                'DELIV': {'keyAliases': ['DLV'], 'pmpres': 'dlvres'}}
+    envInfo = DB.DBEnvInfo.DBEnvInfo(getSecretsFile(tmp_path, dbParams))
+    assert envInfo.getKey('prd') == 'PROD'
+    assert envInfo.getKey('Production') == 'PROD'
+    assert envInfo.getKey('deliv') == 'DELIV'
+    assert envInfo.getKey('test') is None
+    assert envInfo.isValidKey('dlv')
+    assert not envInfo.isValidKey('test')
+    assert envInfo.getDbInfo('dlv')['pmpres'] == 'dlvres'
+    assert envInfo.getDestinationPmpResource('prd') == 'prodres'
+    assert envInfo.resolveKeys(['prd', 'dlv', 'test']) == \
+        {'prd': 'PROD', 'dlv': 'DELIV', 'test': None}
+
+
+def test_keyAliasCollision(tmp_path):
+    dbParams = {'PROD': {'keyAliases': ['PRD']},
+                'DELIV': {'keyAliases': ['prd']}}
+    with pytest.raises(ValueError):
+        DB.DBEnvInfo.DBEnvInfo(getSecretsFile(tmp_path, dbParams))
@@ -0,0 +1,385 @@
+'''
+Created on Oct 18, 2026
+'''
+import array
+
+import cx_Oracle
+import pytest
+
+import DB.DbLib
+
+INSERT_SQL = 'INSERT INTO test_data (id, val) VALUES (:id, :val)'
+
+
+def getRowCount(db):
+    curObj = db.executeOracleSql('SELECT COUNT(*) FROM test_data')
+    return curObj.fetchone()[0]
+
+
+def test_executeManyBatches(DbLib_StandInDb):
+    rows = ((cnt, 'new {0}'.format(cnt)) for cnt in range(100, 123))
+    results = DbLib_StandInDb.executeMany(INSERT_SQL, rows, batchSize=10)
+    assert [result['batch'] for result in results] == [0, 1, 2]
+    assert [result['rows'] for result in results] == [10, 10, 3]
+    assert [result['rowcount'] for result in results] == [10, 10, 3]
+    assert all(not result['errors'] for result in results)
+    assert getRowCount(DbLib_StandInDb) == 25 + 23
+    # one executemany() per batch, on a cursor that is closed afterwards
+    standInConn = DbLib_StandInDb.connObj
+    assert [sql for sql, _, _ in standInConn.executed].count(INSERT_SQL) == 3
+    assert standInConn.cursors[0].closed
+
+
+def test_executeManyExactBatches(DbLib_StandInDb):
+    rows = [(cnt, 'new') for cnt in range(100, 120)]
+    results = DbLib_StandInDb.executeMany(INSERT_SQL, rows, batchSize=10)
+    assert [result['rows'] for result in results] == [10, 10]
+    assert DbLib_StandInDb.executeMany(INSERT_SQL, [], batchSize=10) == []
+
+
+def test_executeManyBatchErrors(DbLib_StandInDb):
+    # ids 3 and 12 already exist
+    rows = [(cnt, 'new') for cnt in [100, 101, 3, 102, 103, 104, 105, 106,
+                                     12, 107]]
+    results = DbLib_StandInDb.executeMany(INSERT_SQL, rows, batchSize=4,
+                                          batchErrors=True,
+                                          arrayDMLRowCounts=True)
+    # the error offsets are relative to the start of the input
+    errors = [error for result in results for error in result['errors']]
+    assert [offset for offset, _ in errors] == [2, 8]
+    assert [result['rowCounts'] for result in results] == \
+        [[1, 1, 0, 1], [1, 1, 1, 1], [0, 1]]
+    assert getRowCount(DbLib_StandInDb) == 25 + 8
+
+
+def test_executeManyError(DbLib_StandInDb):
+    rows = [(100, 'new'), (3, 'duplicate')]
+    with pytest.raises(cx_Oracle.DatabaseError):  # pylint: disable=no-member
+        DbLib_StandInDb.executeMany(INSERT_SQL, rows)
+    # the cursor is closed even though the batch failed
+    assert not DbLib_StandInDb.connObj.getOpenCursors()
+    results = DbLib_StandInDb.executeMany(INSERT_SQL, [(101, 'new')])
+    assert results[0]['rowCounts'] == []
+    assert results[0]['errors'] == []
+
+
+def test_executeManyInputSizes(DbLib_StandInDb):
+    standInConn = DbLib_StandInDb.connObj
+    DbLib_StandInDb.executeMany(INSERT_SQL, [(100, 'new')],
+                                inputSizes=[int, 20])
+    assert standInConn.cursors[-1].inputSizes == [int, 20]
+    DbLib_StandInDb.executeMany(INSERT_SQL, [{'id': 101, 'val': 'new'}],
+                                inputSizes={'id': int, 'val': 20})
+    assert standInConn.cursors[-1].inputSizes == {'id': int, 'val': 20}
+    assert getRowCount(DbLib_StandInDb) == 27
+
+
+@pytest.fixture()
+def allObjectsDb(DbLib_StandInDb):
+    '''
+    adds a stand in for the ALL_OBJECTS view
+    '''
+    DbLib_StandInDb.connObj.conn.executescript('''
+        CREATE TABLE all_objects (owner TEXT, object_type TEXT,
+                                  object_name TEXT);
+        INSERT INTO all_objects VALUES ('WHSE', 'TABLE', 'ROADS');
+        INSERT INTO all_objects VALUES ('WHSE', 'VIEW', 'ROADS_VW');
+        INSERT INTO all_objects VALUES ('APP', 'TABLE', 'JOBS');
+        ''')
+    yield DbLib_StandInDb
+
+
+def getDictQueries(db):
+    return [executed for executed in db.connObj.executed
+            if 'all_objects' in executed[0]]
+
+
+def test_objsExist(allObjectsDb):
+    objList = [('whse', 'table', 'roads'),
+               ('WHSE', 'VIEWS', 'roads_vw'),
+               ('whse', 'table', 'roads_vw'),
+               ('whse', 'table', 'jobs'),
+               (None, 'tables', 'jobs'),
+               (None, 'view', 'jobs')]
+    assert allObjectsDb.objsExist(objList) == {
+        ('whse', 'table', 'roads'): True,
+        ('WHSE', 'VIEWS', 'roads_vw'): True,
+        ('whse', 'table', 'roads_vw'): False,
+        ('whse', 'table', 'jobs'): False,
+        (None, 'tables', 'jobs'): True,
+        (None, 'view', 'jobs'): False}
+    # one query for the schema and one for the objects without a schema
+    dictQueries = getDictQueries(allObjectsDb)
+    assert len(dictQueries) == 2
+    # the arraysize is set before the snapshot is queried
+    assert dictQueries[0][1] == allObjectsDb.const.dictArraySize
+    assert not allObjectsDb.connObj.getOpenCursors()
+
+    with pytest.raises(DB.DbLib.FunctionalityNotDefinedError):
+        allObjectsDb.objsExist([('whse', 'sequence', 'seq')])
+
+
+def test_dictionaryCache(allObjectsDb):
+    objTriple = ('whse', 'table', 'roads')
+    allObjectsDb.objsExist([objTriple])
+    allObjectsDb.objsExist([objTriple])
+    # without the cache every call queries the dictionary
+    assert len(getDictQueries(allObjectsDb)) == 2
+
+    allObjectsDb.enableDictionaryCache(ttl=60)
+    allObjectsDb.objsExist([objTriple])
+    allObjectsDb.connObj.conn.execute(
+        "INSERT INTO all_objects VALUES ('WHSE', 'TABLE', 'NEW_TABLE')")
+    newTriple = ('whse', 'table', 'new_table')
+    # answered from the snapshot so the new table is not visible yet
+    assert not allObjectsDb.objsExist([newTriple])[newTriple]
+    assert len(getDictQueries(allObjectsDb)) == 3
+
+    # the snapshot is reloaded once it is older than the ttl
+    loadTime, objs = allObjectsDb.dictCache['WHSE']
+    allObjectsDb.dictCache['WHSE'] = (loadTime - 61, objs)
+    assert allObjectsDb.objsExist([newTriple])[newTriple]
+    assert len(getDictQueries(allObjectsDb)) == 4
+
+    # and when the cache is cleared
+    allObjectsDb.objsExist([objTriple])
+    allObjectsDb.clearDictionaryCache()
+    allObjectsDb.objsExist([objTriple])
+    assert len(getDictQueries(allObjectsDb)) == 5
+
+
+def test_objExistsUseCache(allObjectsDb):
+    allObjectsDb.enableDictionaryCache(ttl=60)
+    assert allObjectsDb.objExists('whse', 'table', 'roads', useCache=True)
+    assert not allObjectsDb.objExists('whse', 'view', 'roads',
+                                      useCache=True)
+    assert len(getDictQueries(allObjectsDb)) == 1
+
+
+def test_getInListChunks(DbLib_StandInDb):
+    chunks = list(DbLib_StandInDb.getInListChunks(list(range(7)), 3))
+    # the last chunk is padded with None so every chunk binds 3 values
+    assert chunks == [[0, 1, 2], [3, 4, 5], [6, None, None]]
+    assert list(DbLib_StandInDb.getInListChunks(list(range(6)), 3)) == \
+        [[0, 1, 2], [3, 4, 5]]
+    assert list(DbLib_StandInDb.getInListChunks([], 3)) == []
+    chunks = list(DbLib_StandInDb.getInListChunks(['a']))
+    assert len(chunks[0]) == DbLib_StandInDb.const.inListSize
+
+
+def test_getFromDb(DbLib_StandInDb):
+    values = ['value {0}'.format(cnt) for cnt in [3, 1, 4, 1, 5, 9, 2, 6]]
+    values.append('missing')
+    retList = DbLib_StandInDb.getFromDb(values, 'test_data', 'id', 'val',
+                                        chunkSize=3)
+    assert sorted(retList) == [[cnt, 'value {0}'.format(cnt)]
+                               for cnt in [1, 2, 3, 4, 5, 6, 9]]
+    # duplicates are removed, leaving 8 values looked up in 3 chunks, all
+    # using the same statement on the same prepared cursor
+    lookups = [executed[0] for executed in DbLib_StandInDb.connObj.executed]
+    assert len(lookups) == 3
+    assert len(set(lookups)) == 1
+    assert lookups[0].count(':id') == 3
+    assert DbLib_StandInDb.getStatementCacheStats()['misses'] == 1
+
+    retDict = DbLib_StandInDb.getFromDb(values, 'test_data', 'id', 'val',
+                                        asDict=True)
+    assert retDict['value 9'] == 9
+    assert 'missing' not in retDict
+    assert len(retDict) == 7
+
+
+def test_executeOracleSqlNoReturn(DbLib_StandInDb):
+    standInConn = DbLib_StandInDb.connObj
+    DbLib_StandInDb.executeOracleSqlNoReturn(
+        'CREATE TABLE other_data (id INTEGER)')
+    DbLib_StandInDb.executeOracleSqlNoReturn('DELETE FROM test_data')
+    # statements without binds are not added to the prepared cursor cache
+    assert DbLib_StandInDb.getStatementCacheStats()['size'] == 0
+    assert not standInConn.getOpenCursors()
+
+    sql = 'INSERT INTO other_data (id) VALUES (:id)'
+    for cnt in range(3):
+        DbLib_StandInDb.executeOracleSqlNoReturn(sql, [cnt])
+    stats = DbLib_StandInDb.getStatementCacheStats()
+    assert (stats['size'], stats['misses'], stats['hits']) == (1, 1, 2)
+    curObj = DbLib_StandInDb.executeOracleSql('SELECT id FROM other_data')
+    assert curObj.fetchall() == [(0,), (1,), (2,)]
+    assert getRowCount(DbLib_StandInDb) == 0
+
+
+def test_preparedCursorLimit(DbLib_StandInDb):
+    standInConn = DbLib_StandInDb.connObj
+    DbLib_StandInDb.preparedCursorLimit = 2
+    sqls = ['SELECT val FROM test_data WHERE id = :id',
+            'SELECT id FROM test_data WHERE val = :val',
+            'SELECT COUNT(*) FROM test_data WHERE id < :id']
+    for sql in sqls:
+        DbLib_StandInDb.executePrepared(sql, [1])
+    stats = DbLib_StandInDb.getStatementCacheStats()
+    assert (stats['size'], stats['evictions']) == (2, 1)
+    # the least recently used cursor is closed when it is evicted
+    assert len(standInConn.getOpenCursors()) == 2
+    assert list(DbLib_StandInDb.preparedCursors) == sqls[1:]
+    DbLib_StandInDb.clearPreparedCursors()
+    assert not standInConn.getOpenCursors()
+
+
+def test_executeOracleSqlColumnar(DbLib_StandInDb):
+    columns = DbLib_StandInDb.executeOracleSqlColumnar(
+        'SELECT id, val FROM test_data ORDER BY id', arraysize=10)
+    assert list(columns) == ['ID', 'VAL']
+    assert isinstance(columns['ID'], array.array)
+    assert columns['ID'].typecode == DbLib_StandInDb.const.intTypeCode
+    assert list(columns['ID']) == list(range(25))
+    assert columns['VAL'][24] == 'value 24'
+    assert DbLib_StandInDb.connObj.executed[-1][1] == 10
+    assert not DbLib_StandInDb.connObj.getOpenCursors()
+
+
+def test_executeOracleSqlColumnarNulls(DbLib_StandInDb):
+    expected = list(range(25))
+    # nulls in the middle of the second and third batches
+    expected[13] = expected[24] = None
+    DbLib_StandInDb.connObj.conn.execute(
+        'CREATE TABLE nums (seq INTEGER, num INTEGER)')
+    DbLib_StandInDb.connObj.conn.executemany(
+        'INSERT INTO nums VALUES (?, ?)', enumerate(expected))
+    sql = 'SELECT num AS id FROM nums ORDER BY seq'
+    columns = DbLib_StandInDb.executeOracleSqlColumnar(sql, arraysize=10)
+    assert isinstance(columns['ID'], list)
+    assert columns['ID'] == expected
+
+    # values that can not be stored in the array type
+    DbLib_StandInDb.connObj.conn.execute(
+        'UPDATE nums SET num = 16.5 WHERE seq = 16')
+    expected = list(range(25))
+    expected[16] = 16.5
+    DbLib_StandInDb.connObj.conn.execute(
+        'UPDATE nums SET num = seq WHERE num IS NULL')
+    columns = DbLib_StandInDb.executeOracleSqlColumnar(sql, arraysize=10)
+    assert columns['ID'] == expected
+
+
+def test_lobOutputTypeHandler(DbLib_StandInDb):
+    curObj = DbLib_StandInDb.connObj.cursor()
+    handler = DbLib_StandInDb.lobOutputTypeHandler
+    for lobType, fetchType in [(cx_Oracle.CLOB, cx_Oracle.LONG_STRING),  # pylint: disable=no-member
+                               (cx_Oracle.NCLOB, cx_Oracle.LONG_STRING),  # pylint: disable=no-member
+                               (cx_Oracle.BLOB, cx_Oracle.LONG_BINARY)]:  # pylint: disable=no-member
+        assert handler(curObj, 'COL', lobType, None, None, None).type == \
+            fetchType
+    assert handler(curObj, 'COL', cx_Oracle.NUMBER, None, 10, 0) is None  # pylint: disable=no-member
+
+
+def test_numberOutputTypeHandler(DbLib_StandInDb):
+    curObj = DbLib_StandInDb.connObj.cursor()
+    handler = DbLib_StandInDb.numberOutputTypeHandler
+    assert handler(curObj, 'COL', cx_Oracle.NUMBER, None, 10, 2).type == \
+        cx_Oracle.NATIVE_FLOAT  # pylint: disable=no-member
+    # integer and unconstrained NUMBER columns keep the default conversion
+    for precision, scale in [(10, 0), (0, -127), (None, None)]:
+        assert handler(curObj, 'COL', cx_Oracle.NUMBER, None, precision,  # pylint: disable=no-member
+                       scale) is None
+
+
+def test_executeOracleSqlColumnarUnconstrainedNumber(DbLib_StandInDb):
+    standInConn = DbLib_StandInDb.connObj
+    # cursor descriptions report the database type, unlike cx_Oracle.NUMBER
+    # it does not compare equal to NATIVE_FLOAT
+    standInConn.columnTypes['NUM'] = (cx_Oracle.DB_TYPE_NUMBER, 0, -127)  # pylint: disable=no-member
+    bigValue = 2 ** 60 + 1
+    standInConn.conn.execute('CREATE TABLE nums (num INTEGER)')
+    standInConn.conn.executemany('INSERT INTO nums VALUES (?)',
+                                 [(bigValue,), (1,)])
+    columns = DbLib_StandInDb.executeOracleSqlColumnar(
+        'SELECT num FROM nums ORDER BY num DESC')
+    assert isinstance(columns['NUM'], list)
+    assert columns['NUM'] == [bigValue, 1]
+
+
+@pytest.fixture()
+def spatialDb(DbLib_StandInDb, DbLib_GeometryType):
+    '''
+    adds the tables roads, with a geometry and a CLOB column, and owners
+    '''
+    standInConn = DbLib_StandInDb.connObj
+    standInConn.columnTypes['SHAPE'] = (DbLib_GeometryType, None, None)
+    standInConn.columnTypes['NOTES'] = (cx_Oracle.CLOB, None, None)  # pylint: disable=no-member
+    standInConn.conn.executescript('''
+        CREATE TABLE roads (id INTEGER, owner_id INTEGER, shape TEXT,
+                            notes TEXT);
+        INSERT INTO roads VALUES (1, 10, 'LINE 1', 'first road');
+        INSERT INTO roads VALUES (2, 20, 'LINE 2', 'second road');
+        CREATE TABLE owners (id INTEGER, name TEXT);
+        INSERT INTO owners VALUES (10, 'owner a');
+        INSERT INTO owners VALUES (20, 'owner b');
+        ''')
+    yield DbLib_StandInDb
+
+
+def test_executeOracleSqlInlineLobs(spatialDb):
+    sql = 'SELECT id, shape, notes FROM roads ORDER BY id'
+    curObj = spatialDb.executeOracleSqlInlineLobs(sql)
+    assert [colDesc[0] for colDesc in curObj.description] == \
+        ['ID', 'SHAPE', 'NOTES']
+    # the CLOB column is fetched inline as a string
+    assert curObj.description[2][1] == cx_Oracle.LONG_STRING  # pylint: disable=no-member
+    assert curObj.fetchall() == [(1, b'WKB:LINE 1', 'first road'),
+                                 (2, b'WKB:LINE 2', 'second road')]
+    curObj.close()
+    executed = spatialDb.connObj.executed[-1]
+    assert 'SDO_UTIL.TO_WKBGEOMETRY(wkbsrc.WKBCOL1) "SHAPE"' in executed[0]
+    assert executed[1] == spatialDb.const.lobArraySize
+
+    curObj = spatialDb.executeOracleSqlInlineLobs(sql, convertGeometry=False,
+                                                  arraysize=10)
+    assert curObj.fetchone()[1] == 'LINE 1'
+    assert spatialDb.connObj.executed[-1][:2] == (sql, 10)
+
+
+def test_executeOracleSqlInlineLobsDuplicateNames(spatialDb):
+    # both tables have an id column
+    sql = 'SELECT roads.id, roads.shape, owners.id, owners.name ' + \
+          'FROM roads JOIN owners ON roads.owner_id = owners.id ' + \
+          'WHERE roads.id = :id'
+    curObj = spatialDb.executeOracleSqlInlineLobs(sql, [2])
+    assert [colDesc[0] for colDesc in curObj.description] == \
+        ['ID', 'SHAPE', 'ID', 'NAME']
+    assert curObj.fetchall() == [(2, b'WKB:LINE 2', 20, 'owner b')]
+    curObj.close()
+    assert not spatialDb.connObj.getOpenCursors()
+
+
+def test_getWkbSql(DbLib_StandInDb):
+    wkbSql = DbLib_StandInDb.getWkbSql('SELECT * FROM roads',
+                                       ['ID', 'shape', 'ID'], ['SHAPE'])
+    assert wkbSql == 'WITH wkbsrc (WKBCOL0, WKBCOL1, WKBCOL2) AS ' + \
+        '(SELECT * FROM roads) SELECT wkbsrc.WKBCOL0 "ID", ' + \
+        'SDO_UTIL.TO_WKBGEOMETRY(wkbsrc.WKBCOL1) "shape", ' + \
+        'wkbsrc.WKBCOL2 "ID" FROM wkbsrc'
+
+
+def test_readLob(DbLib_StandInDb):
+
+    class StandInLob(object):
+
+        def __init__(self, data):
+            self.data = data
+            self.reads = []
+
+        def getchunksize(self):
+            return 4
+
+        def read(self, offset, amount):
+            self.reads.append((offset, amount))
+            return self.data[offset - 1:offset - 1 + amount]
+
+    lob = StandInLob('x' * 150)
+    chunks = list(DbLib_StandInDb.readLob(lob))
+    chunkSize = 4 * DbLib_StandInDb.const.lobChunksPerRead
+    assert ''.join(chunks) == lob.data
+    assert lob.reads[:3] == [(1, chunkSize), (chunkSize + 1, chunkSize),
+                             (chunkSize * 2 + 1, chunkSize)]
+    assert [len(chunk) for chunk in DbLib_StandInDb.readLob(lob, 100)] == \
+        [100, 50]
@@ -0,0 +1,219 @@
+'''
+Created on Oct 18, 2026
+'''
+import threading
+
+import pytest
+
+import DB.DbLib
+import DB.DbPool
+
+
+def test_acquireRelease(DbPool_StandInSessionPool):
+    poolMgr = DB.DbPool.PoolManager()
+    conn1 = poolMgr.acquire('schema', 'pswd', 'servicename', 'host', 1521)
+    conn2 = poolMgr.acquire('SCHEMA', 'pswd', 'SERVICENAME', 'HOST', '1521')
+    # the same pool is used regardless of the case of the parameters
+    assert len(DbPool_StandInSessionPool) == 1
+    pool = DbPool_StandInSessionPool[0]
+    assert pool.user == 'schema'
+    assert pool.busy == 2
+    assert poolMgr.isPooled(conn1)
+    poolMgr.release(conn1)
+    poolMgr.release(conn2)
+    assert not poolMgr.isPooled(conn1)
+
+    stats = list(poolMgr.getStatistics().values())
+    assert len(stats) == 1
+    assert stats[0]['acquired'] == 2
+    assert stats[0]['released'] == 2
+    assert stats[0]['busy'] == 0
+
+
+def test_poolKeyPassword():
+    poolMgr = DB.DbPool.PoolManager()
+    key = poolMgr.getPoolKey('schema', 'pswd', 'servicename', 'host', 1521)
+    assert key[:4] == ('SCHEMA', 'SERVICENAME', 'host', 1521)
+    # the password is not kept in the key, only a digest of it
+    assert 'pswd' not in key
+    assert key != poolMgr.getPoolKey('schema', 'newpswd', 'servicename',
+                                     'host', 1521)
+
+
+def test_passwordRotation(DbPool_StandInSessionPool):
+    poolMgr = DB.DbPool.PoolManager()
+    conn = poolMgr.acquire('schema', 'oldpswd', 'servicename', 'host')
+    poolMgr.release(conn)
+    oldPool = DbPool_StandInSessionPool[0]
+
+    conn = poolMgr.acquire('schema', 'newpswd', 'servicename', 'host')
+    assert len(DbPool_StandInSessionPool) == 2
+    newPool = DbPool_StandInSessionPool[1]
+    assert newPool.pswd == 'newpswd'
+    assert newPool.busy == 1
+    # the idle pool that was created with the old password is closed
+    assert oldPool.closed
+    assert len(poolMgr.getStatistics()) == 1
+    poolMgr.release(conn)
+
+
+def test_passwordRotationBusyPool(DbPool_StandInSessionPool):
+    poolMgr = DB.DbPool.PoolManager()
+    oldConn = poolMgr.acquire('schema', 'oldpswd', 'servicename', 'host')
+    newConn = poolMgr.acquire('schema', 'newpswd', 'servicename', 'host')
+    oldPool, newPool = DbPool_StandInSessionPool
+    # sessions are still checked out of the old pool so it is kept open
+    assert not oldPool.closed
+    poolMgr.release(oldConn)
+    poolMgr.release(newConn)
+    assert oldPool.busy == 0
+    assert newPool.busy == 0
+
+
+def test_healthCheck(DbPool_StandInSessionPool):
+    poolMgr = DB.DbPool.PoolManager()
+    pool = poolMgr.getPool('schema', 'pswd', 'servicename', 'host')
+    pool.brokenConns = 1
+    conn = poolMgr.acquire('schema', 'pswd', 'servicename', 'host')
+    assert not conn.closed
+    assert len(pool.dropped) == 1
+    stats = list(poolMgr.getStatistics().values())[0]
+    assert stats['healthCheckFailures'] == 1
+    assert stats['dropped'] == 1
+    assert stats['busy'] == 1
+
+
+def test_passwordRotationDuringRelease(DbPool_StandInSessionPool,
+                                      monkeypatch):
+    poolMgr = DB.DbPool.PoolManager()
+    oldConn = poolMgr.acquire('schema', 'oldpswd', 'servicename', 'host')
+    oldPool = DbPool_StandInSessionPool[0]
+    newConns = []
+
+    def rotatingRelease(conn):
+        # another thread switches to the new password while the connection
+        # is being given back to the old pool
+        newConns.append(poolMgr.acquire('schema', 'newpswd', 'servicename',
+                                        'host'))
+        oldPool.busy -= 1
+    monkeypatch.setattr(oldPool, 'release', rotatingRelease)
+    poolMgr.release(oldConn)
+    assert not oldPool.closed
+    assert not poolMgr.isPooled(oldConn)
+    stats = poolMgr.getStatistics()
+    oldKey = poolMgr.getPoolKey('schema', 'oldpswd', 'servicename', 'host')
+    assert stats[oldKey]['released'] == 1
+    poolMgr.release(newConns[0])
+
+
+def test_concurrentStatistics(DbPool_StandInSessionPool):  # pylint: disable=unused-argument
+    poolMgr = DB.DbPool.PoolManager()
+    threadCnt, loopCnt = 8, 200
+
+    def worker():
+        for _ in range(loopCnt):
+            poolMgr.release(poolMgr.acquire('schema', 'pswd', 'servicename',
+                                            'host'))
+    threads = [threading.Thread(target=worker) for _ in range(threadCnt)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = list(poolMgr.getStatistics().values())[0]
+    assert stats['acquired'] == threadCnt * loopCnt
+    assert stats['released'] == threadCnt * loopCnt
+
+
+def test_releaseUnknownConnection(DbPool_StandInSessionPool,  # pylint: disable=unused-argument
+                                  DbLib_StandInConnection):
+    poolMgr = DB.DbPool.PoolManager()
+    with pytest.raises(ValueError):
+        poolMgr.release(DbLib_StandInConnection)
+
+
+def test_closeAll(DbPool_StandInSessionPool):
+    poolMgr = DB.DbPool.PoolManager()
+    poolMgr.acquire('schema', 'pswd', 'servicename', 'host')
+    poolMgr.acquire('other', 'pswd', 'servicename', 'host')
+    poolMgr.closeAll()
+    assert all(pool.closed for pool in DbPool_StandInSessionPool)
+    assert poolMgr.getStatistics() == {}
+
+
+def test_registryReuse(DbPool_ConnectionRegistry, DbLib_StandInConnect):
+    registry = DbPool_ConnectionRegistry
+    conn = registry.acquire('schema', 'pswd', 'dsn')
+    assert registry.isRegistered(conn)
+    registry.release(conn)
+    assert not registry.isRegistered(conn)
+    assert registry.acquire('SCHEMA', 'pswd', 'dsn') is conn
+    # a different password or dsn gets its own connection
+    otherConn = registry.acquire('schema', 'newpswd', 'dsn')
+    assert otherConn is not conn
+    registry.release(otherConn)
+    registry.release(conn)
+    assert len(DbLib_StandInConnect.connections) == 2
+
+    stats = registry.getStatistics()[('SCHEMA', 'dsn')]
+    assert (stats['connects'], stats['acquired'], stats['reused'],
+            stats['released'], stats['idle']) == (2, 3, 1, 3, 2)
+
+
+def test_registryPingFailure(DbPool_ConnectionRegistry, DbLib_StandInConnect):
+    registry = DbPool_ConnectionRegistry
+    conn = registry.acquire('schema', 'pswd', 'dsn')
+    registry.release(conn)
+    # the session is lost while the connection is idle
+    conn.closed = True
+    newConn = registry.acquire('schema', 'pswd', 'dsn')
+    assert newConn is not conn
+    assert len(DbLib_StandInConnect.connections) == 2
+    assert registry.getStatistics()[('SCHEMA', 'dsn')]['pingFailures'] == 1
+
+
+def test_registryIdleLimits(DbPool_ConnectionRegistry):
+    registry = DbPool_ConnectionRegistry
+    registry.maxIdle = 2
+    conns = [registry.acquire('schema', 'pswd', 'dsn') for _ in range(3)]
+    for conn in conns:
+        registry.release(conn)
+    # only maxIdle connections are kept
+    assert [conn.closed for conn in conns] == [False, False, True]
+
+    registry.idleTimeout = 0
+    registry.closeExpired()
+    assert all(conn.closed for conn in conns)
+    stats = registry.getStatistics()[('SCHEMA', 'dsn')]
+    assert (stats['idleClosed'], stats['idle']) == (2, 0)
+
+
+def test_registryWarmUp(DbPool_ConnectionRegistry, DbLib_StandInConnect):
+    registry = DbPool_ConnectionRegistry
+    registry.warmUp('schema', 'pswd', 'dsn', sessions=2, background=False)
+    assert len(DbLib_StandInConnect.connections) == 2
+    thread = registry.warmUp('schema', 'pswd', 'otherdsn')
+    thread.join()
+    assert registry.getStatistics()[('SCHEMA', 'otherdsn')]['idle'] == 1
+    conn = registry.acquire('schema', 'pswd', 'dsn')
+    assert conn in DbLib_StandInConnect.connections[:2]
+    assert len(DbLib_StandInConnect.connections) == 3
+    registry.release(conn)
+    registry.closeAll()
+    assert all(conn.closed for conn in DbLib_StandInConnect.connections)
+
+
+def test_registryReleaseUnknownConnection(DbPool_ConnectionRegistry,
+                                          DbLib_StandInConnection):
+    with pytest.raises(ValueError):
+        DbPool_ConnectionRegistry.release(DbLib_StandInConnection)
+
+
+def test_dbMethodsConnectShared(DbPool_ConnectionRegistry,
+                                DbLib_StandInConnect):
+    for _ in range(3):
+        db = DB.DbLib.DbMethods()
+        db.connectShared('schema', 'pswd', 'dsn')
+        db.closeDbConnection()
+    assert len(DbLib_StandInConnect.connections) == 1
+    stats = DbPool_ConnectionRegistry.getStatistics()[('SCHEMA', 'dsn')]
+    assert stats['reused'] == 2
@@ -0,0 +1,140 @@
+'''
+Created on Oct 18, 2026
+'''
+import os
+
+import pytest
+
+import DB.LRDW
+
+
+@pytest.fixture()
+def lrdw(DbLib_StandInConnect, tmp_path):  # pylint: disable=unused-argument
+    '''
+    an LRDW object connected to a stand in database with an ALL_TABLES
+    view
+    '''
+    lrdwObj = DB.LRDW.LRDW(getConfigDict(tmp_path), str(tmp_path))
+    lrdwObj.db.connObj.conn.executescript('''
+        CREATE TABLE all_tables (table_name TEXT, owner TEXT);
+        INSERT INTO all_tables VALUES ('ROADS', 'WHSE');
+        INSERT INTO all_tables VALUES ('ROADS', 'APP');
+        INSERT INTO all_tables VALUES ('JOBS', 'APP');
+        ''')
+    yield lrdwObj
+
+
+def getTableQueries(lrdwObj):
+    return [executed for executed in lrdwObj.db.connObj.executed
+            if 'all_tables' in executed[0]]
+
+
+def test_schemaIndex(lrdw):
+    assert sorted(lrdw.getSchema('roads')) == ['APP', 'WHSE']
+    assert lrdw.getSchemas(['jobs', 'ROADS']) == \
+        {'jobs': ['APP'], 'ROADS': ['WHSE', 'APP']}
+    queries = getTableQueries(lrdw)
+    assert len(queries) == 1
+    # the arraysize and prefetchrows are set before the index is queried
+    assert queries[0][1:] == (DB.LRDW.LRDWConst.schemaIndexArraySize,
+                              DB.LRDW.LRDWConst.schemaIndexPrefetchRows)
+    assert not lrdw.db.connObj.getOpenCursors()
+    assert lrdw.getSchema('roads', useIndex=False) == ['WHSE', 'APP']
+
+
+def test_schemaIndexNoPrefetchRows(DbLib_StandInConnect, tmp_path):
+    # cx_Oracle before 8.0, the index is loaded using the arraysize alone
+    DbLib_StandInConnect.clientVersion = (7, 1)
+    lrdwObj = DB.LRDW.LRDW(getConfigDict(tmp_path), str(tmp_path))
+    lrdwObj.db.connObj.conn.executescript('''
+        CREATE TABLE all_tables (table_name TEXT, owner TEXT);
+        INSERT INTO all_tables VALUES ('ROADS', 'WHSE');
+        ''')
+    assert lrdwObj.getSchema('roads') == ['WHSE']
+    assert getTableQueries(lrdwObj)[0][1:] == \
+        (DB.LRDW.LRDWConst.schemaIndexArraySize, None)
+
+
+def test_schemaIndexMiss(lrdw):
+    assert lrdw.getSchema('roads') == ['WHSE', 'APP']
+    lrdw.db.connObj.conn.execute(
+        "INSERT INTO all_tables VALUES ('NEW_TABLE', 'WHSE')")
+    # tables created after the index was loaded are looked up
+    assert lrdw.getSchema('new_table') == ['WHSE']
+    assert lrdw.getSchemas(['new_table', 'missing', 'jobs']) == \
+        {'new_table': ['WHSE'], 'missing': [], 'jobs': ['APP']}
+    assert lrdw.getSchema('missing') == []
+    # the index load, the lookup for new_table, which is then added to the
+    # index, and a lookup each time for the missing table
+    assert len(getTableQueries(lrdw)) == 4
+
+
+def test_schemaIndexTTL(lrdw):
+    lrdw.getSchema('roads')
+    lrdw.getSchema('jobs')
+    assert len(getTableQueries(lrdw)) == 1
+    lrdw.schemaIndexLoadTime -= DB.LRDW.LRDWConst.schemaIndexTTL
+    lrdw.getSchema('jobs')
+    assert len(getTableQueries(lrdw)) == 2
+    lrdw.clearSchemaIndex()
+    lrdw.getSchema('jobs')
+    assert len(getTableQueries(lrdw)) == 3
+
+
+def getConfigDict(tmp_path):
+    (tmp_path / 'creds.txt').write_text('lrdwuser\nlrdwpswd\n')
+    return {'securitycredsfile': 'creds.txt',
+            'instancename': 'servicename',
+            'server': 'host',
+            'port': 1521}
+
+
+def test_registry(DbPool_ConnectionRegistry, DbLib_StandInConnect, tmp_path):
+    configDict = getConfigDict(tmp_path)
+    for _ in range(3):
+        with DB.LRDW.LRDW(configDict, str(tmp_path),
+                          useRegistry=True) as lrdwObj:
+            assert lrdwObj.db.connObj.user == 'lrdwuser'
+    # the connection is released when the LRDW object is closed, and reused
+    assert len(DbLib_StandInConnect.connections) == 1
+    stats = list(DbPool_ConnectionRegistry.getStatistics().values())[0]
+    assert (stats['reused'], stats['released']) == (2, 3)
+    lrdwObj.close()
+
+
+def test_close(DbLib_StandInConnect, tmp_path):
+    lrdwObj = DB.LRDW.LRDW(getConfigDict(tmp_path), str(tmp_path))
+    lrdwObj.close()
+    assert DbLib_StandInConnect.connections[0].closed
+
+
+def test_conflictingFlags(tmp_path):
+    with pytest.raises(ValueError):
+        DB.LRDW.LRDW(getConfigDict(tmp_path), str(tmp_path), usePool=True,
+                     useRegistry=True)
+
+
+def test_credentialsCache(DbLib_StandInConnect, tmp_path, monkeypatch):  # pylint: disable=unused-argument
+    monkeypatch.setattr(DB.LRDW, '_CREDENTIALS_CACHE', {})
+    opened = []
+
+    def countingOpen(fileName, *args, **kwargs):
+        opened.append(fileName)
+        return open(fileName, *args, **kwargs)
+    monkeypatch.setattr(DB.LRDW, 'open', countingOpen, raising=False)
+    configDict = getConfigDict(tmp_path)
+    DB.LRDW.LRDW(configDict, str(tmp_path)).close()
+    DB.LRDW.LRDW(configDict, str(tmp_path)).close()
+    # the file is read once for both objects
+    assert len(opened) == 1
+
+    # and read again once it is modified
+    credsFile = opened[0]
+    mtime = os.path.getmtime(credsFile)
+    os.utime(credsFile, (mtime + 10, mtime + 10))
+    DB.LRDW.LRDW(configDict, str(tmp_path)).close()
+    assert len(opened) == 2
+
+    DB.LRDW.clearCredentialsCache()
+    DB.LRDW.LRDW(configDict, str(tmp_path)).close()
+    assert len(opened) == 3
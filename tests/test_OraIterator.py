@@ -0,0 +1,193 @@
+'''
+Created on Oct 18, 2026
+'''
+import datetime
+import decimal
+import json
+import os
+
+import cx_Oracle
+import pytest
+
+import DB.OraIterator
+
+SQL = 'SELECT id, val FROM test_data ORDER BY id'
+
+
+def test_streaming(DbLib_StandInDbConnection):
+    standInConn = DbLib_StandInDbConnection.conn
+    iterObj = DB.OraIterator.Iterator(DbLib_StandInDbConnection, SQL,
+                                      arraysize=10, streaming=True)
+    rows = list(iterObj)
+    assert [row[0] for row in rows] == list(range(25))
+    # the arraysize is configured before the query is executed
+    assert standInConn.executed == [(SQL, 10, 2)]
+    # the cursor is closed once the results are exhausted
+    assert not standInConn.getOpenCursors()
+    assert list(iterObj) == []
+
+
+def test_notStreaming(DbLib_StandInDbConnection):
+    iterObj = DB.OraIterator.Iterator(DbLib_StandInDbConnection, SQL)
+    assert len(list(iterObj)) == 25
+
+
+def test_iterBatches(DbLib_StandInDbConnection):
+    standInConn = DbLib_StandInDbConnection.conn
+    iterObj = DB.OraIterator.Iterator(DbLib_StandInDbConnection, SQL,
+                                      arraysize=10)
+    batches = list(iterObj.iterBatches(7))
+    assert [len(batch) for batch in batches] == [7, 7, 7, 4]
+    assert batches[3][-1] == (24, 'value 24')
+    assert standInConn.executed[-1] == (SQL, 7, 2)
+    # batches default to the arraysize, an exact multiple of the batch size
+    # ends without an empty batch
+    batches = list(iterObj.iterBatches(5))
+    assert [len(batch) for batch in batches] == [5] * 5
+    assert [len(batch) for batch in iterObj.iterBatches()] == [10, 10, 5]
+
+
+def test_iterBatchesClosedEarly(DbLib_StandInDbConnection):
+    standInConn = DbLib_StandInDbConnection.conn
+    iterObj = DB.OraIterator.Iterator(DbLib_StandInDbConnection, SQL)
+    batches = iterObj.iterBatches(10)
+    assert len(next(batches)) == 10
+    batches.close()
+    assert not standInConn.getOpenCursors()
+
+
+def createEvents(standInConn, eventCnt=10):
+    '''
+    creates the table events, keyed by a timestamp
+    '''
+    standInConn.conn.execute('CREATE TABLE events (event_time TIMESTAMP, ' +
+                             'descr TEXT)')
+    startTime = datetime.datetime(2026, 1, 1, 12, 0, 0)
+    standInConn.conn.executemany(
+        'INSERT INTO events VALUES (?, ?)',
+        [(startTime + datetime.timedelta(minutes=cnt), 'event {0}'.format(cnt))
+         for cnt in range(eventCnt)])
+
+
+def test_checkpointDateKey(DbLib_StandInDbConnection, tmp_path):
+    createEvents(DbLib_StandInDbConnection.conn)
+    checkpointFile = str(tmp_path / 'checkpoint.json')
+    sql = 'SELECT event_time, descr FROM events'
+    iterObj = DB.OraIterator.Iterator(DbLib_StandInDbConnection, sql,
+                                      arraysize=3, keyColumn='event_time',
+                                      checkpointFile=checkpointFile)
+    pages = iterObj.iterPages()
+    next(pages)
+    next(pages)
+    # the checkpoint is written once the second page is requested
+    with open(checkpointFile) as checkpointFH:
+        checkpoint = json.load(checkpointFH)
+    assert checkpoint['lastKey'] == {'type': 'datetime',
+                                     'value': '2026-01-01T12:02:00'}
+    assert checkpoint['rows'] == 3
+    pages.close()
+
+    # resumes after the last page that was consumed
+    iterObj = DB.OraIterator.Iterator(DbLib_StandInDbConnection, sql,
+                                      arraysize=3, keyColumn='event_time',
+                                      checkpointFile=checkpointFile)
+    rows = list(iterObj)
+    assert [row[1] for row in rows] == \
+        ['event {0}'.format(cnt) for cnt in range(3, 10)]
+    assert isinstance(rows[0][0], datetime.datetime)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_checkpointKeyTypes():
+    iterObj = DB.OraIterator.Iterator(None, SQL, keyColumn='id')
+    for key in [None, 'key', 10, 1.5, datetime.date(2026, 1, 2),
+                datetime.datetime(2026, 1, 2, 3, 4, 5, 6),
+                datetime.datetime(2026, 1, 2, 3, 4, 5),
+                decimal.Decimal('1.10')]:
+        encoded = json.loads(json.dumps(iterObj.encodeKey(key)))
+        decoded = iterObj.decodeKey(encoded)
+        assert decoded == key
+        assert type(decoded) == type(key)  # pylint: disable=unidiomatic-typecheck
+    with pytest.raises(ValueError):
+        iterObj.encodeKey(b'raw')
+
+
+def test_checkpointWriteFailure(DbLib_StandInDbConnection, tmp_path,
+                                monkeypatch):
+    checkpointFile = str(tmp_path / 'checkpoint.json')
+    iterObj = DB.OraIterator.Iterator(DbLib_StandInDbConnection, SQL,
+                                      keyColumn='id',
+                                      checkpointFile=checkpointFile)
+
+    def failDump(*args, **kwargs):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(DB.OraIterator.json, 'dump', failDump)
+    with pytest.raises(OSError):
+        iterObj.saveCheckpoint(10, 10)
+    # the temporary file is removed
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_fetchPageRetry(DbLib_StandInDbConnection):
+    standInConn = DbLib_StandInDbConnection.conn
+    iterObj = DB.OraIterator.Iterator(DbLib_StandInDbConnection, SQL,
+                                      arraysize=10, keyColumn='id')
+    standInConn.failExecutes = 1
+    assert len(list(iterObj)) == 25
+    assert DbLib_StandInDbConnection.reconnects == 1
+    # the cursor the failed execute was run on is closed
+    assert not standInConn.getOpenCursors()
+
+    iterObj = DB.OraIterator.Iterator(DbLib_StandInDbConnection, SQL,
+                                      keyColumn='id', maxRetries=1)
+    standInConn.failExecutes = 2
+    with pytest.raises(cx_Oracle.DatabaseError):  # pylint: disable=no-member
+        list(iterObj)
+    assert not standInConn.getOpenCursors()
+
+
+def test_fetchPageNoReconnect(DbLib_StandInDbConnection):
+    class NoReconnect(object):
+        '''
+        connection object without a reconnect() method
+        '''
+        getConnection = DbLib_StandInDbConnection.getConnection
+
+    standInConn = DbLib_StandInDbConnection.conn
+    iterObj = DB.OraIterator.Iterator(NoReconnect(), SQL, keyColumn='id')
+    standInConn.failExecutes = 1
+    with pytest.raises(cx_Oracle.DatabaseError):  # pylint: disable=no-member
+        list(iterObj)
+    assert not standInConn.getOpenCursors()
+
+
+def test_openCursorFailure(DbLib_StandInDbConnection):
+    standInConn = DbLib_StandInDbConnection.conn
+    standInConn.failExecutes = 1
+    iterObj = DB.OraIterator.Iterator(DbLib_StandInDbConnection, SQL,
+                                      streaming=True)
+    with pytest.raises(cx_Oracle.DatabaseError):  # pylint: disable=no-member
+        next(iterObj)
+    assert not standInConn.getOpenCursors()
+
+
+def test_dbConnectionFlags():
+    with pytest.raises(ValueError):
+        DB.OraIterator.DbConnection('schema', 'pswd', 'host', 'sn', 1521,
+                                    'label', usePool=True, useRegistry=True)
+    with pytest.raises(ValueError):
+        DB.OraIterator.DbConnection('schema', 'pswd', 'host', 'sn', 1521,
+                                    'label', usePool=True, dsn='host/sn')
+
+
+def test_dbConnectionRegistry(DbPool_ConnectionRegistry, DbLib_StandInConnect):
+    for _ in range(3):
+        dbConn = DB.OraIterator.DbConnection('schema', 'pswd', 'host', 'sn',
+                                             1521, 'label', useRegistry=True)
+        assert len(list(DB.OraIterator.Iterator(dbConn, SQL))) == 25
+        dbConn.close()
+    # the connection released by close() is reused
+    assert len(DbLib_StandInConnect.connections) == 1
+    stats = list(DbPool_ConnectionRegistry.getStatistics().values())[0]
+    assert stats['reused'] == 2
@@ -0,0 +1,191 @@
+'''
+Created on Oct 18, 2026
+'''
+import collections
+import threading
+import time
+
+import pytest
+import requests
+
+import PMP.PMPRestConnect
+
+
+def test_getAccountPasswordCached(PMP_MockApi, PMP_MockConfigDict):
+    pmp = PMP.PMPRestConnect.PMP(PMP_MockConfigDict)
+    assert pmp.getAccountPassword('whse_a', 'db_prd') == 'pswd11'
+    assert pmp.getAccountPassword('WHSE_B', 'DB_PRD') == 'pswd12'
+    assert pmp.getAccountPassword('WHSE_A', 'DB_DLV') == 'pswd21'
+    # the resource list is only retrieved once and the accounts once per
+    # resource
+    assert PMP_MockApi.getCallCount('/resources') == 1
+    assert PMP_MockApi.getCallCount('/accounts') == 2
+    assert PMP_MockApi.getCallCount('/password') == 3
+
+    pmp.clearCache('DB_PRD')
+    assert pmp.getAccountPassword('WHSE_A', 'DB_PRD') == 'pswd11'
+    assert PMP_MockApi.getCallCount('/resources') == 1
+    assert PMP_MockApi.getCallCount('/accounts') == 3
+
+    # misses are retried once against pmp before giving up
+    assert pmp.getAccountPassword('NOTTHERE', 'DB_PRD') is None
+    with pytest.raises(PMP.PMPRestConnect.ResourceNotFound):
+        pmp.getAccountPassword('WHSE_A', 'NOTTHERE')
+    assert PMP_MockApi.getCallCount('/resources') == 2
+    assert PMP_MockApi.getCallCount('/accounts') == 4
+
+
+def test_getAccountPasswordNoCache(PMP_MockApi, PMP_MockConfigDict):
+    pmp = PMP.PMPRestConnect.PMP(PMP_MockConfigDict, cacheTTL=None)
+    pmp.getAccountPassword('WHSE_A', 'DB_PRD')
+    pmp.getAccountPassword('WHSE_A', 'DB_PRD')
+    assert PMP_MockApi.getCallCount('/resources') == 2
+    assert PMP_MockApi.getCallCount('/accounts') == 2
+
+
+def test_sessionReused(PMP_MockApi, PMP_MockConfigDict):
+    pmp = PMP.PMPRestConnect.PMP(PMP_MockConfigDict)
+    adapter = pmp.session.get_adapter('https://' + PMP_MockConfigDict['baseurl'])
+    assert adapter.max_retries.total == PMP.PMPRestConnect.PMPConst.retries
+    assert 503 in adapter.max_retries.status_forcelist
+    session = pmp.session
+    assert pmp.getAccountPassword('WHSE_A', 'DB_PRD') == 'pswd11'
+    assert pmp.session is session
+    assert PMP_MockApi.getCallCount() == 3
+    pmp.close()
+
+
+def test_getAccountPasswords(PMP_MockApi, PMP_MockConfigDict):
+    pmp = PMP.PMPRestConnect.PMP(PMP_MockConfigDict)
+    pairs = [('WHSE_A', 'DB_PRD'), ('whse_b', 'db_prd'), ('WHSE_A', 'DB_DLV'),
+             ('NOTTHERE', 'DB_PRD'), ('WHSE_A', 'NOTTHERE'),
+             ('norights', 'API')]
+    passwords, errors = pmp.getAccountPasswords(pairs, maxWorkers=3)
+    assert passwords == {('WHSE_A', 'DB_PRD'): 'pswd11',
+                         ('whse_b', 'db_prd'): 'pswd12',
+                         ('WHSE_A', 'DB_DLV'): 'pswd21'}
+    assert isinstance(errors[('NOTTHERE', 'DB_PRD')],
+                      PMP.PMPRestConnect.AccountNotFound)
+    assert isinstance(errors[('WHSE_A', 'NOTTHERE')],
+                      PMP.PMPRestConnect.ResourceNotFound)
+    assert isinstance(errors[('norights', 'API')], ValueError)
+    assert len(errors) == 3
+    # accounts are retrieved once for each resource, plus the refresh of
+    # DB_PRD when NOTTHERE was not found
+    assert PMP_MockApi.getCallCount('/accounts') == 4
+    assert PMP_MockApi.getCallCount('/password') == 4
+
+
+def test_getRestAPIPassword(PMP_MockApi, PMP_MockConfigDict):
+    pmp = PMP.PMPRestConnect.PMP(PMP_MockConfigDict)
+    # matched using the server column in the account details
+    assert pmp.getRestAPIPassword('apiuser', 'https://api2.gov.bc.ca/rest/x',
+                                  'API') == 'pswd32'
+    assert pmp.getRestAPIPassword('APIUSER', 'https://api1.gov.bc.ca',
+                                  'API') == 'pswd31'
+    # matched using the url in the account name
+    assert pmp.getRestAPIPassword('apiuser@https://api3.gov.bc.ca',
+                                  'https://api3.gov.bc.ca/rest', 'API') == \
+        'pswd33'
+    # the details are only retrieved once for each account
+    assert PMP_MockApi.getCallCount('/accounts/31') == 1
+    assert PMP_MockApi.getCallCount('/accounts/32') == 1
+    with pytest.raises(PMP.PMPRestConnect.AccountNotFound):
+        pmp.getRestAPIPassword('apiuser', 'https://notthere.gov.bc.ca', 'API')
+    # a miss retrieves the accounts and their details again once
+    assert PMP_MockApi.getCallCount('/accounts/31') == 2
+    # only the accounts with a matching username are retrieved
+    assert PMP_MockApi.getCallCount('/accounts/34') == 0
+
+
+def test_getRestAPIPasswordDetailsError(PMP_MockApi, PMP_MockConfigDict):
+    pmp = PMP.PMPRestConnect.PMP(PMP_MockConfigDict)
+    PMP_MockApi.failUrls['/accounts/31'] = 500
+    # the account that failed is skipped
+    assert pmp.getRestAPIPassword('apiuser', 'https://api2.gov.bc.ca',
+                                  'API') == 'pswd32'
+    with pytest.raises(PMP.PMPRestConnect.PMPCommunicationProblem):
+        pmp.getRestAPIPassword('apiuser', 'https://api1.gov.bc.ca', 'API')
+    # the failure is not cached
+    del PMP_MockApi.failUrls['/accounts/31']
+    assert pmp.getRestAPIPassword('apiuser', 'https://api1.gov.bc.ca',
+                                  'API') == 'pswd31'
+    assert PMP_MockApi.getCallCount('/accounts/32') == 1
+
+
+def test_getAccountPasswordsLookupErrors(PMP_MockApi, PMP_MockConfigDict,
+                                         monkeypatch):
+    pmp = PMP.PMPRestConnect.PMP(PMP_MockConfigDict)
+    pairs = [('WHSE_A', 'DB_PRD'), ('WHSE_A', 'DB_DLV')]
+    # pmp fails to return the resource list, the next resource retries it
+    PMP_MockApi.failNext = 1
+    passwords, errors = pmp.getAccountPasswords(pairs)
+    assert passwords == {('WHSE_A', 'DB_DLV'): 'pswd21'}
+    assert isinstance(errors[('WHSE_A', 'DB_PRD')],
+                      PMP.PMPRestConnect.PMPCommunicationProblem)
+
+    # the connection fails while retrieving the accounts for one resource
+    mockGet = requests.Session.get
+
+    def failingGet(session, url, **kwargs):
+        if url.endswith('/resources/2/accounts'):
+            raise requests.exceptions.ConnectionError('connection reset')
+        return mockGet(session, url, **kwargs)
+    monkeypatch.setattr(requests.Session, 'get', failingGet)
+    pmp.clearCache()
+    passwords, errors = pmp.getAccountPasswords(pairs)
+    assert passwords == {('WHSE_A', 'DB_PRD'): 'pswd11'}
+    assert isinstance(errors[('WHSE_A', 'DB_DLV')],
+                      requests.exceptions.ConnectionError)
+
+
+def test_sessionPerThread(PMP_MockApi, PMP_MockConfigDict, monkeypatch):
+    pmp = PMP.PMPRestConnect.PMP(PMP_MockConfigDict)
+    lock = threading.Lock()
+    # session -> number of requests it is currently sending
+    inUse = collections.Counter()
+    maxInUse = []
+    mockGet = requests.Session.get
+
+    def trackingGet(session, url, **kwargs):
+        with lock:
+            inUse[session] += 1
+            maxInUse.append(inUse[session])
+        time.sleep(0.01)
+        try:
+            return mockGet(session, url, **kwargs)
+        finally:
+            with lock:
+                inUse[session] -= 1
+    monkeypatch.setattr(requests.Session, 'get', trackingGet)
+    pairs = [('WHSE_A', 'DB_PRD'), ('WHSE_B', 'DB_PRD'), ('WHSE_A', 'DB_DLV'),
+             ('norights', 'API')]
+    _, errors = pmp.getAccountPasswords(pairs, maxWorkers=4)
+    assert list(errors) == [('norights', 'API')]
+    # a session is never used by two requests at the same time
+    assert max(maxInUse) == 1
+    assert 1 < len(pmp.sessions) <= 5
+    sessions = list(pmp.sessions)
+    # the sessions are reused by the next call
+    pmp.getAccountPasswords(pairs, maxWorkers=4)
+    assert len(pmp.sessions) <= 5
+    assert pmp.sessions[:len(sessions)] == sessions
+    pmp.close()
+    assert pmp.sessions == [pmp.session]
+
+
+def test_getRestAPIPasswordNoCache(PMP_MockApi, PMP_MockConfigDict):
+    pmp = PMP.PMPRestConnect.PMP(PMP_MockConfigDict, cacheTTL=None)
+    for _ in range(2):
+        assert pmp.getRestAPIPassword('apiuser', 'https://api1.gov.bc.ca',
+                                      'API') == 'pswd31'
+    assert pmp.getRestAPIPassword('apiuser@https://api3.gov.bc.ca',
+                                  'https://api3.gov.bc.ca/rest', 'API') == \
+        'pswd33'
+    # the details are retrieved until the first match
+    assert PMP_MockApi.getCallCount('/accounts/31') == 3
+    assert PMP_MockApi.getCallCount('/accounts/32') == 1
+    assert PMP_MockApi.getCallCount('/accounts/34') == 0
+    assert not pmp.restAPIKeysCache
+    with pytest.raises(PMP.PMPRestConnect.AccountNotFound):
+        pmp.getRestAPIPassword('apiuser', 'https://notthere.gov.bc.ca', 'API')
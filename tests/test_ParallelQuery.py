@@ -0,0 +1,101 @@
+'''
+Created on Oct 18, 2026
+'''
+import DB.DbLib
+import DB.ParallelQuery
+
+
+def getJob(serviceName, sql='SELECT id FROM test_data WHERE id < :id',
+           values=(3,), user='schema', label=None):
+    connParams = {'user': user, 'pswd': 'pswd', 'serviceName': serviceName,
+                  'host': 'host'}
+    return DB.ParallelQuery.QueryJob(connParams, sql, values, label=label)
+
+
+def getMaxConcurrent(connections):
+    '''
+    :return: the max number of the connections that were open at once
+    '''
+    events = sorted([(conn.openTime, 1) for conn in connections] +
+                    [(conn.closeTime, -1) for conn in connections])
+    maxConcurrent = concurrent = 0
+    for _, change in events:
+        concurrent += change
+        maxConcurrent = max(maxConcurrent, concurrent)
+    return maxConcurrent
+
+
+def test_run(DbLib_StandInConnect):
+    jobs = [getJob('sn{0}'.format(cnt % 3), values=[cnt], label=cnt)
+            for cnt in range(10)]
+    runner = DB.ParallelQuery.ParallelQueryRunner(maxWorkers=4)
+    results = runner.runAll(jobs)
+    # results come back in job order
+    assert [result.job.label for result in results] == list(range(10))
+    assert [result.rows for result in results] == \
+        [[(cnt,) for cnt in range(rowCnt)] for rowCnt in range(10)]
+    assert all(result.error is None for result in results)
+    assert len(DbLib_StandInConnect.connections) == 10
+    assert all(conn.closed for conn in DbLib_StandInConnect.connections)
+
+
+def test_maxPerDatabase(DbLib_StandInConnect):
+    sql = 'SELECT SLEEP(0.05)'
+    jobs = [getJob('busy', sql, None, label='busy') for _ in range(4)]
+    jobs.append(getJob('other', sql, None, label='other'))
+    runner = DB.ParallelQuery.ParallelQueryRunner(maxWorkers=2,
+                                                  maxPerDatabase=1)
+    results = runner.runAll(jobs)
+    assert all(result.error is None for result in results)
+    connections = DbLib_StandInConnect.connections
+    busyConns = [conn for conn in connections if 'busy' in conn.dsn]
+    otherConns = [conn for conn in connections if 'other' in conn.dsn]
+    assert getMaxConcurrent(busyConns) == 1
+    # the job for the other database is not held up behind the jobs
+    # waiting on the busy database
+    assert otherConns[0].openTime < sorted(
+        [conn.openTime for conn in busyConns])[1]
+
+
+def test_errors(DbLib_StandInConnect):
+    DbLib_StandInConnect.failUsers.add('baduser')
+    jobs = [getJob('sn', user='baduser'),
+            getJob('sn', sql='SELECT * FROM missing_table', values=None),
+            getJob('sn')]
+    results = DB.ParallelQuery.ParallelQueryRunner().runAll(jobs)
+    # errors are captured whatever their type, and do not stop other jobs
+    assert isinstance(results[0].error, DB.DbLib.ConnectionError)
+    assert 'missing_table' in str(results[1].error)
+    assert results[1].rows is None
+    assert results[2].rows == [(0,), (1,), (2,)]
+    assert all(conn.closed for conn in DbLib_StandInConnect.connections)
+
+
+def test_timeout(DbLib_StandInConnect):
+    jobs = [getJob('sn', label=cnt) for cnt in range(2)]
+    for job in jobs:
+        job.timeout = 5
+    results = DB.ParallelQuery.ParallelQueryRunner().runAll(jobs[:1])
+    assert results[0].rows == [(0,), (1,), (2,)]
+    # the timeout is reset before the connection is closed
+    assert DbLib_StandInConnect.connections[0].callTimeout == 0
+
+    # cx_Oracle before 7.2 does not support call timeouts
+    DbLib_StandInConnect.clientVersion = (7, 1)
+    results = DB.ParallelQuery.ParallelQueryRunner().runAll(jobs[1:])
+    assert results[0].rows == [(0,), (1,), (2,)]
+    assert results[0].error is None
+
+
+def test_closeErrors(DbLib_StandInConnect, monkeypatch):  # pylint: disable=unused-argument
+    def failClose(db):
+        raise DB.DbLib.cx_Oracle.DatabaseError('ORA-03113: end-of-file')  # pylint: disable=no-member
+    monkeypatch.setattr(DB.DbLib.DbMethods, 'closeDbConnection', failClose)
+    jobs = [getJob('sn', values=[cnt], label=cnt) for cnt in range(3)]
+    jobs[1].timeout = 5
+    results = list(DB.ParallelQuery.ParallelQueryRunner().run(jobs))
+    # the errors closing the connections are captured and do not stop
+    # the other jobs
+    assert [result.rows for result in results] == [[], [(0,)], [(0,), (1,)]]
+    assert all(result.error is None for result in results)
+    assert all('ORA-03113' in str(result.closeError) for result in results)
@@ -0,0 +1,84 @@
+'''
+Created on Oct 18, 2026
+'''
+import DB.QueryProfiler
+
+SQL = 'SELECT id, val FROM test_data WHERE id < :id'
+
+
+def test_normalizeSql():
+    profiler = DB.QueryProfiler.QueryProfiler()
+    sql = "SELECT *\n  FROM tab WHERE name = 'O''Brien' AND  cnt > 10 " + \
+          "AND ratio < 0.5 AND col2 = :bind1 AND tab.x1 = t2.y2"
+    assert profiler.normalizeSql(sql) == \
+        "SELECT * FROM tab WHERE name = ? AND cnt > ? AND ratio < ? " + \
+        "AND col2 = :bind1 AND tab.x1 = t2.y2"
+    # statements that only differ by their literals are aggregated
+    profiler.recordExecute("SELECT * FROM tab WHERE id = 1", None, 0, 1.0)
+    profiler.recordExecute("SELECT * FROM tab  WHERE id = 22", None, 0, 2.0)
+    report = profiler.getReport()
+    assert len(report) == 1
+    assert report[0]['executions'] == 2
+    assert report[0]['maxSeconds'] == 2.0
+
+
+def test_report():
+    profiler = DB.QueryProfiler.QueryProfiler()
+    profiler.recordExecute('SELECT 1 FROM dual', None, 0.5, 1.0)
+    profiler.recordExecute('SELECT * FROM big_table', None, 0.0, 3.0)
+    profiler.recordFetch('SELECT * FROM big_table', 2.0, 1000, 10)
+    report = profiler.getReport()
+    # most expensive first
+    assert [stats['sql'] for stats in report] == \
+        ['SELECT * FROM big_table', 'SELECT ? FROM dual']
+    assert report[0]['totalSeconds'] == 5.0
+    assert report[0]['rows'] == 1000
+    assert report[0]['roundTrips'] == 11
+    assert report[1]['parseSeconds'] == 0.5
+
+    lines = profiler.formatReport().split('\n')
+    assert lines[0] == 'query profile, 2 distinct statements'
+    assert lines[1].endswith('round trips: SELECT * FROM big_table')
+    assert len(profiler.formatReport(maxStatements=1).split('\n')) == 2
+    profiler.reset()
+    assert profiler.getReport() == []
+
+
+def test_dumpReport(tmp_path):
+    profiler = DB.QueryProfiler.QueryProfiler()
+    profiler.recordExecute('SELECT 1 FROM dual', None, 0.0, 1.0)
+    outFile = tmp_path / 'profile.txt'
+    profiler.dumpReport(str(outFile))
+    assert outFile.read_text() == profiler.formatReport() + '\n'
+
+
+def test_slowQueryLog(caplog):
+    profiler = DB.QueryProfiler.QueryProfiler(slowThreshold=1, logBinds=False)
+    profiler.recordExecute('SELECT 1 FROM dual', {'pswd': 'secret'}, 0, 0.5)
+    profiler.recordExecute('SELECT 2 FROM dual', {'pswd': 'secret'}, 0, 1.5)
+    slowLogs = [record.getMessage() for record in caplog.records
+                if 'slow query' in record.getMessage()]
+    assert len(slowLogs) == 1
+    assert 'secret' not in slowLogs[0]
+
+
+def test_profiledCursor(DbLib_StandInDb):
+    profiler = DB.QueryProfiler.QueryProfiler()
+    DbLib_StandInDb.setProfiler(profiler)
+    with DbLib_StandInDb.executeOracleSql(SQL, [5]) as curObj:
+        assert isinstance(curObj, DB.QueryProfiler.ProfiledCursor)
+        assert next(curObj) == (0, 'value 0')
+        assert curObj.fetchone() == (1, 'value 1')
+        assert [row[0] for row in curObj] == [2, 3, 4]
+    # the context manager closes the wrapped cursor
+    assert not DbLib_StandInDb.connObj.getOpenCursors()
+    report = profiler.getReport()
+    assert report[0]['executions'] == 1
+    assert report[0]['rows'] == 5
+
+    curObj = DbLib_StandInDb.executeOracleSql(SQL, [3])
+    curObj.arraysize = 2
+    assert curObj.curObj.arraysize == 2
+    assert len(curObj.fetchall()) == 3
+    curObj.close()
+    assert profiler.getReport()[0]['rows'] == 8
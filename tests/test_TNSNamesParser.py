@@ -0,0 +1,156 @@
+'''
+Created on Oct 18, 2026
+'''
+import logging
+import time
+
+import pytest
+
+import DB.TNSNamesParser
+
+
+def test_parse(TNSNames_File):
+    parser = DB.TNSNamesParser.TNSParser(TNSNames_File)
+    struct = parser.parse()
+    assert sorted(struct.keys()) == ['delivery.bcgov', 'dlvr.bcgov',
+                                     'dlvr2.bcgov', 'idwprod1.bcgov',
+                                     'testdb.bcgov']
+    prod = struct['idwprod1.bcgov']['DESCRIPTION']
+    assert prod['ADDRESS'] == {'PROTOCOL': 'TCP', 'HOST': 'prodhost.bcgov',
+                               'PORT': '1521'}
+    assert prod['CONNECT_DATA']['SERVICE_NAME'] == 'idwprod1.bcgov'
+    # all the aliases in a list share the same descriptor
+    assert struct['dlvr.bcgov'] is struct['delivery.bcgov']
+    assert struct['dlvr2.bcgov']['DESCRIPTION']['CONNECT_DATA']['SID'] == \
+        'dlvrsid'
+    # entry from the IFILE
+    assert struct['testdb.bcgov']['DESCRIPTION']['ADDRESS']['HOST'] == \
+        'testhost.bcgov'
+
+
+def test_parseErrors(tmp_path):
+    tnsFile = tmp_path / 'broken.ora'
+    tnsFile.write_text('broken.bcgov =\n  (DESCRIPTION =\n    (ADDRESS = \n')
+    parser = DB.TNSNamesParser.TNSParser(str(tnsFile))
+    with pytest.raises(ValueError):
+        parser.parse()
+
+
+def test_getTNSNames(TNSNames_File):
+    tnsNames = DB.TNSNamesParser.TNSParser(TNSNames_File).getTNSNames()
+    entry = tnsNames.getTNSEntryByLabel('IDWPROD1.BCGOV')
+    assert tnsNames.getHostFromStruct(entry) == 'prodhost.bcgov'
+    assert tnsNames.getPortFromStruct(entry) == '1521'
+    assert tnsNames.getTNSEntryByLabelNoSuffix('dlvr') == 'dlvr.bcgov'
+
+
+def test_parseCache(TNSNames_File, tmp_path):
+    cacheDir = str(tmp_path / 'cache')
+    struct = DB.TNSNamesParser.TNSParser(TNSNames_File, cacheDir).parse()
+
+    # second parse comes from the cache, identical content
+    parser = DB.TNSNamesParser.TNSParser(TNSNames_File, cacheDir)
+    parser.parseText = None
+    assert parser.parse() == struct
+
+    # changing an included file invalidates the cache
+    includedFile = tmp_path / 'included.ora'
+    includedFile.write_text(
+        'newdb.bcgov = (DESCRIPTION=(ADDRESS=(HOST=newhost.bcgov)(PORT=1521))' +
+        '(CONNECT_DATA=(SERVICE_NAME=newdb.bcgov)))\n')
+    struct = DB.TNSNamesParser.TNSParser(TNSNames_File, cacheDir).parse()
+    assert 'newdb.bcgov' in struct
+    assert 'testdb.bcgov' not in struct
+
+
+def test_parseLargeFile(TNSNames_LargeFile):
+    '''
+    benchmark, parses a synthetic file with 10000 entries
+    '''
+    startTime = time.time()
+    struct = DB.TNSNamesParser.TNSParser(TNSNames_LargeFile).parse()
+    elapsed = time.time() - startTime
+    logging.info("parsed 10000 tnsnames entries in %.3f seconds", elapsed)
+    assert len(struct) == 20000
+    assert struct['db9999_alias']['DESCRIPTION']['ADDRESS_LIST']['ADDRESS']['HOST'] == \
+        'host49.bcgov'
+
+
+def test_indexedLookups(TNSNames_File):
+    tnsNames = DB.TNSNamesParser.TNSParser(TNSNames_File).getTNSNames()
+    assert tnsNames.getLabel('PRODHOST.BCGOV') == 'idwprod1.bcgov'
+    assert tnsNames.getLabel('delivery.BCGOV') == 'delivery.bcgov'
+    assert tnsNames.getServiceName('idwprod1.bcgov') == 'idwprod1.bcgov'
+    assert tnsNames.getServiceName('TESTDB.BCGOV') == 'testdb.bcgov'
+    assert tnsNames.getServiceName('nothere') is None
+    assert tnsNames.getAliasesForServiceName('IDWPROD1.bcgov') == \
+        ['idwprod1.bcgov']
+    assert sorted(tnsNames.getAliasesForSID('DLVRSID')) == \
+        ['delivery.bcgov', 'dlvr.bcgov', 'dlvr2.bcgov']
+    assert tnsNames.getAliasesForHostPort('TestHost.bcgov', 1521) == \
+        ['testdb.bcgov']
+    assert tnsNames.getTNSEntryByLabel('missing.bcgov') is None
+
+
+def test_multipleAddresses(TNSNames_File):
+    struct = DB.TNSNamesParser.TNSParser(TNSNames_File).parse()
+    addresses = struct['dlvr2.bcgov']['DESCRIPTION']['ADDRESS_LIST']['ADDRESS']
+    # repeated parameters are kept in order
+    assert [address['HOST'] for address in addresses] == \
+        ['dlvhost1.bcgov', 'dlvhost2.bcgov']
+    tnsNames = DB.TNSNamesParser.TNSNames(struct)
+    # every address is indexed, the first occurrence is used for single
+    # values
+    aliases = ['delivery.bcgov', 'dlvr.bcgov', 'dlvr2.bcgov']
+    assert sorted(tnsNames.getAliasesForHostPort('dlvhost1.bcgov', 1522)) == \
+        aliases
+    assert sorted(tnsNames.getAliasesForHostPort('DLVHOST2.bcgov', 1522)) == \
+        aliases
+    entry = tnsNames.getTNSEntryByLabel('dlvr2.bcgov')
+    assert tnsNames.getHostFromStruct(entry) == 'dlvhost1.bcgov'
+    assert tnsNames.getLabel('dlvhost1.bcgov') in aliases
+    # the descriptor rebuilt from the structure keeps both addresses
+    assert tnsNames.formatDescriptor(entry).count('(ADDRESS=') == 2
+
+
+def test_indexedLookupsLargeFile(TNSNames_LargeFile):
+    tnsNames = DB.TNSNamesParser.TNSParser(TNSNames_LargeFile).getTNSNames()
+    startTime = time.time()
+    for cnt in range(10000):
+        label = 'DB{0}'.format(cnt)
+        assert tnsNames.getTNSEntryByLabelNoSuffix(label) == \
+            'db{0}.bcgov'.format(cnt)
+        assert tnsNames.getAliasesForServiceName(label + '.BCGOV') == \
+            ['db{0}.bcgov'.format(cnt), 'db{0}_alias'.format(cnt)]
+    logging.info("resolved 10000 labels in %.3f seconds",
+                 time.time() - startTime)
+    assert len(tnsNames.getAliasesForHostPort('host7.bcgov')) == 400
+
+
+def test_getConnectDescriptors(TNSNames_File, tmp_path):
+    cacheDir = str(tmp_path / 'cache')
+    DB.TNSNamesParser.TNSParser(TNSNames_File, cacheDir).parse()
+    # the descriptors are also restored from the cache
+    tnsNames = DB.TNSNamesParser.TNSParser(TNSNames_File,
+                                           cacheDir).getTNSNames()
+    descriptors = tnsNames.getConnectDescriptors(['dlvr2.bcgov', 'IDWPROD1',
+                                                  'testdb.bcgov'])
+    dlvr = descriptors['dlvr2.bcgov']
+    assert dlvr.dsn == \
+        '(DESCRIPTION=(ADDRESS_LIST=(LOAD_BALANCE=on)(FAILOVER=on)' + \
+        '(ADDRESS=(PROTOCOL=TCP)(HOST=dlvhost1.bcgov)(PORT=1522))' + \
+        '(ADDRESS=(PROTOCOL=TCP)(HOST=dlvhost2.bcgov)(PORT=1522)))' + \
+        '(CONNECT_DATA=(SID=dlvrsid)))'
+    assert dlvr.addresses == [('dlvhost1.bcgov', '1522'),
+                              ('dlvhost2.bcgov', '1522')]
+    assert dlvr.loadBalance and dlvr.failover
+    assert dlvr.sid == 'dlvrsid'
+    assert descriptors['IDWPROD1'].serviceName == 'idwprod1.bcgov'
+    assert str(descriptors['testdb.bcgov']).startswith('(DESCRIPTION=')
+    assert tnsNames.getConnectDescriptor('dlvr2.bcgov') is dlvr
+
+    with pytest.raises(ValueError):
+        tnsNames.getConnectDescriptors(['idwprod1.bcgov', 'missing.bcgov'])
+    assert list(tnsNames.getConnectDescriptors(
+        ['missing.bcgov', 'idwprod1.bcgov'], ignoreMissing=True)) == \
+        ['idwprod1.bcgov']
@@ -0,0 +1,51 @@
+'''
+Created on Oct 18, 2026
+'''
+import DB.TableDiff
+
+
+def test_diff(TableDiff_Databases):
+    srcDb, destDb = TableDiff_Databases
+    differ = DB.TableDiff.TableDiff(srcDb, destDb, 'roads', 'id',
+                                    columns=['id', 'name', 'length'],
+                                    chunks=8, leafRows=100)
+    result = differ.diff()
+    assert not result.isIdentical()
+    assert result.missing == [1234]
+    assert result.changed == [9002]
+    assert result.extra == [25000]
+    # only the differing ranges are drilled into
+    assert srcDb.queries < 50
+
+
+def test_diffIdentical(TableDiff_IdenticalDatabases):
+    srcDb, destDb = TableDiff_IdenticalDatabases
+    differ = DB.TableDiff.TableDiff(srcDb, destDb, 'roads', 'id',
+                                    columns=['id', 'name', 'length'])
+    result = differ.diff()
+    assert result.isIdentical()
+    assert result.rangesCompared == 16
+
+
+def test_diffNulls(TableDiff_IdenticalDatabases):
+    srcDb, destDb = TableDiff_IdenticalDatabases
+    destDb.conn.execute('UPDATE roads SET name = NULL WHERE id = 500')
+    # the values are swapped between two columns
+    destDb.conn.execute('UPDATE roads SET name = length, length = name ' +
+                        'WHERE id = 700')
+    differ = DB.TableDiff.TableDiff(srcDb, destDb, 'roads', 'id',
+                                    columns=['id', 'name', 'length'])
+    result = differ.diff()
+    assert result.changed == [500, 700]
+    assert result.missing == []
+    assert result.extra == []
+
+
+def test_getRowHash(TableDiff_IdenticalDatabases):
+    srcDb, destDb = TableDiff_IdenticalDatabases
+    differ = DB.TableDiff.TableDiff(srcDb, destDb, 'roads', 'id',
+                                    columns=['id', 'name'])
+    # each column is hashed on its own, no conversion to text
+    assert differ.getRowHash() == \
+        '(NVL(ORA_HASH(id, 4294967295, 0), 4294967296) + ' + \
+        'NVL(ORA_HASH(name, 4294967295, 1), 4294967296))'